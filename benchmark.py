@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+benchmark.py
+
+End-to-end throughput benchmark of process.py against the local mock Loom site.
+
+Starts mock_loom.py on a free port, generates an input file with a mix of page variants,
+and runs process.py headless against it once per worker count. For every run it reports
+videos per minute, p50/p95 latency of each phase and the peak memory of process.py with
+all of its browsers. Every run starts from a fresh manifest, profile and output folder.
+
+Usage:
+    python benchmark.py [--videos 20] [--workers 1 2 4] [--mix tab=4,iframe=2,lazy=3,fail=1]
+    python benchmark.py --workers 1 2 -- --lean-pages
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import mock_loom
+from browser_supervisor import process_tree_rss_mb
+from run_log import read_records, PHASES, percentile
+
+PROCESS_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "process.py")
+
+
+def parse_mix(mix):
+    """
+    Parse a variant mix such as "tab=4,iframe=2,lazy=3,fail=1".
+
+    Returns:
+        dict: Weight per variant
+    """
+    weights = {}
+    for part in mix.split(","):
+        variant, _, weight = part.partition("=")
+        if variant not in mock_loom.VARIANTS:
+            raise ValueError(f"Unknown variant '{variant}', expected one of {', '.join(mock_loom.VARIANTS)}")
+        weights[variant] = int(weight or 1)
+    return weights
+
+
+def make_video_ids(count, weights, seed=0):
+    """Video IDs spread over the variants in proportion to their weights."""
+    rng = random.Random(seed)
+    variants = [variant for variant, weight in weights.items() for _ in range(weight)]
+    return [mock_loom.make_video_id(variants[i % len(variants)], rng) for i in range(count)]
+
+
+def run_once(base_url, video_ids, workers, extra_args, verbose=False):
+    """
+    Run process.py once against the mock site.
+
+    Args:
+        base_url (str): Mock site root
+        video_ids (list): Videos to process
+        workers (int): Number of browser workers
+        extra_args (list): Additional process.py arguments
+        verbose (bool): Echo process.py output
+
+    Returns:
+        dict: Measurements of the run
+    """
+    with tempfile.TemporaryDirectory(prefix="loom-benchmark-") as work_dir:
+        input_file = os.path.join(work_dir, "videos.txt")
+        with open(input_file, "w") as f:
+            f.write("\n".join(video_ids) + "\n")
+        manifest_path = os.path.join(work_dir, "manifest.db")
+        run_log_path = os.path.join(work_dir, "run.jsonl")
+        command = [
+            sys.executable, PROCESS_SCRIPT,
+            "--input-file", input_file,
+            "--base-url", base_url,
+            "--headless", "--profile-dir", os.path.join(work_dir, "profile"),
+            "--manifest", manifest_path,
+            "--run-log", run_log_path,
+            "--download-dir", os.path.join(work_dir, "transcripts"),
+            "--layout-cache", os.path.join(work_dir, "layout-cache.json"),
+            "--workers", str(workers),
+            "--debug-level", "off",
+            "--max-attempts", "1",
+            "--video-delay", "0.2",
+            "--min-video-delay", "0.05",
+        ] + extra_args
+
+        started = time.time()
+        process = subprocess.Popen(command, cwd=work_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, bufsize=1)
+        peak_memory = [0.0]
+
+        def sample_memory():
+            while process.poll() is None:
+                memory_mb = process_tree_rss_mb(process.pid)
+                if memory_mb:
+                    peak_memory[0] = max(peak_memory[0], memory_mb)
+                time.sleep(0.5)
+
+        sampler = threading.Thread(target=sample_memory, daemon=True)
+        sampler.start()
+        for line in process.stdout:
+            if verbose:
+                print(f"    {line}", end="")
+        process.wait()
+        sampler.join()
+        wall_time = time.time() - started
+        records = read_records(run_log_path) if os.path.exists(run_log_path) else []
+
+    done = [record for record in records if record.get("outcome") == "done"]
+    # Throughput counts from the first video to the last, excluding browser startup
+    if records:
+        span = (max(record["started_at"] + record["total"] for record in records)
+                - min(record["started_at"] for record in records))
+    else:
+        span = wall_time
+    phases = {}
+    for name in PHASES:
+        values = [record["phases"][name] for record in records if name in record["phases"]]
+        if values:
+            phases[name] = values
+    phases["total"] = [record["total"] for record in records]
+    return {
+        "workers": workers,
+        "exit_code": process.returncode,
+        "done": len(done),
+        "total": len(video_ids),
+        "videos_per_minute": len(done) / span * 60 if span > 0 else 0.0,
+        "wall_time": wall_time,
+        "phases": phases,
+        "peak_memory_mb": peak_memory[0],
+    }
+
+
+def format_seconds(value):
+    return "-" if value is None else f"{value:.2f}s"
+
+
+def print_report(results):
+    for result in results:
+        print(f"\nWorkers: {result['workers']}  done {result['done']}/{result['total']}  "
+              f"{result['videos_per_minute']:.1f} videos/min  wall {result['wall_time']:.1f}s  "
+              f"peak memory {result['peak_memory_mb']:.0f} MB"
+              + (f"  (exit code {result['exit_code']})" if result['exit_code'] else ""))
+        for name, values in result["phases"].items():
+            print(f"  {name:<20} p50 {format_seconds(percentile(values, 0.5)):>8}  "
+                  f"p95 {format_seconds(percentile(values, 0.95)):>8}  (n={len(values)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark process.py against the local mock Loom site.',
+                                     epilog='Arguments after -- are passed on to process.py.')
+    parser.add_argument('--videos', type=int, default=20, help='Videos per run (default: 20)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4],
+                        help='Worker counts to benchmark (default: 1 2 4)')
+    parser.add_argument('--mix', type=str, default="tab=4,iframe=2,lazy=3,fail=1",
+                        help='Page variant weights (default: tab=4,iframe=2,lazy=3,fail=1)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds the mock server adds to every response (default: 0)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the generated video IDs (default: 0)')
+    parser.add_argument('--verbose', action='store_true', help='Show the output of process.py')
+    parser.add_argument('process_args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    extra_args = [arg for arg in args.process_args if arg != "--"]
+
+    try:
+        video_ids = make_video_ids(args.videos, parse_mix(args.mix), args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = mock_loom.start_in_background(latency=args.latency)
+    print(f"Mock Loom site at {server.base_url}, {len(video_ids)} videos per run ({args.mix})")
+    results = []
+    try:
+        for workers in args.workers:
+            print(f"Running with {workers} worker(s)...")
+            results.append(run_once(server.base_url, video_ids, workers, extra_args, args.verbose))
+    finally:
+        server.shutdown()
+        server.server_close()
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
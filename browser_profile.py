@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+browser_profile.py
+
+Persistent Chrome profile support for process.py.
+
+With --profile-dir the Chrome user data directory survives between runs, so the Loom login
+cookies are reused. Before each run the session is checked by opening a page that requires
+a login; only when Loom redirects to its login page is a manual login needed.
+"""
+
+import os
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Loom redirects to one of these when the session is missing or expired
+LOGIN_URL_MARKERS = ("/login", "/signup", "/sso")
+# Any page that is only reachable when logged in
+SESSION_CHECK_PATH = "/home"
+
+
+def prepare_profile_dir(profile_dir):
+    """
+    Create the persistent profile directory if needed.
+
+    Args:
+        profile_dir (str): Path of the Chrome user data directory, ~ is expanded
+
+    Returns:
+        str: Absolute path of the profile directory
+    """
+    profile_dir = os.path.abspath(os.path.expanduser(profile_dir))
+    if not os.path.exists(profile_dir):
+        os.makedirs(profile_dir)
+        print(f"Created persistent Chrome profile directory: {profile_dir}")
+    else:
+        print(f"Using persistent Chrome profile directory: {profile_dir}")
+    return profile_dir
+
+
+def is_session_valid(driver, base_url, timeout=15):
+    """
+    Check whether the browser is still logged in to Loom.
+
+    Args:
+        driver: WebDriver instance using the persistent profile
+        base_url (str): Loom site root
+        timeout (float): Seconds to wait for the check page and any redirect
+
+    Returns:
+        bool: True if the logged-in page loaded without a redirect to the login page
+    """
+    driver.get(f"{base_url}{SESSION_CHECK_PATH}")
+    if not driver.get_cookies():
+        return False
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+    except TimeoutException:
+        print("Session check page did not finish loading")
+        return False
+    current_url = driver.current_url
+    return not any(marker in current_url for marker in LOGIN_URL_MARKERS)
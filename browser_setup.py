@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+browser_setup.py
+
+Fast, offline-capable browser and ChromeDriver resolution for process.py.
+
+Instead of calling ChromeDriverManager().install() on every run, the resolved browser
+binary, its version and the matching chromedriver are cached in a small JSON file. Once
+the cache is primed a run needs no network access to start. The browser is found from
+--browser-binary, the LOOM_BROWSER environment variable, or a list of well-known Chrome,
+Chromium and Brave locations for macOS, Linux and Windows.
+
+A browser can also be pre-warmed: started once with a remote debugging port and a
+persistent profile, so later runs attach to it in well under a second, the same way
+debug.py attaches to 127.0.0.1:9222.
+
+Usage:
+    python browser_setup.py resolve [--browser-binary PATH]
+    python browser_setup.py prewarm --profile-dir ~/.loom-scraper-profile [--port 9222]
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "loom-scraper", "browser.json")
+DEFAULT_DEBUGGER_ADDRESS = "127.0.0.1:9222"
+
+# Tried in order when no browser is configured
+BROWSER_CANDIDATES = {
+    "darwin": [
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser",
+        "/Applications/Chromium.app/Contents/MacOS/Chromium",
+    ],
+    "linux": [
+        "google-chrome",
+        "google-chrome-stable",
+        "chromium",
+        "chromium-browser",
+        "brave-browser",
+    ],
+    "win32": [
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe",
+    ],
+}
+
+VERSION_PATTERN = re.compile(r'(\d+)\.\d+\.\d+(?:\.\d+)?')
+
+
+def find_browser(browser_binary=None):
+    """
+    Locate a Chromium-based browser.
+
+    Args:
+        browser_binary (str): Explicit browser path or command name
+
+    Returns:
+        str: Absolute path of the browser, or None to let chromedriver use its default
+    """
+    candidates = [browser_binary or os.environ.get("LOOM_BROWSER")]
+    if not candidates[0]:
+        candidates = BROWSER_CANDIDATES.get(sys.platform, BROWSER_CANDIDATES["linux"])
+    for candidate in candidates:
+        if os.path.isabs(candidate):
+            if os.path.exists(candidate):
+                return candidate
+        else:
+            found = shutil.which(candidate)
+            if found:
+                return found
+    if browser_binary:
+        raise FileNotFoundError(f"Browser not found: {browser_binary}")
+    return None
+
+
+def major_version(executable):
+    """
+    Major version reported by `executable --version`.
+
+    Args:
+        executable (str): Browser or chromedriver path
+
+    Returns:
+        int: Major version, or None if it could not be determined
+    """
+    try:
+        output = subprocess.run([executable, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output)
+    return int(match.group(1)) if match else None
+
+
+def _load_cache(cache_file):
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_file, cache):
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    temporary_path = f"{cache_file}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(temporary_path, cache_file)
+
+
+def _browser_key(browser):
+    # A browser update changes the binary's mtime and invalidates the cached entry
+    if browser is None:
+        return "default"
+    return f"{browser}:{int(os.path.getmtime(browser))}"
+
+
+def resolve_driver(browser=None, driver_path=None, cache_file=DEFAULT_CACHE_FILE, offline=False):
+    """
+    Find a chromedriver matching the browser, using the cache whenever possible.
+
+    Resolution order: explicit driver_path, cached entry for this browser build,
+    chromedriver on PATH with the same major version, and finally webdriver-manager
+    (which needs network access the first time).
+
+    Args:
+        browser (str): Browser path from find_browser()
+        driver_path (str): Explicit chromedriver path, used as is
+        cache_file (str): JSON cache of resolved drivers
+        offline (bool): Never download a driver
+
+    Returns:
+        str: chromedriver path, or None to let Selenium Manager resolve one
+    """
+    if driver_path:
+        return driver_path
+
+    key = _browser_key(browser)
+    cache = _load_cache(cache_file)
+    cached = cache.get(key)
+    if cached and os.path.exists(cached.get("driver_path", "")):
+        return cached["driver_path"]
+
+    browser_major = major_version(browser) if browser else None
+    resolved = None
+    path_driver = shutil.which("chromedriver")
+    if path_driver and (browser_major is None or major_version(path_driver) == browser_major):
+        resolved = path_driver
+    elif not offline:
+        try:
+            from webdriver_manager.chrome import ChromeDriverManager
+        except ImportError:
+            ChromeDriverManager = None
+        if ChromeDriverManager is not None:
+            try:
+                resolved = ChromeDriverManager().install()
+            except Exception as e:
+                print(f"Could not download chromedriver: {str(e)}")
+
+    if resolved is None:
+        print("No cached chromedriver found; leaving driver resolution to Selenium")
+        return None
+    cache[key] = {"driver_path": resolved, "browser": browser, "browser_version": browser_major,
+                  "resolved_at": time.time()}
+    try:
+        _save_cache(cache_file, cache)
+    except OSError as e:
+        print(f"Could not write driver cache {cache_file}: {str(e)}")
+    return resolved
+
+
+def attach_options(options, debugger_address=DEFAULT_DEBUGGER_ADDRESS):
+    """
+    Configure Chrome options to attach to an already running browser.
+
+    Args:
+        options (Options): Fresh Chrome options; launch-only settings must not be added
+        debugger_address (str): host:port of the browser's remote debugging endpoint
+
+    Returns:
+        Options: The same options object
+    """
+    options.add_experimental_option("debuggerAddress", debugger_address)
+    return options
+
+
+def prewarm_browser(browser, profile_dir, port=9222, headless=False):
+    """
+    Start a browser in the background with a remote debugging port for later runs to attach to.
+
+    Args:
+        browser (str): Browser path
+        profile_dir (str): Persistent user data directory, keeps the Loom login
+        port (int): Remote debugging port
+        headless (bool): Run without a window
+
+    Returns:
+        subprocess.Popen: The started browser process
+    """
+    profile_dir = os.path.abspath(os.path.expanduser(profile_dir))
+    os.makedirs(profile_dir, exist_ok=True)
+    command = [browser, f"--remote-debugging-port={port}", f"--user-data-dir={profile_dir}",
+               "--no-first-run", "--no-default-browser-check"]
+    if headless:
+        command.append("--headless=new")
+    return subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                            start_new_session=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolve and cache the browser and chromedriver for process.py.')
+    parser.add_argument('command', choices=['resolve', 'prewarm'],
+                        help='resolve: find the browser and driver and prime the cache; '
+                             'prewarm: start a browser process.py can attach to with --attach')
+    parser.add_argument('--browser-binary', type=str, help='Browser path or command name')
+    parser.add_argument('--cache-file', type=str, default=DEFAULT_CACHE_FILE,
+                        help=f'Driver cache file (default: {DEFAULT_CACHE_FILE})')
+    parser.add_argument('--profile-dir', type=str, help='Persistent profile directory for prewarm')
+    parser.add_argument('--port', type=int, default=9222, help='Remote debugging port for prewarm (default: 9222)')
+    parser.add_argument('--headless', action='store_true', help='Prewarm without a browser window')
+    args = parser.parse_args()
+
+    browser = find_browser(args.browser_binary)
+    print(f"Browser: {browser or 'chromedriver default'}")
+    if args.command == 'resolve':
+        driver_path = resolve_driver(browser, cache_file=args.cache_file)
+        print(f"Driver: {driver_path or 'Selenium Manager'}")
+    else:
+        if browser is None:
+            parser.error("No browser found; pass --browser-binary")
+        if not args.profile_dir:
+            parser.error("prewarm needs --profile-dir so the Loom login is kept")
+        process = prewarm_browser(browser, args.profile_dir, args.port, args.headless)
+        print(f"Started browser (pid {process.pid}); attach with: python3 process.py --attach 127.0.0.1:{args.port}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+browser_supervisor.py
+
+Keeps the browsers used by process.py healthy over long runs.
+
+Every worker's driver is wrapped in a SupervisedDriver that tracks the memory (RSS) of its
+chromedriver and Chrome processes and the failure rate of its recent videos. The driver is
+recycled after a fixed number of videos, when its memory crosses a threshold, or when most
+recent videos failed. A driver that crashed or stopped responding is restarted before the
+next video. Replacement browsers receive the current session cookies, so no new login is
+needed.
+"""
+
+import subprocess
+from collections import deque
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from worker_pool import copy_session_cookies, LOOM_BASE_URL
+
+
+def _process_tree_rss_ps(root_pid):
+    # Fallback without psutil: one ps call lists every process with its parent and RSS (KiB)
+    output = subprocess.run(["ps", "-A", "-o", "pid=,ppid=,rss="],
+                            capture_output=True, text=True, check=True).stdout
+    children = {}
+    rss = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) != 3:
+            continue
+        pid, ppid, kib = (int(field) for field in fields)
+        children.setdefault(ppid, []).append(pid)
+        rss[pid] = kib * 1024
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        total += rss.get(pid, 0)
+        pending.extend(children.get(pid, []))
+    return total
+
+
+def process_tree_rss_mb(root_pid):
+    """
+    Resident memory of a process and all of its descendants.
+
+    Args:
+        root_pid (int): Process ID at the top of the tree
+
+    Returns:
+        float: Memory in MB, or None if it cannot be measured
+    """
+    try:
+        if psutil is not None:
+            root = psutil.Process(root_pid)
+            total = 0
+            for process in [root] + root.children(recursive=True):
+                try:
+                    total += process.memory_info().rss
+                except psutil.Error:
+                    pass
+        else:
+            total = _process_tree_rss_ps(root_pid)
+    except Exception:
+        return None
+    return total / (1024 * 1024)
+
+
+def driver_rss_mb(driver):
+    """
+    Resident memory of a driver's chromedriver process and all browser processes under it.
+
+    Args:
+        driver: WebDriver instance started by this script
+
+    Returns:
+        float: Memory in MB, or None if it cannot be measured
+    """
+    try:
+        root_pid = driver.service.process.pid
+    except AttributeError:
+        return None
+    return process_tree_rss_mb(root_pid)
+
+
+def is_driver_alive(driver):
+    """True if the browser still answers WebDriver commands."""
+    try:
+        return driver.execute_script("return 1") == 1
+    except Exception:
+        return False
+
+
+class SupervisedDriver:
+    """A worker's driver together with its health statistics and recycling policy."""
+
+    def __init__(self, driver, create_driver, worker_id=1, cookies=None, base_url=LOOM_BASE_URL,
+                 recycle_after=50, max_memory_mb=2048, error_window=10, max_error_rate=0.6,
+                 max_restart_attempts=3):
+        """
+        Args:
+            driver: Logged-in WebDriver instance to start with
+            create_driver (callable): Called with the worker number, returns a new WebDriver
+            worker_id (int): Worker number, used for logging
+            cookies (list): Session cookies for replacement browsers; read from the
+                driver when not given
+            base_url (str): Loom site root the cookies belong to
+            recycle_after (int): Videos per browser before it is replaced (0 disables)
+            max_memory_mb (float): Replace the browser once its RSS exceeds this (0 disables)
+            error_window (int): Number of recent videos the failure rate is measured over
+            max_error_rate (float): Replace the browser when this share of recent videos failed
+            max_restart_attempts (int): Attempts at starting a replacement browser
+        """
+        self.driver = driver
+        self.create_driver = create_driver
+        self.worker_id = worker_id
+        self.base_url = base_url
+        self.cookies = cookies if cookies is not None else driver.get_cookies()
+        self.recycle_after = recycle_after
+        self.max_memory_mb = max_memory_mb
+        self.recent = deque(maxlen=error_window)
+        self.max_error_rate = max_error_rate
+        self.max_restart_attempts = max_restart_attempts
+        # The driver handed in is owned (and closed) by the caller until it is replaced;
+        # the supervisor then quits it and the caller must not
+        self.original_driver = driver
+        self.retired_original = None
+        self.videos_on_driver = 0
+        self.peak_memory_mb = 0.0
+        self.recycles = 0
+        self.restarts = 0
+
+    def _log(self, message):
+        print(f"[worker {self.worker_id}] {message}")
+
+    def _replace(self, reason):
+        if is_driver_alive(self.driver):
+            # Keep any cookies Loom refreshed since the login
+            try:
+                self.cookies = self.driver.get_cookies() or self.cookies
+            except Exception:
+                pass
+        self._log(f"Replacing browser: {reason}")
+        # Quit the outgoing browser even if it is the caller's, or recycling frees nothing
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        if self.driver is self.original_driver:
+            self.retired_original = self.original_driver
+            self.original_driver = None
+
+        last_error = None
+        for _ in range(self.max_restart_attempts):
+            try:
+                driver = self.create_driver(self.worker_id)
+            except Exception as e:
+                last_error = e
+                self._log(f"Could not start a new browser: {str(e)}")
+                continue
+            copied = copy_session_cookies(self.cookies, driver, self.base_url)
+            self._log(f"New browser started, copied {copied} session cookies")
+            self.driver = driver
+            self.videos_on_driver = 0
+            self.recent.clear()
+            return
+        raise RuntimeError(f"Could not restart the browser after {self.max_restart_attempts} attempts: {last_error}")
+
+    def _recycle_reason(self):
+        if self.recycle_after and self.videos_on_driver >= self.recycle_after:
+            return f"recycling after {self.videos_on_driver} videos"
+        if self.max_memory_mb:
+            memory_mb = driver_rss_mb(self.driver)
+            if memory_mb is not None:
+                self.peak_memory_mb = max(self.peak_memory_mb, memory_mb)
+                if memory_mb > self.max_memory_mb:
+                    return f"memory at {memory_mb:.0f} MB (limit {self.max_memory_mb:.0f} MB)"
+        if len(self.recent) == self.recent.maxlen:
+            failures = self.recent.count(False)
+            if failures / len(self.recent) >= self.max_error_rate:
+                return f"{failures} of the last {len(self.recent)} videos failed"
+        return None
+
+    def run(self, process_video, video_id):
+        """
+        Process one video, recycling or restarting the browser first when needed.
+
+        Args:
+            process_video (callable): Called with (driver, video_id), returns True on success
+            video_id (str): Video ID or URL
+
+        Returns:
+            The result of process_video
+        """
+        if not is_driver_alive(self.driver):
+            self.restarts += 1
+            self._replace("browser crashed or stopped responding")
+        else:
+            reason = self._recycle_reason()
+            if reason:
+                self.recycles += 1
+                self._replace(reason)
+
+        result = None
+        try:
+            result = process_video(self.driver, video_id)
+        finally:
+            self.videos_on_driver += 1
+            self.recent.append(bool(result))
+        return result
+
+    def retired(self, driver):
+        """True if driver was handed to this supervisor and has since been replaced and quit by it."""
+        return driver is not None and driver is self.retired_original
+
+    def close(self):
+        """
+        Quit any replacement browser; the original driver is left to its owner unless it
+        was replaced, see retired().
+
+        Returns:
+            dict: Number of recycles and crash restarts, and the peak memory seen in MB
+        """
+        if self.driver is not self.original_driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                self._log(f"Error while closing the browser: {str(e)}")
+        return {"recycles": self.recycles, "restarts": self.restarts, "peak_memory_mb": self.peak_memory_mb}
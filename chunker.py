@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+chunker.py
+
+Token-budgeted chunks of the LLM-ready transcripts, aligned on their [MM:SS] segments.
+
+Every _llm.txt file is split between segments into chunks that stay under a token budget,
+each chunk repeating the last segments of the one before it up to an overlap budget. Tokens
+are estimated offline with estimate_tokens(). The chunks are not written out as text: the
+chunk index (.chunks.jsonl in the transcript directory) records the file, chunk id, start
+and end time, byte offsets and token count of every chunk, and read_chunk() seeks straight
+to one. Rebuilding the index only re-chunks files that changed since it was written.
+
+Usage:
+    python chunker.py build llm_ready_transcripts [--max-tokens 2000] [--overlap 200]
+    python chunker.py show llm_ready_transcripts "Some video - 1 May 2024 - 0123abcd_llm.txt" 3
+"""
+
+import argparse
+import json
+import os
+import re
+from array import array
+
+from near_duplicates import load_duplicates
+from segments import Segments
+
+CHUNK_INDEX_FILENAME = ".chunks.jsonl"
+
+# Words count as one token per 6 characters, every other non-space character as one token
+TOKEN_PIECE = re.compile(r'\w{1,6}|[^\w\s]')
+
+# Bumped whenever estimate_tokens() or the chunking rules change, so indexes are rebuilt
+CHUNKER_VERSION = 1
+
+
+def estimate_tokens(text):
+    """
+    Offline estimate of the number of LLM tokens in a text.
+
+    Close to what BPE tokenizers produce for English prose, and additive over text pieces
+    split at whitespace, so a chunk's count is the sum of its segments' counts.
+    """
+    return len(TOKEN_PIECE.findall(text))
+
+
+class Chunk:
+    """One chunk of a transcript, as produced by chunk_segments()."""
+
+    __slots__ = ("chunk_id", "first", "last", "start", "end", "offset", "end_offset", "tokens")
+
+    def __init__(self, chunk_id, first, last, start, end, offset, end_offset, tokens):
+        self.chunk_id = chunk_id
+        self.first = first
+        self.last = last
+        self.start = start
+        self.end = end
+        self.offset = offset
+        self.end_offset = end_offset
+        self.tokens = tokens
+
+
+def chunk_segments(segments, max_tokens, overlap=0):
+    """
+    Split segments into chunks of whole segments under a token budget.
+
+    A chunk starts at a segment's timestamp marker and ends with the text of a later
+    segment. A segment that is over the budget on its own becomes a chunk by itself.
+
+    Args:
+        segments (Segments): Segments of a cleaned transcript
+        max_tokens (int): Token budget of a chunk
+        overlap (int): Tokens of trailing segments a chunk repeats from the one before it
+
+    Returns:
+        list: Chunk records, with character offsets into segments.text
+    """
+    text = segments.text
+    count = len(segments)
+    # Character span and token count of every segment including its marker
+    spans = array('l')
+    tokens = array('l')
+    previous_end = 0
+    for index in range(count):
+        offset = segments.offsets[index]
+        end = offset + segments.lengths[index]
+        span_start = previous_end
+        while span_start < offset and text[span_start].isspace():
+            span_start += 1
+        spans.append(span_start)
+        tokens.append(estimate_tokens(text[span_start:end]))
+        previous_end = end
+
+    chunks = []
+    first = 0
+    while first < count:
+        last = first
+        total = tokens[first]
+        while last + 1 < count and total + tokens[last + 1] <= max_tokens:
+            last += 1
+            total += tokens[last]
+        end_offset = segments.offsets[last] + segments.lengths[last]
+        chunks.append(Chunk(len(chunks), first, last, segments.start(first), segments.end(last),
+                            spans[first], end_offset, total))
+        if last + 1 >= count:
+            break
+        # Step back over the trailing segments that fit the overlap, always moving forward
+        next_first = last + 1
+        repeated = 0
+        while next_first - 1 > first and repeated + tokens[next_first - 1] <= overlap:
+            next_first -= 1
+            repeated += tokens[next_first]
+        first = next_first
+    return chunks
+
+
+def byte_offsets(text, offsets):
+    """UTF-8 byte offsets of ascending character offsets into text."""
+    if text.isascii():
+        return list(offsets)
+    result = []
+    position = 0
+    size = 0
+    for offset in offsets:
+        size += len(text[position:offset].encode("utf-8"))
+        position = offset
+        result.append(size)
+    return result
+
+
+def chunk_records(path, max_tokens, overlap=0):
+    """
+    Chunk index records of one LLM-ready transcript.
+
+    Returns:
+        list: One dict per chunk with file, chunk, start, end, byte_start, byte_end and tokens
+    """
+    segments = Segments.from_file(path)
+    chunks = chunk_segments(segments, max_tokens, overlap)
+    # Chunks are in text order, and so are their start and end offsets
+    starts = byte_offsets(segments.text, [chunk.offset for chunk in chunks])
+    ends = byte_offsets(segments.text, [chunk.end_offset for chunk in chunks])
+    name = os.path.basename(path)
+    return [{"file": name, "chunk": chunk.chunk_id, "start": chunk.start, "end": chunk.end,
+             "byte_start": byte_start, "byte_end": byte_end, "tokens": chunk.tokens}
+            for chunk, byte_start, byte_end in zip(chunks, starts, ends)]
+
+
+def load_chunk_index(directory):
+    """
+    Read the chunk index of a transcript directory.
+
+    Returns:
+        tuple: (header, records) where header holds the settings and file fingerprints the
+            index was built with, or (None, []) if there is no readable index
+    """
+    path = os.path.join(directory, CHUNK_INDEX_FILENAME)
+    if not os.path.exists(path):
+        return None, []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            records = [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable chunk index {path}: {str(e)}")
+        return None, []
+    return header, records
+
+
+def build_chunk_index(directory, max_tokens, overlap=0, force=False, skip=()):
+    """
+    Write the chunk index of a directory of LLM-ready transcripts.
+
+    Files with the same modification time and size as when the existing index was built
+    keep their records, unless the budget, overlap or chunker version changed.
+
+    Args:
+        directory (str): Directory of _llm.txt files
+        max_tokens (int): Token budget of a chunk
+        overlap (int): Tokens of trailing segments a chunk repeats from the one before it
+        force (bool): Re-chunk every file
+        skip (set): File names to leave out of the index, such as near-duplicates
+
+    Returns:
+        tuple: (files chunked, files kept, number of chunks)
+    """
+    header, records = load_chunk_index(directory)
+    settings = {"version": CHUNKER_VERSION, "max_tokens": max_tokens, "overlap": overlap}
+    reusable = not force and header is not None and all(header.get(key) == value for key, value in settings.items())
+    previous_files = header.get("files", {}) if reusable else {}
+    previous_records = {}
+    for record in records if reusable else []:
+        previous_records.setdefault(record["file"], []).append(record)
+
+    files = {}
+    new_records = []
+    chunked = kept = 0
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        if not entry.name.endswith("_llm.txt") or entry.name in skip or not entry.is_file():
+            continue
+        stat = entry.stat()
+        fingerprint = [stat.st_mtime_ns, stat.st_size]
+        files[entry.name] = fingerprint
+        if previous_files.get(entry.name) == fingerprint and entry.name in previous_records:
+            new_records.extend(previous_records[entry.name])
+            kept += 1
+            continue
+        try:
+            new_records.extend(chunk_records(entry.path, max_tokens, overlap))
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Error chunking {entry.name}: {str(e)}")
+            del files[entry.name]
+            continue
+        chunked += 1
+
+    path = os.path.join(directory, CHUNK_INDEX_FILENAME)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(dict(settings, files=files), ensure_ascii=False) + "\n")
+        for record in new_records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(temporary_path, path)
+    return chunked, kept, len(new_records)
+
+
+def read_chunk(directory, record):
+    """Text of a chunk index record, read from its transcript by byte offsets."""
+    with open(os.path.join(directory, record["file"]), "rb") as f:
+        f.seek(record["byte_start"])
+        return f.read(record["byte_end"] - record["byte_start"]).decode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Split LLM-ready transcripts into token-budgeted chunks.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help='Write the chunk index of a transcript directory')
+    build.add_argument('directory', nargs='?', default="llm_ready_transcripts",
+                       help='Directory of _llm.txt files (default: llm_ready_transcripts)')
+    build.add_argument('--max-tokens', type=int, default=2000, help='Token budget of a chunk (default: 2000)')
+    build.add_argument('--overlap', type=int, default=200,
+                       help='Tokens a chunk repeats from the one before it (default: 200)')
+    build.add_argument('--force', action='store_true', help='Re-chunk files that did not change')
+    build.add_argument('--skip-duplicates', action='store_true',
+                       help='Leave out the near-duplicates recorded by near_duplicates.py')
+    show = subparsers.add_parser('show', help='Print one chunk of a transcript')
+    show.add_argument('directory', help='Directory of _llm.txt files')
+    show.add_argument('file', help='Transcript file name')
+    show.add_argument('chunk', type=int, help='Chunk id')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"Not a directory: {args.directory}")
+
+    if args.command == 'build':
+        if args.max_tokens < 1 or not 0 <= args.overlap < args.max_tokens:
+            parser.error("--max-tokens must be positive and --overlap between 0 and --max-tokens")
+        skip = load_duplicates(args.directory) if args.skip_duplicates else ()
+        chunked, kept, chunks = build_chunk_index(args.directory, args.max_tokens, args.overlap, args.force, skip)
+        print(f"Chunked {chunked} transcripts, kept {kept} unchanged, {chunks} chunks in "
+              f"{os.path.join(args.directory, CHUNK_INDEX_FILENAME)}")
+    else:
+        _, records = load_chunk_index(args.directory)
+        file_name = os.path.basename(args.file)
+        for record in records:
+            if record["file"] == file_name and record["chunk"] == args.chunk:
+                print(f"# {file_name} chunk {record['chunk']}, {record['start']:g}-{record['end']:g}s, "
+                      f"~{record['tokens']} tokens")
+                print(read_chunk(args.directory, record))
+                break
+        else:
+            print(f"No chunk {args.chunk} of {file_name} in the chunk index; run 'python chunker.py build' first")
+
+
+if __name__ == "__main__":
+    main()
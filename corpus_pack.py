@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+corpus_pack.py
+
+Packed transcript archive: one append-only data file and a memory-mapped index.
+
+A directory of transcripts costs a directory listing and an open/close per file, and
+thousands of small files with long names are slow to copy between machines. A pack holds
+them in two files:
+
+- ARCHIVE (the data file) stores every record as its file name followed by its content,
+  zlib-compressed with --compress. Records are only ever appended; packing a changed file
+  again appends a new record and the index points to it from then on. Records of files
+  deleted from the directory stay in the pack until it is packed with --prune, which
+  rewrites the data file with only the records of the files still there.
+- ARCHIVE.idx is a fixed-width open-addressing hash table keyed by the 16 bytes of the
+  video ID. It is memory-mapped by CorpusReader, so a lookup by video ID reads one or two
+  slots whatever the size of the archive.
+
+iter_transcripts() reads a pack or a directory alike, so scripts that take a transcript
+directory can take a pack instead.
+
+Usage:
+    python corpus_pack.py pack llm_ready_transcripts transcripts.pack [--compress] [--prune]
+    python corpus_pack.py unpack transcripts.pack restored_transcripts
+    python corpus_pack.py cat transcripts.pack 638e3f2305f8406a901843e419bf5141
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+
+from manifest import VIDEO_ID_PATTERN
+
+DATA_MAGIC = b"LOOMPAK1"
+INDEX_MAGIC = b"LOOMIDX1"
+
+# Index header: magic, number of slots (a power of two), number of records
+INDEX_HEADER = struct.Struct("<8sQQ")
+
+# Index slot: key, data offset, stored length, text length, CRC-32 of the text,
+# file name length, flags
+INDEX_SLOT = struct.Struct("<16sQIIIHB1x")
+
+FLAG_COMPRESSED = 1
+
+_EMPTY_KEY = bytes(16)
+
+
+def record_key(name):
+    """
+    16-byte index key of a file name, video ID or share URL: the video ID it contains, a
+    hash of the name for files without one.
+    """
+    # The video ID comes last in file names, which may also contain hex wallet addresses
+    video_ids = VIDEO_ID_PATTERN.findall(name)
+    if video_ids:
+        return bytes.fromhex(video_ids[-1])
+    return hashlib.blake2b(name.encode("utf-8"), digest_size=16).digest()
+
+
+def index_path(archive):
+    return f"{archive}.idx"
+
+
+def _slot_of(key, capacity):
+    return int.from_bytes(key[:8], "little") & (capacity - 1)
+
+
+def _write_index(archive, slots):
+    """Write the index of key -> slot values atomically, sized to stay at most half full."""
+    capacity = 16
+    while capacity < 2 * len(slots):
+        capacity *= 2
+    table = bytearray(INDEX_HEADER.size + capacity * INDEX_SLOT.size)
+    INDEX_HEADER.pack_into(table, 0, INDEX_MAGIC, capacity, len(slots))
+    for key, values in slots.items():
+        slot = _slot_of(key, capacity)
+        position = INDEX_HEADER.size + slot * INDEX_SLOT.size
+        while table[position:position + 16] != _EMPTY_KEY:
+            slot = (slot + 1) & (capacity - 1)
+            position = INDEX_HEADER.size + slot * INDEX_SLOT.size
+        INDEX_SLOT.pack_into(table, position, key, *values)
+    temporary_path = f"{index_path(archive)}.tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(table)
+    os.replace(temporary_path, index_path(archive))
+
+
+class CorpusReader:
+    """Random access to the records of a pack by video ID."""
+
+    def __init__(self, archive):
+        """
+        Args:
+            archive (str): Path of the pack's data file; its index is ARCHIVE.idx
+
+        Raises:
+            ValueError: If either file is not part of a pack
+        """
+        self.archive = archive
+        self.data_file = open(archive, "rb")
+        self.index_file = open(index_path(archive), "rb")
+        try:
+            if self.data_file.read(len(DATA_MAGIC)) != DATA_MAGIC:
+                raise ValueError(f"{archive} is not a transcript pack")
+            self.data = mmap.mmap(self.data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.index = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.capacity, self.count = INDEX_HEADER.unpack_from(self.index, 0)
+            if magic != INDEX_MAGIC:
+                raise ValueError(f"{index_path(archive)} is not a transcript pack index")
+        except Exception:
+            self.data_file.close()
+            self.index_file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _find(self, key):
+        # Slot values of a key, None if it is not in the pack
+        slot = _slot_of(key, self.capacity)
+        while True:
+            values = INDEX_SLOT.unpack_from(self.index, INDEX_HEADER.size + slot * INDEX_SLOT.size)
+            if values[0] == key:
+                return values
+            if values[0] == _EMPTY_KEY:
+                return None
+            slot = (slot + 1) & (self.capacity - 1)
+
+    def _read(self, values):
+        _, offset, stored_length, _, _, name_length, flags = values
+        name = self.data[offset:offset + name_length].decode("utf-8")
+        content = self.data[offset + name_length:offset + name_length + stored_length]
+        if flags & FLAG_COMPRESSED:
+            content = zlib.decompress(content)
+        return name, content.decode("utf-8")
+
+    def __contains__(self, video_id):
+        return self._find(record_key(video_id)) is not None
+
+    def get(self, video_id):
+        """
+        Record of a video.
+
+        Args:
+            video_id (str): Video ID, share URL or packed file name
+
+        Returns:
+            tuple: (file name, text), None if the video is not in the pack
+        """
+        values = self._find(record_key(video_id))
+        return None if values is None else self._read(values)
+
+    def slots(self):
+        """Index slot values of every record, in the order the records were written."""
+        found = []
+        for slot in range(self.capacity):
+            values = INDEX_SLOT.unpack_from(self.index, INDEX_HEADER.size + slot * INDEX_SLOT.size)
+            if values[0] != _EMPTY_KEY:
+                found.append(values)
+        found.sort(key=lambda values: values[1])
+        return found
+
+    def names(self):
+        """File names of every record, in the order the records were written, without reading their text."""
+        return [self.data[values[1]:values[1] + values[5]].decode("utf-8") for values in self.slots()]
+
+    def __iter__(self):
+        """(file name, text) of every record, in the order the records were written."""
+        for values in self.slots():
+            yield self._read(values)
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+        self.data_file.close()
+        self.index_file.close()
+
+
+def _rewrite(archive, slots):
+    """
+    Rewrite the data file of a pack with only the records of the given slots, copied
+    as stored, and return their slots at their new offsets.
+    """
+    temporary_path = f"{archive}.tmp"
+    new_slots = {}
+    with open(archive, "rb") as source, open(temporary_path, "wb") as target:
+        target.write(DATA_MAGIC)
+        for key, values in sorted(slots.items(), key=lambda item: item[1][0]):
+            offset, stored_length, _, _, name_length, _ = values
+            source.seek(offset)
+            new_slots[key] = (target.tell(),) + tuple(values[1:])
+            target.write(source.read(name_length + stored_length))
+        target.flush()
+        os.fsync(target.fileno())
+    os.replace(temporary_path, archive)
+    return new_slots
+
+
+def pack_directory(directory, archive, compress=False, suffix=".txt", prune=False):
+    """
+    Append the transcripts of a directory to a pack, created if missing.
+
+    Files whose text is already in the pack under their video ID are not appended again.
+    Without prune, records of files no longer in the directory stay in the pack.
+
+    Args:
+        directory (str): Directory of transcripts
+        archive (str): Path of the pack's data file
+        compress (bool): zlib-compress the appended records
+        suffix (str): Ending of the file names to pack
+        prune (bool): Rewrite the data file without the records of files no longer in the
+            directory and without records replaced by newer ones
+
+    Returns:
+        tuple: (records appended, records already in the pack, records of deleted files pruned)
+    """
+    slots = {}
+    if os.path.exists(archive) and os.path.exists(index_path(archive)):
+        with CorpusReader(archive) as reader:
+            slots = {values[0]: values[1:] for values in reader.slots()}
+    elif os.path.exists(archive) and os.path.getsize(archive):
+        raise ValueError(f"{archive} has no index {index_path(archive)}")
+
+    appended = unchanged = 0
+    present = set()
+    with open(archive, "ab") as data:
+        if data.tell() == 0:
+            data.write(DATA_MAGIC)
+        for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+            if not entry.name.endswith(suffix) or not entry.is_file():
+                continue
+            with open(entry.path, "rb") as f:
+                content = f.read()
+            content.decode("utf-8")
+            key = record_key(entry.name)
+            present.add(key)
+            checksum = zlib.crc32(content)
+            known = slots.get(key)
+            if known is not None and known[2:4] == (len(content), checksum):
+                unchanged += 1
+                continue
+            name = entry.name.encode("utf-8")
+            stored = zlib.compress(content) if compress else content
+            slots[key] = (data.tell(), len(stored), len(content), checksum, len(name),
+                          FLAG_COMPRESSED if compress else 0)
+            data.write(name)
+            data.write(stored)
+            appended += 1
+        data.flush()
+        os.fsync(data.fileno())
+    pruned = 0
+    if prune:
+        pruned = len(slots) - len(present)
+        slots = _rewrite(archive, {key: values for key, values in slots.items() if key in present})
+    # The index only points at records once they are on disk
+    _write_index(archive, slots)
+    return appended, unchanged, pruned
+
+
+def is_pack(path):
+    """True if path is the data file of a pack, judged by its index file next to it."""
+    return os.path.isfile(path) and os.path.isfile(index_path(path))
+
+
+def iter_transcripts(source, suffix=".txt"):
+    """
+    (file name, text) of every transcript of a pack or a directory, in name order for
+    directories and in packing order for packs.
+
+    Args:
+        source (str): Directory, or data file of a pack
+        suffix (str): Ending of the file names to read from a directory
+    """
+    if os.path.isdir(source):
+        for entry in sorted(os.scandir(source), key=lambda entry: entry.name):
+            if entry.is_file() and entry.name.endswith(suffix):
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    yield entry.name, f.read()
+        return
+    with CorpusReader(source) as reader:
+        yield from reader
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack transcripts into one archive with a memory-mapped index.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    pack = subparsers.add_parser('pack', help='Append the transcripts of a directory to an archive',
+                                 description='Append new and changed transcripts of a directory to an archive. '
+                                             'The archive is append-only: records of deleted files and old '
+                                             'versions of changed files stay in it until --prune rewrites it.')
+    pack.add_argument('directory', help='Directory of transcripts')
+    pack.add_argument('archive', help='Archive data file, created if missing; its index is ARCHIVE.idx')
+    pack.add_argument('--compress', action='store_true', help='zlib-compress every appended record')
+    pack.add_argument('--suffix', type=str, default=".txt", help='Ending of the files to pack (default: .txt)')
+    pack.add_argument('--prune', action='store_true',
+                      help='Rewrite the archive with only the records of the files now in the directory')
+    unpack = subparsers.add_parser('unpack', help='Write every record of an archive to a directory')
+    unpack.add_argument('archive', help='Archive data file')
+    unpack.add_argument('directory', help='Directory to write the transcripts to')
+    cat = subparsers.add_parser('cat', help='Print the transcript of a video')
+    cat.add_argument('archive', help='Archive data file')
+    cat.add_argument('video_id', help='Video ID, share URL or file name')
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        if not os.path.isdir(args.directory):
+            parser.error(f"Not a directory: {args.directory}")
+        try:
+            appended, unchanged, pruned = pack_directory(args.directory, args.archive, args.compress, args.suffix,
+                                                         args.prune)
+        except (ValueError, UnicodeDecodeError) as e:
+            parser.error(str(e))
+        print(f"Packed {appended} transcripts, {unchanged} already in {args.archive}, {pruned} pruned "
+              f"({os.path.getsize(args.archive)} bytes)")
+        return
+
+    try:
+        reader = CorpusReader(args.archive)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    with reader:
+        if args.command == 'cat':
+            record = reader.get(args.video_id)
+            if record is None:
+                print(f"{args.video_id} is not in {args.archive}")
+                exit(1)
+            print(record[1])
+            return
+        os.makedirs(args.directory, exist_ok=True)
+        count = 0
+        for name, text in reader:
+            with open(os.path.join(args.directory, os.path.basename(name)), "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+            count += 1
+        print(f"Unpacked {count} transcripts to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
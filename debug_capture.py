@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+debug_capture.py
+
+Debug artifact capture for process.py, controlled by --debug-level.
+
+- full: every screenshot, page source dump and element listing is written for every video
+  (the original behaviour).
+- failure: only cheap snapshots (step name, elapsed time, a few details) are kept in an
+  in-memory ring buffer. Screenshots, page source and element listings are written to
+  debug_screenshots/ and debug_output/ only when extraction fails for a video.
+- off: nothing is captured.
+"""
+
+import json
+import os
+import time
+from collections import deque
+
+from selenium.webdriver.common.by import By
+
+DEBUG_LEVELS = ("off", "failure", "full")
+SCREENSHOT_DIR = "debug_screenshots"
+DEBUG_OUTPUT_DIR = "debug_output"
+
+
+def comprehensive_debug(driver, video_id, debug_dir=DEBUG_OUTPUT_DIR):
+    """
+    Save page source, button details and shadow DOM hosts of the current page.
+
+    Args:
+        driver: WebDriver instance
+        video_id (str): Video ID, used in the output file names
+        debug_dir (str): Directory for the debug files
+    """
+    os.makedirs(debug_dir, exist_ok=True)
+    
+    # 1. Save page source to file
+    page_source_path = os.path.join(debug_dir, f"page_source_{video_id.replace('/', '_')}.html")
+    with open(page_source_path, "w", encoding="utf-8") as f:
+        f.write(driver.page_source)
+    print(f"Page source saved to {page_source_path}")
+    
+    # 2. Check for iframes
+    iframes = driver.find_elements(By.TAG_NAME, "iframe")
+    print(f"Found {len(iframes)} iframes on the page")
+    for i, iframe in enumerate(iframes):
+        iframe_id = iframe.get_attribute("id") or "no-id"
+        iframe_src = iframe.get_attribute("src") or "no-src"
+        print(f"  Iframe {i+1}: ID={iframe_id}, Src={iframe_src}")
+    
+    # 3. List all buttons
+    buttons = driver.find_elements(By.TAG_NAME, "button")
+    print(f"Found {len(buttons)} buttons on the page")
+    buttons_info = []
+    for i, button in enumerate(buttons):
+        try:
+            button_text = button.text
+            button_class = button.get_attribute("class") or "no-class"
+            button_id = button.get_attribute("id") or "no-id"
+            is_displayed = button.is_displayed()
+            is_enabled = button.is_enabled()
+            buttons_info.append({
+                "index": i+1,
+                "text": button_text,
+                "class": button_class,
+                "id": button_id,
+                "is_displayed": is_displayed,
+                "is_enabled": is_enabled
+            })
+            print(f"  Button {i+1}: '{button_text[:30]}{'...' if len(button_text) > 30 else ''}', " +
+                  f"Class={button_class}, ID={button_id}, " +
+                  f"Displayed={is_displayed}, Enabled={is_enabled}")
+        except Exception as e:
+            print(f"  Button {i+1}: Error getting details: {str(e)}")
+    
+    # Save buttons info to file
+    buttons_info_path = os.path.join(debug_dir, f"buttons_info_{video_id.replace('/', '_')}.json")
+    with open(buttons_info_path, "w", encoding="utf-8") as f:
+        json.dump(buttons_info, f, indent=2)
+    print(f"Buttons info saved to {buttons_info_path}")
+    
+    # 4. Check for shadow DOM elements
+    print("Checking for shadow DOM elements...")
+    shadow_hosts = driver.execute_script("""
+        return Array.from(document.querySelectorAll('*')).filter(
+            el => el.shadowRoot !== null
+        ).map(el => {
+            return {
+                tag: el.tagName.toLowerCase(),
+                id: el.id || 'no-id',
+                class: el.className || 'no-class'
+            };
+        });
+    """)
+    
+    print(f"Found {len(shadow_hosts)} shadow DOM hosts on the page")
+    for i, host in enumerate(shadow_hosts):
+        print(f"  Shadow Host {i+1}: <{host['tag']}> ID={host['id']}, Class={host['class']}")
+    
+    # Save shadow host info to file
+    shadow_info_path = os.path.join(debug_dir, f"shadow_dom_info_{video_id.replace('/', '_')}.json")
+    with open(shadow_info_path, "w", encoding="utf-8") as f:
+        json.dump(shadow_hosts, f, indent=2)
+    print(f"Shadow DOM info saved to {shadow_info_path}")
+
+
+def log_keyword_elements(driver):
+    """Print details, XPath and parent of every element mentioning Transcript, Activity or Download."""
+    print("\n--- DEBUG: Searching for relevant elements ---")
+    for keyword in ["Transcript", "Activity", "Download"]:
+        elements = driver.find_elements(By.XPATH, f"//*[contains(text(), '{keyword}')]")
+        print(f"\nFound {len(elements)} elements containing '{keyword}':")
+        for i, element in enumerate(elements):
+            tag_name = element.tag_name
+            try:
+                element_text = element.text
+                element_class = element.get_attribute("class") or "no-class"
+                element_id = element.get_attribute("id") or "no-id"
+                is_displayed = element.is_displayed()
+                is_enabled = element.is_enabled()
+                
+                # Get the XPath of the element
+                xpath = driver.execute_script("""
+                    function getPathTo(element) {
+                        if (element.id !== '')
+                            return '//*[@id="' + element.id + '"]';
+                        if (element === document.body)
+                            return '/html/body';
+                        
+                        var ix = 0;
+                        var siblings = element.parentNode.childNodes;
+                        for (var i = 0; i < siblings.length; i++) {
+                            var sibling = siblings[i];
+                            if (sibling === element)
+                                return getPathTo(element.parentNode) + '/' + element.tagName.toLowerCase() + '[' + (ix + 1) + ']';
+                            if (sibling.nodeType === 1 && sibling.tagName === element.tagName)
+                                ix++;
+                        }
+                    }
+                    return getPathTo(arguments[0]);
+                """, element)
+                
+                print(f"  {i+1}. <{tag_name}> - Text: '{element_text[:30]}{'...' if len(element_text) > 30 else ''}' - Class: {element_class}")
+                print(f"     ID: {element_id}, Displayed: {is_displayed}, Enabled: {is_enabled}")
+                print(f"     XPath: {xpath}")
+                
+                # Print parent element info to understand context
+                try:
+                    parent = driver.execute_script("return arguments[0].parentNode;", element)
+                    parent_tag = driver.execute_script("return arguments[0].tagName;", parent).lower()
+                    parent_class = driver.execute_script("return arguments[0].className;", parent) or "no-class"
+                    print(f"     Parent: <{parent_tag}> - Class: {parent_class}")
+                except:
+                    print("     Could not get parent info")
+            except Exception as e:
+                print(f"  {i+1}. <{tag_name}> - Error getting details: {str(e)}")
+    print("--- END DEBUG ---\n")
+
+
+def log_tab_elements(driver):
+    """Print the elements of interest that are present after switching to the Transcript tab."""
+    print("\n--- DEBUG: Elements after switching to Transcript tab ---")
+    for keyword in ["Download", "Toggle", "Transcript", "Copy", "Action"]:
+        elements = driver.find_elements(By.XPATH, f"//*[contains(text(), '{keyword}')]")
+        print(f"\nFound {len(elements)} elements containing '{keyword}' after tab switch:")
+        for i, element in enumerate(elements):
+            tag_name = element.tag_name
+            try:
+                element_text = element.text
+                element_class = element.get_attribute("class") or "no-class"
+                element_id = element.get_attribute("id") or "no-id"
+                is_displayed = element.is_displayed()
+                print(f"  {i+1}. <{tag_name}> - Text: '{element_text[:30]}{'...' if len(element_text) > 30 else ''}' - Class: {element_class}")
+                print(f"     ID: {element_id}, Displayed: {is_displayed}")
+            except Exception as e:
+                print(f"  {i+1}. <{tag_name}> - Error getting details: {str(e)}")
+    print("--- END DEBUG ---\n")
+
+
+class DebugRecorder:
+    """
+    Collects debug state for a single video according to the debug level.
+
+    In failure mode the recorder never talks to the browser until flush() is called, so a
+    successful video costs no extra WebDriver round trips or disk writes.
+    """
+
+    def __init__(self, driver, video_id, level="failure", ring_size=20,
+                 screenshot_dir=SCREENSHOT_DIR, debug_dir=DEBUG_OUTPUT_DIR):
+        """
+        Args:
+            driver: WebDriver instance
+            video_id (str): Video ID or URL being processed
+            level (str): One of DEBUG_LEVELS
+            ring_size (int): Number of snapshots kept in memory
+            screenshot_dir (str): Directory for screenshots
+            debug_dir (str): Directory for page sources and JSON files
+        """
+        self.driver = driver
+        self.video_id = video_id
+        self.safe_id = video_id.replace('/', '_')
+        self.level = level
+        self.snapshots = deque(maxlen=ring_size)
+        self.screenshot_dir = screenshot_dir
+        self.debug_dir = debug_dir
+        self.started = time.monotonic()
+
+    @property
+    def full(self):
+        return self.level == "full"
+
+    def snapshot(self, step, **details):
+        """Record a cheap in-memory snapshot of the current step."""
+        if self.level == "off":
+            return
+        self.snapshots.append(dict(step=step, elapsed=round(time.monotonic() - self.started, 3), **details))
+
+    def screenshot(self, name):
+        """
+        Save a screenshot named {name}_{video_id}.png in full mode, otherwise only record the step.
+
+        Returns:
+            str: Path of the screenshot, or None if it was not taken
+        """
+        self.snapshot(name)
+        if not self.full:
+            return None
+        os.makedirs(self.screenshot_dir, exist_ok=True)
+        screenshot_path = os.path.join(self.screenshot_dir, f"{name}_{self.safe_id}.png")
+        self.driver.save_screenshot(screenshot_path)
+        return screenshot_path
+
+    def page_details(self):
+        """Dump page source, buttons and shadow DOM hosts in full mode."""
+        if self.full:
+            comprehensive_debug(self.driver, self.video_id, self.debug_dir)
+
+    def keyword_elements(self):
+        if self.full:
+            log_keyword_elements(self.driver)
+
+    def tab_elements(self):
+        if self.full:
+            log_tab_elements(self.driver)
+
+    def flush(self, reason):
+        """
+        Write failure artifacts. In failure mode this is the only point where the page is
+        inspected: snapshots, a screenshot and the full page details are written.
+
+        Args:
+            reason (str): Why the video failed, stored with the snapshots
+        """
+        if self.level == "off":
+            return
+        self.snapshot("failure", reason=reason)
+        os.makedirs(self.debug_dir, exist_ok=True)
+        snapshots_path = os.path.join(self.debug_dir, f"snapshots_{self.safe_id}.json")
+        with open(snapshots_path, "w", encoding="utf-8") as f:
+            json.dump(list(self.snapshots), f, indent=2)
+        print(f"Debug snapshots saved to {snapshots_path}")
+
+        try:
+            os.makedirs(self.screenshot_dir, exist_ok=True)
+            failure_screenshot_path = os.path.join(self.screenshot_dir, f"extraction_failed_{self.safe_id}.png")
+            self.driver.save_screenshot(failure_screenshot_path)
+            print(f"Failure screenshot saved to {failure_screenshot_path}")
+            # Full mode already wrote the page details after loading
+            if not self.full:
+                comprehensive_debug(self.driver, self.video_id, self.debug_dir)
+        except Exception as e:
+            print(f"Could not capture failure state: {str(e)}")
@@ -7,106 +7,88 @@ while preserving folder integrity for future runs without overlap.
 """
 
 import os
-import re
 import time
-import string
 import argparse
+import multiprocessing
 from pathlib import Path
 
-# Import essential functions from process_transcripts_for_llm.py
-def clean_transcript(text):
+from corpus_pack import CorpusReader, is_pack
+from output_index import OutputIndex, refresh_output
+from search_index import SearchIndex
+from near_duplicates import DuplicateDetector, print_clusters
+
+def clean_file(job):
     """
-    Process transcript text to make it LLM-friendly.
-    
+    Regenerate one LLM-ready transcript if it is stale; runs in the worker processes of --jobs.
+
     Args:
-        text (str): Raw transcript text
-    
+        job (tuple): (source_path, target_path, index entry, force, whether the target exists,
+            transcript text and stat of a packed transcript or None for a file)
+
     Returns:
-        str: Cleaned and formatted transcript text
+        tuple: (source_path, target_path, status, new index entry, error message or None);
+            status is "fresh", "unchanged" or "written" as returned by refresh_output()
     """
-    # Step 1: Preserve timestamps by standardizing their format to [HH:MM:SS]
-    # This regex matches common timestamp formats and standardizes them
-    text = re.sub(r'(\[?\(?\s*)(\d{1,2}:\d{2}(?::\d{2})?)\s*(?:\]|\))?', r'[\2]', text)
-    
-    # Step 2: Normalize line breaks and ensure speaker names are properly formatted
-    # This helps maintain the conversation structure
-    text = re.sub(r'\n{3,}', '\n\n', text)  # Replace excessive newlines with double newlines
-    
-    # Step 3: Fix common punctuation issues
-    # Remove duplicate punctuation and ensure proper spacing
-    text = re.sub(r'([.!?])\s*([.!?])+', r'\1', text)  # Remove duplicate punctuation
-    text = re.sub(r'\s+([.,;:!?])', r'\1', text)  # Remove space before punctuation
-    text = re.sub(r'([.,;:!?])([^\s\d])', r'\1 \2', text)  # Add space after punctuation if missing
-    
-    # Step 4: Normalize whitespace
-    # Remove trailing/leading whitespace from each line and collapse multiple spaces
-    lines = [line.strip() for line in text.split('\n')]
-    text = '\n'.join(lines)
-    text = re.sub(r' +', ' ', text)  # Replace multiple spaces with a single space
-    
-    # Step 5: Remove empty lines while preserving paragraph structure
-    lines = text.split('\n')
-    non_empty_lines = []
-    for i, line in enumerate(lines):
-        # Keep the line if it's not empty or if it's a deliberate paragraph break
-        if line.strip() or (i > 0 and i < len(lines) - 1 and lines[i-1].strip() and lines[i+1].strip()):
-            non_empty_lines.append(line)
-    
-    # Step 6: Final cleanup - remove any remaining problematic characters
-    # (but carefully preserve important special characters)
-    text = '\n'.join(non_empty_lines)
-    
-    # Filter out any non-printable characters except for common line breaks
-    printable_chars = set(string.printable)
-    text = ''.join(c for c in text if c in printable_chars)
-    
-    return text
+    source_path, target_path, entry, force, output_exists, text, source_stat = job
+    try:
+        status, entry = refresh_output(source_path, target_path, entry, force=force, text=text,
+                                       output_exists=output_exists, source_stat=source_stat)
+        return source_path, target_path, status, entry, None
+    except Exception as e:
+        return source_path, target_path, None, None, str(e)
 
-def process_transcript(source_path, target_path):
+def process_transcript(source_path, target_path, force=False, index=None):
     """
     Process a single transcript file.
     
     Args:
         source_path (str): Path to the source transcript file
         target_path (str): Path to save the processed file
+        force (bool): Process the file even if its output is up to date
+        index (OutputIndex): Index of the target directory, loaded when not given
     
     Returns:
         bool: True if file was processed, False if skipped
     """
-    # Check if target file already exists (idempotence)
-    if os.path.exists(target_path):
+    if index is None:
+        index = OutputIndex(os.path.dirname(target_path) or ".")
+    target_name = os.path.basename(target_path)
+    _, _, status, entry, error = clean_file((source_path, target_path, index.get(target_name), force, None,
+                                             None, None))
+    if error:
+        print(f"Error processing {source_path}: {error}")
+        return False
+    index.set(target_name, entry)
+    index.save()
+    if status == "fresh":
         print(f"Skipping {os.path.basename(source_path)} - already processed")
         return False
-    
-    try:
-        # Read source file
-        with open(source_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Clean and format the transcript
-        processed_content = clean_transcript(content)
-        
-        # Save processed content to target file
-        with open(target_path, 'w', encoding='utf-8') as f:
-            f.write(processed_content)
-        
-        print(f"Processed: {os.path.basename(source_path)} -> {os.path.basename(target_path)}")
-        return True
-    except Exception as e:
-        print(f"Error processing {source_path}: {str(e)}")
+    if status == "unchanged":
+        print(f"Unchanged: {os.path.basename(target_path)}")
         return False
+    print(f"Processed: {os.path.basename(source_path)} -> {os.path.basename(target_path)}")
+    return True
 
 def main():
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description='Process Loom transcripts for LLM usage.')
     parser.add_argument('--source-dir', type=str, default="/Users/mss/Desktop/BuildrWealth/Loom Transcripts",
-                        help='Directory containing Loom transcript files (default: /Users/mss/Desktop/BuildrWealth/Loom Transcripts)')
+                        help='Directory containing Loom transcript files, or a corpus_pack.py archive of them '
+                             '(default: /Users/mss/Desktop/BuildrWealth/Loom Transcripts)')
     parser.add_argument('--target-dir', type=str, default="llm_ready_transcripts",
                         help='Directory to store LLM-ready transcripts (default: llm_ready_transcripts)')
     parser.add_argument('--force', action='store_true',
-                        help='Force processing of transcripts even if they were previously processed')
+                        help='Clean every transcript even if its output is up to date; identical outputs are not rewritten')
     parser.add_argument('--suffix', type=str, default="_llm.txt",
                         help='Suffix to append to processed transcript files (default: _llm.txt)')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Worker processes to clean transcripts with, 0 for one per CPU (default: 1)')
+    parser.add_argument('--chunk-size', type=int, default=16,
+                        help='Files handed to a worker process at a time (default: 16)')
+    parser.add_argument('--find-duplicates', action='store_true',
+                        help='Report clusters of near-duplicate outputs in .duplicates.json')
+    parser.add_argument('--skip-duplicates', action='store_true',
+                        help='Like --find-duplicates, and leave the duplicates out of the search index')
     args = parser.parse_args()
 
     # Ensure source directory exists
@@ -121,53 +103,114 @@ def main():
     else:
         print(f"Using existing target directory: {args.target_dir}")
 
-    # Get all transcript files from source directory
-    transcript_files = [f for f in os.listdir(args.source_dir) if f.endswith('.txt')]
-    
-    if not transcript_files:
-        print(f"No .txt files found in {args.source_dir}")
-        return
-    
-    print(f"Found {len(transcript_files)} transcript files to process")
-    
-    # Process each file
+    jobs = args.jobs or os.cpu_count() or 1
+    print(f"Processing transcripts from {args.source_dir} with {jobs} worker process(es)")
+
+    # One listing of the target directory instead of an existence check per file
+    index = OutputIndex(args.target_dir)
+    with os.scandir(args.target_dir) as entries:
+        existing_targets = {entry.name for entry in entries}
+
+    def job(name, source_path, text=None, source_stat=None):
+        # Extract the base name without extension and determine the target filename
+        target_name = f"{os.path.splitext(name)[0]}{args.suffix}"
+        return (source_path, os.path.join(args.target_dir, target_name), index.get(target_name), args.force,
+                target_name in existing_targets, text, source_stat)
+
+    def pending_jobs():
+        # Stream the source directory, so workers start before the whole listing is read.
+        # A pool runs this generator on its feeder thread, so it only yields jobs; files
+        # whose outputs are up to date come back as "fresh" and are counted in the results loop
+        if is_pack(args.source_dir):
+            # Packed transcripts are sent to the workers with their text and fingerprinted by
+            # the stat of the pack, so repacking costs a hash per transcript
+            pack_stat = os.stat(args.source_dir)
+            with CorpusReader(args.source_dir) as reader:
+                for name, text in reader:
+                    if name.endswith('.txt'):
+                        yield job(name, os.path.join(args.source_dir, name), text, pack_stat)
+            return
+        with os.scandir(args.source_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.txt'):
+                    yield job(entry.name, entry.path)
+
+    # Process the files, reporting each one as soon as it is done
+    total_count = 0
     processed_count = 0
+    unchanged_count = 0
     skipped_count = 0
+    failed_count = 0
     
     start_time = time.time()
-    
-    for filename in transcript_files:
-        source_file = os.path.join(args.source_dir, filename)
-        
-        # Extract the base name without extension
-        name_without_ext = os.path.splitext(filename)[0]
-        
-        # Determine target filename
-        if args.suffix.endswith('.txt'):
-            # If suffix already includes .txt extension
-            target_file = os.path.join(args.target_dir, f"{name_without_ext}{args.suffix}")
-        else:
-            # Otherwise append .txt
-            target_file = os.path.join(args.target_dir, f"{name_without_ext}{args.suffix}")
-        
-        # Skip processing if the file already exists and --force not specified
-        if os.path.exists(target_file) and not args.force:
-            print(f"Skipping {filename} - already processed (use --force to process anyway)")
-            skipped_count += 1
-            continue
-        
-        # Process the file
-        if process_transcript(source_file, target_file):
-            processed_count += 1
-        else:
-            skipped_count += 1
+
+    if jobs > 1:
+        pool = multiprocessing.Pool(jobs)
+        results = pool.imap_unordered(clean_file, pending_jobs(), chunksize=max(1, args.chunk_size))
+    else:
+        pool = None
+        results = map(clean_file, pending_jobs())
+    try:
+        for source_file, target_file, status, index_entry, error in results:
+            total_count += 1
+            if error:
+                print(f"Error processing {source_file}: {error}")
+                failed_count += 1
+                continue
+            target_name = os.path.basename(target_file)
+            if status == "fresh" and index_entry == index.get(target_name):
+                # The transcript has not been touched since its output was made by the
+                # current cleaning rules
+                print(f"Skipping {os.path.basename(source_file)} - already processed (use --force to process anyway)")
+                skipped_count += 1
+                continue
+            index.set(target_name, index_entry)
+            if status == "fresh":
+                # Rewritten with the same content since the output was made
+                print(f"Skipping {os.path.basename(source_file)} - transcript content unchanged")
+                skipped_count += 1
+            elif status == "unchanged":
+                print(f"Unchanged: {os.path.basename(target_file)} - regenerated output is identical")
+                unchanged_count += 1
+            else:
+                print(f"Processed: {os.path.basename(source_file)} -> {os.path.basename(target_file)}")
+                processed_count += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        index.save()
+
+    if not total_count:
+        print(f"No .txt transcripts found in {args.source_dir}")
+        return
+
+    # Sign the outputs that were written and cluster the near-duplicates
+    duplicates = set()
+    if args.find_duplicates or args.skip_duplicates:
+        detector = DuplicateDetector(args.target_dir)
+        detector.update()
+        clusters = detector.save()
+        print_clusters(clusters)
+        if args.skip_duplicates:
+            duplicates = {duplicate["file"] for cluster in clusters for duplicate in cluster["duplicates"]}
+
+    # Re-index the outputs that were written for search_index.py
+    if processed_count or args.skip_duplicates:
+        search_index = SearchIndex(args.target_dir)
+        try:
+            indexed, _, removed = search_index.update(skip=duplicates)
+            print(f"Search index updated: {indexed} transcripts indexed, {removed} removed")
+        finally:
+            search_index.close()
     
     # Report summary
     elapsed_time = time.time() - start_time
     print(f"\nProcessing complete!")
-    print(f"Total files: {len(transcript_files)}")
+    print(f"Total files: {total_count}")
     print(f"Processed: {processed_count}")
-    print(f"Skipped: {skipped_count}")
+    print(f"Unchanged: {unchanged_count}")
+    print(f"Skipped: {skipped_count + failed_count}")
     print(f"Time taken: {elapsed_time:.2f} seconds")
 
 if __name__ == "__main__":
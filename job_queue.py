@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+job_queue.py
+
+Durable, resumable video queue for process.py, stored in the manifest database.
+
+Each video moves through pending -> running -> done/failed. Failed videos are retried
+with exponential backoff (retry_delay, 2 x retry_delay, ... up to max_delay) until they
+reach max_attempts. Because the state lives in SQLite, a run that is killed halfway
+leaves its unfinished videos as pending/running, and the next run picks them up again.
+"""
+
+import time
+
+from manifest import normalize_video_id
+
+
+class JobQueue:
+    """Claims videos from the manifest for the browser workers."""
+
+    def __init__(self, manifest, max_attempts=3, retry_delay=30, max_delay=600):
+        """
+        Args:
+            manifest (Manifest): Open manifest database
+            max_attempts (int): Attempts per video before it stays failed
+            retry_delay (float): Seconds before the first retry, doubled for every further attempt
+            max_delay (float): Upper bound for the retry delay in seconds
+        """
+        self.manifest = manifest
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_delay = max_delay
+
+    def recover(self):
+        """
+        Return videos left running by a crashed or killed run to the queue.
+
+        Returns:
+            int: Number of recovered videos
+        """
+        return self.manifest.execute(
+            "UPDATE videos SET status = 'pending', updated_at = ? WHERE status = 'running'",
+            (time.time(),)).rowcount
+
+    def enqueue(self, video_ids, force=False, retry_failed=False):
+        """
+        Add videos from the input file to the queue, keeping their input order.
+
+        Args:
+            video_ids (list): Video IDs or URLs
+            force (bool): Queue videos again even if they are already done
+            retry_failed (bool): Give videos that used up their attempts a fresh set of retries
+
+        Returns:
+            int: Number of videos now waiting in the queue
+        """
+        now = time.time()
+        requeue_statuses = ["failed"] if retry_failed else []
+        if force:
+            requeue_statuses.append("done")
+        with self.manifest.transaction() as conn:
+            for position, video_id in enumerate(video_ids):
+                normalized = normalize_video_id(video_id)
+                conn.execute("""
+                    INSERT INTO videos (video_id, source, status, attempts, queue_position, updated_at)
+                    VALUES (?, ?, 'pending', 0, ?, ?)
+                    ON CONFLICT(video_id) DO UPDATE SET
+                        source = excluded.source, queue_position = excluded.queue_position
+                """, (normalized, video_id, position, now))
+                if requeue_statuses:
+                    placeholders = ",".join("?" * len(requeue_statuses))
+                    conn.execute(f"""
+                        UPDATE videos SET status = 'pending', attempts = 0, error = NULL, updated_at = ?
+                        WHERE video_id = ? AND status IN ({placeholders})
+                    """, (now, normalized, *requeue_statuses))
+        return self.waiting_count()
+
+    def _retry_condition(self):
+        # Failed videos become eligible again once their backoff delay has passed
+        return """
+            (status = 'pending' OR (status = 'failed' AND attempts < ? AND
+                COALESCE(finished_at, 0) + MIN(?, ? * (1 << MAX(attempts - 1, 0))) <= ?))
+        """
+
+    def waiting_count(self):
+        """Number of videos that are pending or will still be retried."""
+        rows = self.manifest.query(
+            "SELECT COUNT(*) FROM videos WHERE status = 'pending' OR (status = 'failed' AND attempts < ?)",
+            (self.max_attempts,))
+        return rows[0][0]
+
+    def next_retry_at(self):
+        """Time at which the earliest backed-off failure becomes eligible again, None if there is none."""
+        rows = self.manifest.query(
+            "SELECT MIN(COALESCE(finished_at, 0) + MIN(?, ? * (1 << MAX(attempts - 1, 0)))) FROM videos "
+            "WHERE status = 'failed' AND attempts < ?",
+            (self.max_delay, self.retry_delay, self.max_attempts))
+        return rows[0][0]
+
+    def _claim_once(self):
+        now = time.time()
+        with self.manifest.transaction() as conn:
+            row = conn.execute(f"""
+                SELECT video_id, source FROM videos WHERE {self._retry_condition()}
+                ORDER BY status = 'failed', queue_position, updated_at LIMIT 1
+            """, (self.max_attempts, self.max_delay, self.retry_delay, now)).fetchone()
+            if row is not None:
+                conn.execute("""
+                    UPDATE videos SET status = 'running', attempts = attempts + 1, error = NULL,
+                        started_at = ?, updated_at = ?
+                    WHERE video_id = ?
+                """, (now, now, row["video_id"]))
+        return row["source"] if row is not None else None
+
+    def claim(self):
+        """
+        Take the next video off the queue and mark it as running.
+
+        Waits while the only remaining videos are failures whose retry delay has not passed.
+
+        Returns:
+            str: The video ID or URL as listed in the input file, or None when the queue is empty
+        """
+        while True:
+            video_id = self._claim_once()
+            if video_id is not None:
+                return video_id
+            if not self.waiting_count():
+                return None
+            # Only backed-off retries are left; sleep until the first of them is due
+            next_retry_at = self.next_retry_at()
+            delay = next_retry_at - time.time() if next_retry_at is not None else 0
+            time.sleep(max(0.5, delay))
+
+    def exhausted(self):
+        """Videos that failed on every allowed attempt, as (source, error) tuples."""
+        return [(row["source"], row["error"]) for row in self.manifest.query(
+            "SELECT source, error FROM videos WHERE status = 'failed' AND attempts >= ? ORDER BY queue_position",
+            (self.max_attempts,))]
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+layout_cache.py
+
+Persistent cache of which Transcript tab selector and extraction strategy worked for a
+given Loom page layout.
+
+A cheap fingerprint of the page (key class names, data-testid attributes, tab roles and
+iframe count) identifies the layout. For every fingerprint the cache remembers the tab
+strategy and extraction strategy that last succeeded, so process.py tries those first.
+A layout on which no Transcript tab was found is cached as having none, so later videos
+with that layout skip the tab search and its timeout. An entry whose strategy fails
+max_failures times in a row is dropped and relearned; for a layout cached without a tab,
+a failure is a video whose transcript could not be extracted without one.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+DEFAULT_LAYOUT_CACHE = "loom-layout-cache.json"
+
+# Kinds for which a layout where every strategy failed is cached as having none
+NEGATIVE_KINDS = ("tab",)
+
+# Collects the parts of the page that differ between Loom layouts, not between videos
+LAYOUT_FINGERPRINT_JS = """
+var keywords = /transcript|caption|tab|player|sidebar|panel/i;
+var classes = new Set();
+document.querySelectorAll("button, [role='tab'], [role='tabpanel'], section, div[class]").forEach(function(el) {
+    (typeof el.className === 'string' ? el.className : '').split(/\\s+/).forEach(function(name) {
+        if (name && keywords.test(name)) classes.add(el.tagName.toLowerCase() + '.' + name);
+    });
+});
+var testIds = new Set();
+document.querySelectorAll('[data-testid]').forEach(function(el) {
+    testIds.add(el.getAttribute('data-testid').replace(/[0-9a-f]{8,}/gi, '*'));
+});
+return {
+    classes: Array.from(classes).sort().slice(0, 200),
+    testids: Array.from(testIds).sort().slice(0, 200),
+    tabs: document.querySelectorAll("[role='tab']").length,
+    iframes: document.querySelectorAll('iframe').length
+};
+"""
+
+
+def layout_fingerprint(driver):
+    """
+    Compute the layout fingerprint of the page that is open.
+
+    Args:
+        driver: WebDriver instance
+
+    Returns:
+        str: 16 character hex digest, or None if the page could not be inspected
+    """
+    try:
+        layout = driver.execute_script(LAYOUT_FINGERPRINT_JS)
+    except Exception:
+        return None
+    if not layout:
+        return None
+    return hashlib.sha1(json.dumps(layout, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class LayoutCache:
+    """Thread-safe fingerprint -> winning strategy cache stored as a JSON file."""
+
+    def __init__(self, path=DEFAULT_LAYOUT_CACHE, max_failures=2):
+        """
+        Args:
+            path (str): JSON file the cache is kept in, created on first save
+            max_failures (int): Consecutive failures of a cached strategy before it is dropped
+        """
+        self.path = path
+        self.max_failures = max_failures
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "invalidated": 0}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable layout cache {path}: {str(e)}")
+
+    def order(self, fingerprint, kind, names):
+        """
+        Put the cached strategy for this layout first.
+
+        Args:
+            fingerprint (str): Layout fingerprint, None leaves the order unchanged
+            kind (str): "tab" or "extraction"
+            names (list): Strategy names in their default order
+
+        Returns:
+            list: The same names, the cached winner first; empty if the layout is cached
+                as having none (only for NEGATIVE_KINDS)
+        """
+        with self.lock:
+            cached = self.entries.get(fingerprint, {}).get(kind)
+        if cached is not None and cached["strategy"] is None:
+            return []
+        preferred = cached["strategy"] if cached is not None else None
+        if preferred not in names:
+            return list(names)
+        return [preferred] + [name for name in names if name != preferred]
+
+    def record(self, fingerprint, kind, strategy):
+        """
+        Record which strategy worked for this layout.
+
+        Args:
+            fingerprint (str): Layout fingerprint; nothing is recorded for None
+            kind (str): "tab" or "extraction"
+            strategy (str): Name of the strategy that succeeded, or None if all failed
+        """
+        if fingerprint is None:
+            return
+        with self.lock:
+            layout = self.entries.setdefault(fingerprint, {})
+            cached = layout.get(kind)
+            if cached is None:
+                self.stats["misses"] += 1
+                if strategy is not None or kind in NEGATIVE_KINDS:
+                    layout[kind] = {"strategy": strategy, "hits": 0, "failures": 0, "updated": time.time()}
+            elif strategy == cached["strategy"]:
+                self.stats["hits"] += 1
+                cached["hits"] += 1
+                cached["failures"] = 0
+            else:
+                self.stats["stale"] += 1
+                if strategy is not None:
+                    # Another strategy won on this layout: it becomes the cached one
+                    layout[kind] = {"strategy": strategy, "hits": 0, "failures": 0, "updated": time.time()}
+                else:
+                    self._fail(layout, kind)
+            if not layout:
+                del self.entries[fingerprint]
+            self._save()
+
+    def reject(self, fingerprint, kind):
+        """
+        Count a failure of the cached entry of this layout without a new winner, such as a
+        video on a layout cached without a tab whose transcript could not be extracted.
+        """
+        if fingerprint is None:
+            return
+        with self.lock:
+            layout = self.entries.get(fingerprint, {})
+            if kind not in layout:
+                return
+            self._fail(layout, kind)
+            if not layout:
+                del self.entries[fingerprint]
+            self._save()
+
+    def _fail(self, layout, kind):
+        # Drops the entry after max_failures consecutive failures
+        layout[kind]["failures"] += 1
+        if layout[kind]["failures"] >= self.max_failures:
+            del layout[kind]
+            self.stats["invalidated"] += 1
+
+    def _save(self):
+        temporary_path = f"{self.path}.tmp"
+        try:
+            with open(temporary_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            print(f"Could not save layout cache {self.path}: {str(e)}")
+
+    def summary(self):
+        """
+        Returns:
+            str: Hit rate and counts for this run
+        """
+        with self.lock:
+            lookups = self.stats["hits"] + self.stats["misses"] + self.stats["stale"]
+            if not lookups:
+                return "Layout cache: no lookups"
+            return (f"Layout cache: {self.stats['hits'] / lookups:.0%} hit rate over {lookups} lookups "
+                    f"({self.stats['misses']} new layouts, {self.stats['stale']} stale, "
+                    f"{self.stats['invalidated']} invalidated, {len(self.entries)} layouts known)")
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+lean_pages.py
+
+Network blocking profile for process.py --lean-pages.
+
+Only the transcript text is needed, but a Loom page also downloads the video stream,
+thumbnails, fonts, analytics and tracking scripts. In lean mode every browser gets a CDP
+URL blocklist (Network.setBlockedURLs) that drops those requests while the player's
+scripts and API calls, and with them the transcript UI, keep working.
+
+Per video the bytes actually transferred and the number of blocked requests are read from
+Chrome's performance log. The first video of a run loads without blocking and serves as the
+baseline for the estimated bytes saved on every later video; if that page load fails, the
+next one becomes the baseline.
+"""
+
+import json
+import threading
+import weakref
+
+# Video streams and other media
+MEDIA_PATTERNS = [
+    "*.mp4", "*.mp4?*", "*.webm", "*.webm?*", "*.m3u8", "*.m3u8?*", "*.mpd", "*.mpd?*",
+    "*.m4s", "*.m4s?*", "*.ts", "*.ts?*", "*.mp3", "*.mp3?*", "*.m4a", "*.m4a?*",
+]
+# Thumbnails, avatars and poster images
+IMAGE_PATTERNS = [
+    "*.png", "*.png?*", "*.jpg", "*.jpg?*", "*.jpeg", "*.jpeg?*", "*.gif", "*.gif?*",
+    "*.webp", "*.webp?*", "*.avif", "*.avif?*", "*.ico", "*.ico?*",
+]
+FONT_PATTERNS = [
+    "*.woff", "*.woff?*", "*.woff2", "*.woff2?*", "*.ttf", "*.ttf?*", "*.otf", "*.otf?*",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+]
+# Analytics, session recording and support widgets
+TRACKING_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*facebook.net*",
+    "*segment.io*", "*segment.com*", "*amplitude.com*", "*mixpanel.com*", "*fullstory.com*",
+    "*hotjar.com*", "*intercom.io*", "*intercomcdn.com*", "*sentry.io*", "*datadoghq.com*",
+    "*browser-intake-datadoghq*", "*hubspot.com*", "*hs-scripts.com*", "*bing.com*",
+    "*linkedin.com/px*", "*ads-twitter.com*", "*clarity.ms*",
+]
+
+BLOCK_PROFILES = {
+    "media": MEDIA_PATTERNS,
+    "image": IMAGE_PATTERNS,
+    "font": FONT_PATTERNS,
+    "tracking": TRACKING_PATTERNS,
+}
+
+
+def add_lean_options(chrome_options):
+    """
+    Add lean-mode settings to Chrome options. Blocking itself is switched on per driver
+    by LeanPages.prepare(), so the baseline page load stays comparable.
+
+    Args:
+        chrome_options (Options): Chrome options under construction
+    """
+    chrome_options.add_argument("--mute-audio")
+    # Network events are needed to measure bytes transferred and requests blocked
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+def format_bytes(size):
+    """Human readable byte count."""
+    if size < 1024:
+        return f"{size} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
+
+
+def read_performance_log(driver):
+    """
+    Drain the browser's performance log.
+
+    Args:
+        driver: WebDriver started with performance logging enabled
+
+    Returns:
+        list: Log entries, empty if the log is not available
+    """
+    try:
+        return driver.get_log("performance")
+    except Exception:
+        return []
+
+
+def summarize_network_log(entries):
+    """
+    Count transferred bytes and blocked requests in performance log entries.
+
+    Args:
+        entries (list): Entries as returned by driver.get_log("performance")
+
+    Returns:
+        tuple: (bytes transferred, number of requests, number of blocked requests)
+    """
+    transferred = {}
+    requests = set()
+    blocked = 0
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError, TypeError):
+            continue
+        method = message.get("method")
+        params = message.get("params", {})
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            requests.add(request_id)
+        elif method == "Network.dataReceived":
+            # Streams that never finish only show up as data chunks
+            transferred[request_id] = transferred.get(request_id, 0) + params.get("encodedDataLength", 0)
+        elif method == "Network.loadingFinished":
+            transferred[request_id] = max(transferred.get(request_id, 0), int(params.get("encodedDataLength", 0)))
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            blocked += 1
+    return sum(transferred.values()), len(requests), blocked
+
+
+class LeanPages:
+    """Applies the blocklist to every driver and keeps the bytes saved statistics."""
+
+    def __init__(self, profiles=("media", "image", "font", "tracking"), extra_patterns=None):
+        """
+        Args:
+            profiles (tuple): Names from BLOCK_PROFILES to block
+            extra_patterns (list): Additional URL patterns to block, * is a wildcard
+        """
+        self.patterns = [pattern for name in profiles for pattern in BLOCK_PROFILES[name]]
+        self.patterns.extend(extra_patterns or [])
+        self.lock = threading.Lock()
+        # Weak, so a recycled browser's replacement is never mistaken for it
+        self.blocking_drivers = weakref.WeakSet()
+        # Driver of the unblocked baseline page load in progress, until it is recorded or abandoned
+        self.baseline_driver = None
+        self.baseline_bytes = None
+        self.videos = 0
+        self.bytes_transferred = 0
+        self.bytes_saved = 0
+        self.requests_blocked = 0
+        self.load_time = 0.0
+
+    def prepare(self, driver):
+        """
+        Call before navigating to a video. Drains stale log entries and enables the
+        blocklist on the driver, unless this page load is used as the unblocked baseline.
+
+        Args:
+            driver: WebDriver instance about to open a video
+
+        Returns:
+            bool: True if requests are blocked for this page load
+        """
+        read_performance_log(driver)
+        with self.lock:
+            if driver in self.blocking_drivers:
+                return True
+            if self.baseline_bytes is None and self.baseline_driver is None:
+                self.baseline_driver = driver
+                return False
+            if self.baseline_driver is driver:
+                return False
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.patterns})
+        except Exception as e:
+            print(f"Could not enable request blocking: {str(e)}")
+            return False
+        with self.lock:
+            self.blocking_drivers.add(driver)
+        return True
+
+    def record(self, driver, entries, load_time):
+        """
+        Record a finished page load and print its network statistics.
+
+        Args:
+            driver: WebDriver instance that loaded the page
+            entries (list): Performance log entries of this page load
+            load_time (float): Seconds until the page was ready
+
+        Returns:
+            dict: bytes transferred, estimated bytes saved, requests and blocked requests
+        """
+        transferred, requests, blocked = summarize_network_log(entries)
+        with self.lock:
+            if self.baseline_driver is driver and self.baseline_bytes is None:
+                self.baseline_bytes = transferred
+                self.baseline_driver = None
+                print(f"Lean pages baseline (unblocked): {format_bytes(transferred)} in {requests} requests, "
+                      f"ready in {load_time:.1f} seconds")
+                return {"transferred": transferred, "saved": 0, "requests": requests, "blocked": 0}
+            saved = max(0, (self.baseline_bytes or 0) - transferred)
+            self.videos += 1
+            self.bytes_transferred += transferred
+            self.bytes_saved += saved
+            self.requests_blocked += blocked
+            self.load_time += load_time
+        print(f"Lean page: {format_bytes(transferred)} transferred, ~{format_bytes(saved)} saved, "
+              f"{blocked} of {requests} requests blocked, ready in {load_time:.1f} seconds")
+        return {"transferred": transferred, "saved": saved, "requests": requests, "blocked": blocked}
+
+    def abandon(self, driver):
+        """
+        Call once a video is done with a driver. If its page load was the baseline and was
+        never recorded (it failed, timed out or the video was given up), the next page load
+        of any driver becomes the baseline instead.
+
+        Args:
+            driver: WebDriver instance that opened the video
+        """
+        with self.lock:
+            if self.baseline_driver is driver:
+                self.baseline_driver = None
+
+    def summary(self):
+        """
+        Returns:
+            str: Totals over all blocked page loads
+        """
+        with self.lock:
+            if not self.videos:
+                return "Lean pages: no blocked page loads recorded"
+            return (f"Lean pages: {self.videos} videos, {format_bytes(self.bytes_transferred)} transferred, "
+                    f"~{format_bytes(self.bytes_saved)} saved, {self.requests_blocked} requests blocked, "
+                    f"average page load {self.load_time / self.videos:.1f} seconds")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+llm_pipeline.py
+
+Background LLM cleaning stage for process.py --process-llm.
+
+The scraper hands each saved transcript's text to a bounded queue and immediately moves on
+to the next video. Cleaning worker threads take items off the queue and write the _llm.txt
+files, so cleaning and its disk I/O never block the browser. When the queue is full the
+scraper waits, which keeps memory bounded if cleaning ever falls behind.
+"""
+
+import queue
+import threading
+
+_STOP = object()
+
+
+class LLMPipeline:
+    """Producer/consumer pipeline that runs a cleaning handler off the browser thread."""
+
+    def __init__(self, handler, maxsize=16, workers=1):
+        """
+        Args:
+            handler (callable): Called with the arguments of every submit() call,
+                returns True if an LLM file was written
+            maxsize (int): Maximum number of transcripts waiting to be cleaned
+            workers (int): Number of cleaning threads
+        """
+        self.handler = handler
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+        self.counts_lock = threading.Lock()
+        self.threads = [threading.Thread(target=self._worker, name=f"llm-cleaner-{i + 1}", daemon=True)
+                        for i in range(max(1, workers))]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, *item):
+        """
+        Queue a transcript for cleaning. Blocks while the queue is full.
+
+        Args:
+            *item: Arguments for the handler, typically including the transcript text
+                itself so it is not read back from disk
+        """
+        self.queue.put(item)
+
+    def _worker(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                try:
+                    created = self.handler(*item)
+                except Exception as e:
+                    print(f"Error processing transcript for LLM: {str(e)}")
+                    with self.counts_lock:
+                        self.failed += 1
+                    continue
+                with self.counts_lock:
+                    if created:
+                        self.created += 1
+                    else:
+                        self.skipped += 1
+            finally:
+                self.queue.task_done()
+
+    def close(self):
+        """
+        Wait for all queued transcripts to be cleaned and stop the worker threads.
+
+        Returns:
+            dict: Number of created, skipped and failed LLM files
+        """
+        for _ in self.threads:
+            self.queue.put(_STOP)
+        for thread in self.threads:
+            thread.join()
+        return {"created": self.created, "skipped": self.skipped, "failed": self.failed}
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+manifest.py
+
+SQLite manifest of scraped Loom videos, replacing loom-videos-processed.txt and the
+per-video scan of the transcripts folder.
+
+Every video is keyed by its normalized ID and records its status, number of attempts,
+timings, title, transcript path, content hash and LLM output path. Lookups use the primary
+key index, and every update is a single transaction so several browser workers (threads
+or separate processes) can share one manifest file.
+
+Usage:
+    python manifest.py import [--processed-file FILE] [--download-dir DIR]
+    python manifest.py stats
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_MANIFEST = "loom-manifest.db"
+DEFAULT_PROCESSED_FILE = "loom-videos-processed.txt"
+DEFAULT_DOWNLOAD_DIR = "/Users/mss/Desktop/BuildrWealth/Loom Transcripts"
+
+# Loom video IDs are 32 hex characters
+VIDEO_ID_PATTERN = re.compile(r'([0-9a-f]{32})', re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    source TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    title TEXT,
+    transcript_path TEXT,
+    content_hash TEXT,
+    llm_path TEXT,
+    error TEXT,
+    queue_position INTEGER,
+    started_at REAL,
+    finished_at REAL,
+    duration REAL,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_status ON videos(status, queue_position);
+CREATE INDEX IF NOT EXISTS idx_videos_content_hash ON videos(content_hash);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def normalize_video_id(video_id):
+    """
+    Reduce a Loom share URL or ID to the bare video ID.
+
+    Args:
+        video_id (str): Video ID or URL as found in the input file
+
+    Returns:
+        str: Lower-case 32 character ID, or the cleaned input if it has no such ID
+    """
+    video_id = video_id.strip()
+    match = VIDEO_ID_PATTERN.search(video_id)
+    if match:
+        return match.group(1).lower()
+    return video_id.split("?")[0].rstrip("/").rsplit("/", 1)[-1]
+
+
+def content_hash(text):
+    """SHA-256 of transcript text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class Manifest:
+    """Thread-safe access to the manifest database."""
+
+    def __init__(self, path=DEFAULT_MANIFEST):
+        """
+        Args:
+            path (str): Path of the SQLite database, created if missing
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        # One connection shared by all worker threads, serialized by self.lock
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self._migrate()
+        self.conn.executescript(SCHEMA)
+
+    def _migrate(self):
+        # Manifests created before the job queue lack the queue_position column
+        columns = [row["name"] for row in self.conn.execute("PRAGMA table_info(videos)")]
+        if columns and "queue_position" not in columns:
+            self.conn.execute("ALTER TABLE videos ADD COLUMN queue_position INTEGER")
+            self.conn.execute("DROP INDEX IF EXISTS idx_videos_status")
+
+    @contextmanager
+    def transaction(self):
+        """Exclusive write transaction; yields the connection and commits on success."""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def execute(self, sql, params=()):
+        """Run a single statement in its own transaction, returns the cursor."""
+        with self.transaction() as conn:
+            return conn.execute(sql, params)
+
+    def query(self, sql, params=()):
+        """Run a read-only query, returns all rows."""
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def get(self, video_id):
+        """Return the manifest row for a video as a dict, or None."""
+        rows = self.query("SELECT * FROM videos WHERE video_id = ?", (normalize_video_id(video_id),))
+        return dict(rows[0]) if rows else None
+
+    def is_done(self, video_id):
+        """True if the video's transcript was saved successfully."""
+        rows = self.query("SELECT 1 FROM videos WHERE video_id = ? AND status = 'done'",
+                          (normalize_video_id(video_id),))
+        return bool(rows)
+
+    def mark_done(self, video_id, title=None, transcript_path=None, transcript_text=None):
+        """
+        Record a successfully saved transcript.
+
+        Args:
+            video_id (str): Video ID or URL
+            title (str): Page title
+            transcript_path (str): Where the transcript was saved
+            transcript_text (str): Transcript content, stored as a hash
+        """
+        now = time.time()
+        digest = content_hash(transcript_text) if transcript_text is not None else None
+        self.execute("""
+            INSERT INTO videos (video_id, source, status, attempts, title, transcript_path, content_hash,
+                                started_at, finished_at, duration, updated_at)
+            VALUES (?, ?, 'done', 1, ?, ?, ?, ?, ?, 0, ?)
+            ON CONFLICT(video_id) DO UPDATE SET
+                status = 'done', error = NULL,
+                title = COALESCE(excluded.title, title),
+                transcript_path = COALESCE(excluded.transcript_path, transcript_path),
+                content_hash = COALESCE(excluded.content_hash, content_hash),
+                finished_at = excluded.finished_at,
+                duration = excluded.finished_at - COALESCE(started_at, excluded.finished_at),
+                updated_at = excluded.updated_at
+        """, (normalize_video_id(video_id), video_id, title, transcript_path, digest, now, now, now))
+
+    def mark_failed(self, video_id, error):
+        """Record a failed attempt with its reason."""
+        now = time.time()
+        self.execute("""
+            INSERT INTO videos (video_id, source, status, attempts, error, started_at, finished_at, duration, updated_at)
+            VALUES (?, ?, 'failed', 1, ?, ?, ?, 0, ?)
+            ON CONFLICT(video_id) DO UPDATE SET
+                status = 'failed', error = excluded.error,
+                finished_at = excluded.finished_at,
+                duration = excluded.finished_at - COALESCE(started_at, excluded.finished_at),
+                updated_at = excluded.updated_at
+        """, (normalize_video_id(video_id), video_id, error, now, now, now))
+
+    def set_llm_path(self, video_id, llm_path):
+        """Record where the LLM-ready version of a transcript was written."""
+        self.execute("UPDATE videos SET llm_path = ?, updated_at = ? WHERE video_id = ?",
+                    (llm_path, time.time(), normalize_video_id(video_id)))
+
+    def counts(self):
+        """Number of videos per status."""
+        return {row["status"]: row["n"] for row in
+                self.query("SELECT status, COUNT(*) AS n FROM videos GROUP BY status")}
+
+    def import_legacy(self, processed_file=DEFAULT_PROCESSED_FILE, download_dir=DEFAULT_DOWNLOAD_DIR, force=False):
+        """
+        One-time import of loom-videos-processed.txt and the existing transcripts folder.
+
+        Args:
+            processed_file (str): Legacy list of processed video IDs/URLs
+            download_dir (str): Folder with previously saved transcripts
+            force (bool): Import again even if an import already ran
+
+        Returns:
+            int: Number of videos imported, or 0 if the import already ran
+        """
+        already = self.query("SELECT value FROM meta WHERE key = 'legacy_import'")
+        if already and not force:
+            return 0
+
+        now = time.time()
+        rows = {}
+        if os.path.exists(processed_file):
+            with open(processed_file, "r") as f:
+                for line in f:
+                    if line.strip():
+                        rows[normalize_video_id(line)] = (line.strip(), None, None, None)
+
+        if os.path.isdir(download_dir):
+            with os.scandir(download_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not entry.name.endswith(".txt"):
+                        continue
+                    match = VIDEO_ID_PATTERN.search(entry.name)
+                    if not match:
+                        continue
+                    title = entry.name[:match.start()].rstrip(" -") or None
+                    try:
+                        with open(entry.path, "r", encoding="utf-8") as f:
+                            digest = content_hash(f.read())
+                    except (OSError, UnicodeDecodeError):
+                        digest = None
+                    video_id = match.group(1).lower()
+                    source = rows.get(video_id, (video_id,))[0]
+                    rows[video_id] = (source, title, entry.path, digest)
+
+        with self.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO videos (video_id, source, status, attempts, title, transcript_path, content_hash,
+                                    finished_at, updated_at)
+                VALUES (?, ?, 'done', 1, ?, ?, ?, ?, ?)
+                ON CONFLICT(video_id) DO UPDATE SET
+                    title = COALESCE(title, excluded.title),
+                    transcript_path = COALESCE(transcript_path, excluded.transcript_path),
+                    content_hash = COALESCE(content_hash, excluded.content_hash)
+            """, [(video_id, source, title, path, digest, now, now)
+                  for video_id, (source, title, path, digest) in rows.items()])
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_import', ?)", (str(now),))
+        return len(rows)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the Loom scraper manifest database.')
+    parser.add_argument('command', choices=['import', 'stats'],
+                        help='import: load loom-videos-processed.txt and the transcripts folder; '
+                             'stats: show the number of videos per status')
+    parser.add_argument('--manifest', type=str, default=DEFAULT_MANIFEST,
+                        help=f'Path to the manifest database (default: {DEFAULT_MANIFEST})')
+    parser.add_argument('--processed-file', type=str, default=DEFAULT_PROCESSED_FILE,
+                        help=f'Legacy processed list to import (default: {DEFAULT_PROCESSED_FILE})')
+    parser.add_argument('--download-dir', type=str, default=DEFAULT_DOWNLOAD_DIR,
+                        help='Transcripts folder to import')
+    args = parser.parse_args()
+
+    manifest = Manifest(args.manifest)
+    if args.command == 'import':
+        imported = manifest.import_legacy(args.processed_file, args.download_dir, force=True)
+        print(f"Imported {imported} videos into {args.manifest}")
+    else:
+        counts = manifest.counts()
+        if not counts:
+            print(f"No videos recorded in {args.manifest}")
+        for status, count in sorted(counts.items()):
+            print(f"{status}: {count}")
+    manifest.close()
+
+
+if __name__ == "__main__":
+    main()
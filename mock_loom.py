@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+mock_loom.py
+
+Local stand-in for the Loom site, for benchmarking process.py without a Loom account.
+
+Share pages are generated from the video ID and come in several variants, chosen by the
+first hex digit of the ID (see VARIANTS):
+    tab     transcript behind a Transcript tab, rendered when the tab is clicked
+    iframe  the player and its Transcript tab live in an embedded iframe
+    lazy    the transcript panel fills in line by line after the tab is clicked
+    fail    no transcript at all, like a video without captions
+
+Every response sets a session cookie and /home never redirects, so the session check in
+process.py passes. Each page also loads its captions as WebVTT from /captions/<id>.vtt,
+which --fetch-mode network picks up. The same captions are served as JSON with
+millisecond start times from /captions/<id>.json.
+
+Usage:
+    python mock_loom.py [--port 8765] [--latency 0.2]
+    python process.py --base-url http://127.0.0.1:8765 ...
+"""
+
+import argparse
+import html
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+VARIANTS = ("tab", "iframe", "lazy", "fail")
+
+SHARE_PATH = re.compile(r'^/(share|embed)/([0-9a-zA-Z_-]+)/?$')
+CAPTIONS_PATH = re.compile(r'^/captions/([0-9a-zA-Z_-]+)\.(vtt|json)$')
+
+WORDS = ("so", "the", "next", "step", "is", "to", "open", "the", "dashboard", "and", "check",
+         "that", "every", "deal", "has", "an", "owner", "we", "want", "this", "pipeline",
+         "reviewed", "weekly", "because", "it", "drives", "the", "forecast", "numbers")
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>{title} - Loom</title>
+<style>.hidden {{ display: none; }}</style>
+</head><body>
+<script type="application/json" id="state">{{"captionsUrl": "{captions_url}"}}</script>
+<div class="player"><video width="640" height="360"></video></div>
+{body}
+<script>fetch("{captions_url}").catch(function() {{}});</script>
+</body></html>
+"""
+
+TAB_BODY = """
+<div class="sidebar">
+  <button class="css-1qz66q8" id="transcript-button">Transcript</button>
+  <div role="tabpanel" class="transcript-container hidden" id="transcript-panel"></div>
+</div>
+<script>
+var lines = {lines_json};
+var delay = {line_delay};
+document.getElementById("transcript-button").addEventListener("click", function() {{
+  var panel = document.getElementById("transcript-panel");
+  panel.classList.remove("hidden");
+  lines.forEach(function(line, i) {{
+    setTimeout(function() {{
+      var row = document.createElement("div");
+      row.className = "transcript-line";
+      row.innerHTML = '<div class="timestamp">' + line[0] + '</div><div class="text">' + line[1] + '</div>';
+      panel.appendChild(row);
+    }}, delay * i);
+  }});
+}});
+</script>
+"""
+
+IFRAME_BODY = """<iframe id="player-frame" src="/embed/{video_id}" width="800" height="600"></iframe>"""
+
+FAIL_BODY = """<div class="sidebar"><button>Comments</button><div class="comments">No comments yet</div></div>"""
+
+
+def variant_for(video_id):
+    """Variant of a video, chosen by the first hex digit of its ID."""
+    try:
+        return VARIANTS[int(video_id[0], 16) % len(VARIANTS)]
+    except (ValueError, IndexError):
+        return "tab"
+
+
+def make_video_id(variant, rng=random):
+    """
+    Generate a 32 character hex video ID that the server serves as the given variant.
+
+    Args:
+        variant (str): One of VARIANTS
+        rng (random.Random): Source of randomness
+
+    Returns:
+        str: Video ID
+    """
+    return f"{VARIANTS.index(variant):x}" + "".join(rng.choice("0123456789abcdef") for _ in range(31))
+
+
+def transcript_lines(video_id, count=60):
+    """Deterministic (timestamp, text) lines for a video."""
+    rng = random.Random(video_id)
+    lines = []
+    seconds = 0
+    for _ in range(count):
+        seconds += rng.randint(3, 12)
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18))).capitalize() + "."
+        lines.append((f"{seconds // 60}:{seconds % 60:02d}", text))
+    return lines
+
+
+def captions_vtt(video_id):
+    """WebVTT version of a video's transcript."""
+    cues = ["WEBVTT", ""]
+    for timestamp, text in transcript_lines(video_id):
+        minutes, seconds = timestamp.split(":")
+        start = int(minutes) * 60 + int(seconds)
+        cues.append(f"00:{start // 60:02d}:{start % 60:02d}.000 --> 00:{(start + 3) // 60:02d}:{(start + 3) % 60:02d}.000")
+        cues.append(text)
+        cues.append("")
+    return "\n".join(cues)
+
+
+def captions_json(video_id):
+    """JSON version of a video's transcript, with start times in milliseconds."""
+    phrases = []
+    for timestamp, text in transcript_lines(video_id):
+        minutes, seconds = timestamp.split(":")
+        phrases.append({"startMs": (int(minutes) * 60 + int(seconds)) * 1000, "value": text})
+    return json.dumps({"video": video_id, "phrases": phrases})
+
+
+class MockLoomHandler(BaseHTTPRequestHandler):
+    """Serves share pages, embeds, captions and the pages used for the login check."""
+
+    server_version = "MockLoom/1.0"
+    # Set on the class by make_server()
+    latency = 0.0
+    line_delay = 50
+    base_url = ""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Set-Cookie", "loom_session=mock; Path=/")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _transcript_body(self, video_id, line_delay):
+        lines = [[html.escape(timestamp), html.escape(text)] for timestamp, text in transcript_lines(video_id)]
+        return TAB_BODY.format(lines_json=json.dumps(lines), line_delay=line_delay)
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        path = self.path.split("?")[0]
+
+        if path in ("/", "/home", "/login"):
+            self._send(200, "<html><head><title>Home - Loom</title></head><body>My videos</body></html>")
+            return
+
+        match = CAPTIONS_PATH.match(path)
+        if match:
+            video_id, extension = match.groups()
+            if variant_for(video_id) == "fail":
+                self._send(404, "not found", "text/plain")
+            elif extension == "json":
+                self._send(200, captions_json(video_id), "application/json")
+            else:
+                self._send(200, captions_vtt(video_id), "text/vtt; charset=utf-8")
+            return
+
+        match = SHARE_PATH.match(path)
+        if not match:
+            self._send(404, "<html><head><title>Not found</title></head><body>Not found</body></html>")
+            return
+
+        kind, video_id = match.groups()
+        variant = variant_for(video_id)
+        # Failing videos reference captions too, but the server answers 404 for them
+        captions_url = f"{self.base_url}/captions/{video_id}.vtt"
+        if kind == "embed" or variant == "tab":
+            body = self._transcript_body(video_id, 0)
+        elif variant == "iframe":
+            body = IFRAME_BODY.format(video_id=video_id)
+        elif variant == "lazy":
+            body = self._transcript_body(video_id, self.line_delay)
+        else:
+            body = FAIL_BODY
+        self._send(200, PAGE_TEMPLATE.format(title=f"Mock video {video_id[:8]} ({variant})",
+                                             captions_url=captions_url, body=body))
+
+
+def make_server(port=0, latency=0.0, line_delay=50, host="127.0.0.1"):
+    """
+    Create the mock server.
+
+    Args:
+        port (int): Port to listen on, 0 picks a free one
+        latency (float): Seconds added to every response
+        line_delay (int): Milliseconds between transcript lines of the lazy variant
+        host (str): Interface to listen on
+
+    Returns:
+        ThreadingHTTPServer: Server, not yet serving; its base URL is server.base_url
+    """
+    handler = type("ConfiguredMockLoomHandler", (MockLoomHandler,), {"latency": latency, "line_delay": line_delay})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    handler.base_url = server.base_url
+    return server
+
+
+def start_in_background(**kwargs):
+    """Start the mock server on a daemon thread and return it."""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, name="mock-loom", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve Loom-like pages locally for benchmarking.')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response (default: 0)')
+    parser.add_argument('--line-delay', type=int, default=50,
+                        help='Milliseconds between lines of the lazy variant (default: 50)')
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.latency, args.line_delay)
+    print(f"Mock Loom site at {server.base_url}/share/<video id>")
+    for variant in VARIANTS:
+        print(f"  {variant}: {server.base_url}/share/{make_video_id(variant)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+near_duplicates.py
+
+Near-duplicate detection of transcripts with MinHash signatures and LSH.
+
+The same recording is sometimes scraped under several video IDs, and some sessions are
+recorded over and over with little change. Every transcript gets a MinHash signature of
+its 5-word shingles, timestamps left out, so its similarity to any other transcript is
+estimated from two short signatures. Signatures are bucketed by bands (locality sensitive
+hashing), so only transcripts that share a band are compared.
+
+The signatures of the LLM-ready transcripts are kept in .duplicates.json in their
+directory, together with the clusters of near-duplicates found among them. The largest
+transcript of a cluster is its canonical one; the others are its duplicates, which
+integrated_solution.py, search_index.py and chunker.py can leave out with
+--skip-duplicates, and which process.py --process-llm --skip-duplicates does not write.
+
+Usage:
+    python near_duplicates.py report llm_ready_transcripts [--threshold 0.8]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+from array import array
+
+DUPLICATES_FILENAME = ".duplicates.json"
+
+# Minimum estimated Jaccard similarity of the shingles of two near-duplicates
+DEFAULT_THRESHOLD = 0.8
+
+# Words per shingle
+SHINGLE_WORDS = 5
+
+# Signature slots; the signature is split into BANDS bands of SIGNATURE_SIZE // BANDS slots
+SIGNATURE_SIZE = 128
+BANDS = 32
+
+# Timestamps as in raw ("0:42") and cleaned ("[00:42]") transcripts, left out of shingles
+_TIMESTAMP = re.compile(r'\d{1,2}:\d{2}(?::\d{2})?')
+
+# Words of the shingles: runs of ASCII letters and digits, so a raw transcript and its
+# cleaned version have the same words
+_WORD = re.compile(r'[a-z0-9]+')
+
+_SLOT_BITS = SIGNATURE_SIZE.bit_length() - 1
+_EMPTY = (1 << 64) - 1
+
+
+def signature(text):
+    """
+    MinHash signature of a transcript, raw or cleaned.
+
+    Uses one-permutation hashing: every shingle is hashed once, the top bits of the hash
+    pick a signature slot and the slot keeps the smallest remaining bits. Empty slots take
+    the value of the next filled one, so short transcripts still compare slot by slot.
+
+    Args:
+        text (str): Transcript text
+
+    Returns:
+        array: SIGNATURE_SIZE 64-bit values, None for a text without words
+    """
+    words = _WORD.findall(_TIMESTAMP.sub(" ", text.lower()))
+    if not words:
+        return None
+    width = min(SHINGLE_WORDS, len(words))
+    slots = array('Q', [_EMPTY]) * SIGNATURE_SIZE
+    low_mask = (1 << (64 - _SLOT_BITS)) - 1
+    for start in range(len(words) - width + 1):
+        shingle = " ".join(words[start:start + width]).encode("utf-8")
+        value = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "big")
+        slot = value >> (64 - _SLOT_BITS)
+        value &= low_mask
+        if value < slots[slot]:
+            slots[slot] = value
+    # Densify, offsetting borrowed values per hop so they do not match filled slots by chance;
+    # there is at least one shingle, so some slot is filled
+    result = array('Q', slots)
+    for slot in range(SIGNATURE_SIZE):
+        if slots[slot] == _EMPTY:
+            hops = 1
+            while slots[(slot + hops) % SIGNATURE_SIZE] == _EMPTY:
+                hops += 1
+            result[slot] = slots[(slot + hops) % SIGNATURE_SIZE] + (hops << (64 - _SLOT_BITS))
+    return result
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of the shingles of two signatures."""
+    return sum(1 for a, b in zip(first, second) if a == b) / SIGNATURE_SIZE
+
+
+def band_keys(sig):
+    """LSH bucket keys of a signature, one per band."""
+    rows = SIGNATURE_SIZE // BANDS
+    return [(band, tuple(sig[band * rows:(band + 1) * rows])) for band in range(BANDS)]
+
+
+class DuplicateDetector:
+    """Signatures of the LLM-ready transcripts of a directory and their near-duplicate clusters."""
+
+    def __init__(self, directory, threshold=DEFAULT_THRESHOLD):
+        """
+        Args:
+            directory (str): Directory of the LLM-ready transcripts, where the report is kept
+            threshold (float): Minimum estimated similarity of near-duplicates
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, DUPLICATES_FILENAME)
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        # File name -> (mtime_ns, size, signature)
+        self.entries = {}
+        self.buckets = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    report = json.load(f)
+                if report.get("signature_size") == SIGNATURE_SIZE and report.get("shingle_words") == SHINGLE_WORDS:
+                    for name, entry in report.get("signatures", {}).items():
+                        self._add(name, entry["mtime_ns"], entry["size"],
+                                  array('Q', bytes.fromhex(entry["signature"])))
+            except (OSError, ValueError, KeyError, AttributeError) as e:
+                print(f"Ignoring unreadable duplicates report {self.path}: {str(e)}")
+
+    def _add(self, name, mtime_ns, size, sig):
+        self._discard(name)
+        self.entries[name] = (mtime_ns, size, sig)
+        for key in band_keys(sig):
+            self.buckets.setdefault(key, set()).add(name)
+
+    def _discard(self, name):
+        entry = self.entries.pop(name, None)
+        if entry is not None:
+            for key in band_keys(entry[2]):
+                self.buckets[key].discard(name)
+
+    def update(self):
+        """
+        Sign new and changed _llm.txt files of the directory and forget deleted ones.
+
+        Returns:
+            int: Number of files signed
+        """
+        signed = 0
+        present = set()
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith("_llm.txt") or not entry.is_file():
+                continue
+            present.add(entry.name)
+            stat = entry.stat()
+            known = self.entries.get(entry.name)
+            if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                continue
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    sig = signature(f.read())
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Error reading {entry.name}: {str(e)}")
+                continue
+            with self.lock:
+                if sig is None:
+                    self._discard(entry.name)
+                else:
+                    self._add(entry.name, stat.st_mtime_ns, stat.st_size, sig)
+            signed += 1
+        with self.lock:
+            for name in [name for name in self.entries if name not in present]:
+                self._discard(name)
+        return signed
+
+    def add(self, path):
+        """Sign one LLM-ready transcript that was just written."""
+        stat = os.stat(path)
+        with open(path, "r", encoding="utf-8") as f:
+            sig = signature(f.read())
+        if sig is not None:
+            with self.lock:
+                self._add(os.path.basename(path), stat.st_mtime_ns, stat.st_size, sig)
+
+    def _candidates(self, sig, exclude=None):
+        # File name -> similarity of the signed files sharing a band with sig
+        names = set()
+        for key in band_keys(sig):
+            names.update(self.buckets.get(key, ()))
+        names.discard(exclude)
+        found = {}
+        for name in names:
+            value = similarity(sig, self.entries[name][2])
+            if value >= self.threshold:
+                found[name] = value
+        return found
+
+    def find_duplicate(self, text, exclude=None):
+        """
+        Most similar signed transcript to a text, if it is a near-duplicate.
+
+        Args:
+            text (str): Transcript text, raw or cleaned
+            exclude (str): File name to leave out, typically the text's own output
+
+        Returns:
+            tuple: (file name, similarity), or None if there is no near-duplicate
+        """
+        sig = signature(text)
+        if sig is None:
+            return None
+        with self.lock:
+            found = self._candidates(sig, exclude)
+        if not found:
+            return None
+        return max(found.items(), key=lambda item: (item[1], item[0]))
+
+    def clusters(self):
+        """
+        Near-duplicate clusters of the signed transcripts.
+
+        Returns:
+            list: Clusters as dicts with the canonical file (the largest, then first by
+                name) and its duplicates with their similarity to it, largest cluster first
+        """
+        with self.lock:
+            parent = {}
+
+            def find(name):
+                while parent.get(name, name) != name:
+                    name = parent[name]
+                return name
+
+            for name, (_, _, sig) in self.entries.items():
+                for other in self._candidates(sig, exclude=name):
+                    first, second = find(name), find(other)
+                    if first != second:
+                        parent[max(first, second)] = min(first, second)
+            groups = {}
+            for name in parent:
+                groups.setdefault(find(name), set()).add(name)
+            for root in list(groups):
+                groups[root].add(root)
+
+            clusters = []
+            for members in groups.values():
+                canonical = min(members, key=lambda name: (-self.entries[name][1], name))
+                canonical_sig = self.entries[canonical][2]
+                duplicates = [{"file": name, "similarity": round(similarity(canonical_sig, self.entries[name][2]), 3)}
+                              for name in sorted(members - {canonical})]
+                clusters.append({"canonical": canonical, "duplicates": duplicates})
+        clusters.sort(key=lambda cluster: (-len(cluster["duplicates"]), cluster["canonical"]))
+        return clusters
+
+    def save(self, clusters=None):
+        """
+        Write the signatures and the clusters to the report file.
+
+        Returns:
+            list: The clusters written
+        """
+        if clusters is None:
+            clusters = self.clusters()
+        with self.lock:
+            signatures = {name: {"mtime_ns": mtime_ns, "size": size, "signature": sig.tobytes().hex()}
+                          for name, (mtime_ns, size, sig) in sorted(self.entries.items())}
+        report = {"signature_size": SIGNATURE_SIZE, "shingle_words": SHINGLE_WORDS,
+                  "threshold": self.threshold, "clusters": clusters, "signatures": signatures}
+        temporary_path = f"{self.path}.tmp"
+        try:
+            with open(temporary_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=1, ensure_ascii=False)
+            os.replace(temporary_path, self.path)
+        except OSError as e:
+            print(f"Could not save duplicates report {self.path}: {str(e)}")
+        return clusters
+
+
+def load_duplicates(directory):
+    """
+    File names of the duplicates recorded in a directory's report, canonical files excluded.
+
+    Returns:
+        set: Duplicate _llm.txt file names, empty if there is no readable report
+    """
+    path = os.path.join(directory, DUPLICATES_FILENAME)
+    if not os.path.exists(path):
+        return set()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            clusters = json.load(f).get("clusters", [])
+        return {duplicate["file"] for cluster in clusters for duplicate in cluster["duplicates"]}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"Ignoring unreadable duplicates report {path}: {str(e)}")
+        return set()
+
+
+def print_clusters(clusters):
+    for cluster in clusters:
+        print(f"{cluster['canonical']}")
+        for duplicate in cluster["duplicates"]:
+            print(f"    {duplicate['similarity']:.2f}  {duplicate['file']}")
+    duplicates = sum(len(cluster["duplicates"]) for cluster in clusters)
+    print(f"{len(clusters)} cluster(s) of near-duplicates, {duplicates} duplicate transcript(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find near-duplicate LLM-ready transcripts.')
+    parser.add_argument('command', choices=['report'], help='report: sign new transcripts and print the clusters')
+    parser.add_argument('directory', nargs='?', default="llm_ready_transcripts",
+                        help='Directory of _llm.txt files (default: llm_ready_transcripts)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Minimum estimated similarity of near-duplicates (default: {DEFAULT_THRESHOLD})')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"Not a directory: {args.directory}")
+    if not 0 < args.threshold <= 1:
+        parser.error("--threshold must be between 0 and 1")
+
+    detector = DuplicateDetector(args.directory, args.threshold)
+    signed = detector.update()
+    print(f"Signed {signed} transcripts, {len(detector.entries)} in {os.path.join(args.directory, DUPLICATES_FILENAME)}")
+    print_clusters(detector.save())
+
+
+if __name__ == "__main__":
+    main()
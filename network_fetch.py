@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+network_fetch.py
+
+Transcript fetching that skips DOM scraping, used by process.py --fetch-mode network.
+
+The Loom player downloads the captions for a video as a separate payload. While the
+browser is still being used, that payload is found in Chrome's performance (CDP network)
+log and read straight from the response. Once the captions URL is known, later videos are
+fetched over a pooled HTTP session that reuses the browser's login cookies: the share page
+gives the title and the captions URL, and the captions are parsed into the same
+"timestamp / text" layout the DOM extraction produces.
+"""
+
+import html
+import json
+import re
+import threading
+
+import urllib3
+
+# URLs of network responses that may carry the transcript
+CAPTIONS_URL_PATTERN = re.compile(r'(transcri|caption|subtitle|\.vtt\b|\.srt\b)', re.IGNORECASE)
+# Captions URLs embedded in the share page HTML or JSON state
+EMBEDDED_URL_PATTERN = re.compile(
+    r'''https?:(?:\\?/){2}[^"'\s<>]*(?:transcri|caption|subtitle|\.vtt|\.srt)[^"'\s<>]*''',
+    re.IGNORECASE)
+TITLE_PATTERN = re.compile(r'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+CUE_TIME_PATTERN = re.compile(
+    r'(?:(\d+):)?(\d{1,2}):(\d{2})[.,]\d{3}\s*-->\s*(?:\d+:)?\d{1,2}:\d{2}[.,]\d{3}')
+
+TEXT_KEYS = ("text", "value", "content", "phrase", "caption")
+# Keys whose values are always in milliseconds
+MILLISECOND_KEYS = ("startMs", "start_ms", "startTimeMs", "offsetMs", "offset_ms")
+TIME_KEYS = ("start", "ts", "startTime", "start_time", "start_ts", "startSeconds", "offset") + MILLISECOND_KEYS
+
+# Captions under other keys are taken for milliseconds when the last phrase starts later
+# than this many seconds per phrase, far slower than anyone speaks
+MAX_SECONDS_PER_PHRASE = 300
+
+
+def format_timestamp(seconds):
+    """Format seconds as MM:SS, or H:MM:SS for recordings longer than an hour."""
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def parse_vtt(payload):
+    """
+    Convert a WebVTT or SRT captions payload to transcript text.
+
+    Args:
+        payload (str): Captions file content
+
+    Returns:
+        str: One timestamp line followed by its text for every cue
+    """
+    lines = []
+    cue_start = None
+    cue_text = []
+    for raw_line in payload.splitlines() + [""]:
+        line = raw_line.strip()
+        match = CUE_TIME_PATTERN.search(line)
+        if match:
+            hours, minutes, secs = match.groups()
+            cue_start = int(hours or 0) * 3600 + int(minutes) * 60 + int(secs)
+            cue_text = []
+        elif not line:
+            if cue_start is not None and cue_text:
+                lines.append(format_timestamp(cue_start))
+                lines.append(" ".join(cue_text))
+            cue_start = None
+            cue_text = []
+        elif cue_start is not None:
+            # Drop inline voice/styling tags such as <v Speaker> or <c>
+            cue_text.append(re.sub(r'<[^>]+>', '', line))
+    return "\n".join(lines)
+
+
+def find_segments(data):
+    """Return the first list of dicts in a JSON document that looks like timed phrases."""
+    if isinstance(data, list):
+        if data and all(isinstance(item, dict) for item in data):
+            sample = data[0]
+            if any(key in sample for key in TEXT_KEYS) and any(key in sample for key in TIME_KEYS):
+                return data
+        for item in data:
+            segments = find_segments(item)
+            if segments:
+                return segments
+    elif isinstance(data, dict):
+        for value in data.values():
+            segments = find_segments(value)
+            if segments:
+                return segments
+    return None
+
+
+def parse_json_transcript(payload):
+    """
+    Convert a JSON transcript payload (a list of timed phrases anywhere in the document).
+
+    Args:
+        payload (str): JSON content
+
+    Returns:
+        str: Transcript text, or an empty string if no timed phrases were found
+    """
+    try:
+        segments = find_segments(json.loads(payload))
+    except ValueError:
+        return ""
+    if not segments:
+        return ""
+
+    phrases = []
+    milliseconds = False
+    for segment in segments:
+        text = next((segment[key] for key in TEXT_KEYS if segment.get(key)), "")
+        time_key = next((key for key in TIME_KEYS if segment.get(key) is not None), None)
+        try:
+            start = float(segment[time_key]) if time_key else 0.0
+        except (TypeError, ValueError):
+            start = 0.0
+        milliseconds = milliseconds or time_key in MILLISECOND_KEYS
+        if isinstance(text, str) and text.strip():
+            phrases.append((start, text.strip()))
+
+    # One unit for the whole payload, so timestamps cannot jump between phrases
+    if phrases and not milliseconds:
+        milliseconds = max(start for start, _ in phrases) > MAX_SECONDS_PER_PHRASE * len(phrases)
+    lines = []
+    for start, text in phrases:
+        lines.append(format_timestamp(start / 1000 if milliseconds else start))
+        lines.append(text)
+    return "\n".join(lines)
+
+
+def parse_captions(payload):
+    """Parse a captions payload in any supported format, returns "" if it is not one."""
+    if not payload:
+        return ""
+    stripped = payload.lstrip()
+    if stripped.startswith("{") or stripped.startswith("["):
+        return parse_json_transcript(payload)
+    if "-->" in payload:
+        return parse_vtt(payload)
+    return ""
+
+
+class NetworkTranscriptFetcher:
+    """
+    Finds the captions payload a Loom page downloads and fetches it directly afterwards.
+
+    A single instance is shared by all browser workers; the pooled HTTP session and the
+    learned captions URL template are thread-safe.
+    """
+
+    def __init__(self, base_url="https://www.loom.com", timeout=15, max_connections=10):
+        """
+        Args:
+            base_url (str): Loom site root, share pages live under {base_url}/share/
+            timeout (float): Timeout in seconds for direct HTTP requests
+            max_connections (int): Size of the HTTP connection pool per host
+        """
+        self.base_url = base_url.rstrip("/")
+        self.http = urllib3.PoolManager(
+            maxsize=max_connections,
+            timeout=urllib3.Timeout(total=timeout),
+            retries=urllib3.Retry(total=2, backoff_factor=0.5),
+        )
+        self.headers = {"User-Agent": "Mozilla/5.0 (loom-transcript-scraper)"}
+        self.url_template = None
+        self.lock = threading.Lock()
+
+    def set_cookies(self, cookies):
+        """
+        Reuse the browser's login cookies for direct requests.
+
+        Args:
+            cookies (list): Cookies as returned by driver.get_cookies()
+        """
+        cookie_header = "; ".join(f"{c['name']}={c['value']}" for c in cookies)
+        with self.lock:
+            self.headers = dict(self.headers, Cookie=cookie_header)
+
+    def can_fetch_directly(self):
+        """True once a captions URL has been seen, so later videos can skip the browser."""
+        return self.url_template is not None
+
+    def learn_url(self, captions_url, video_id):
+        """Remember how a captions URL is built from a video ID."""
+        if video_id and video_id in captions_url:
+            with self.lock:
+                self.url_template = captions_url.replace(video_id, "{video_id}")
+
+    def get(self, url):
+        """GET a URL over the pooled session, returns the body text or None on failure."""
+        try:
+            response = self.http.request("GET", url, headers=self.headers)
+        except urllib3.exceptions.HTTPError as e:
+            print(f"Direct request failed for {url}: {str(e)}")
+            return None
+        if response.status != 200:
+            print(f"Direct request for {url} returned HTTP {response.status}")
+            return None
+        return response.data.decode("utf-8", errors="replace")
+
+    def capture_from_browser(self, driver, video_id, entries=None):
+        """
+        Look through the browser's network log for the captions payload of the current page.
+
+        Args:
+            driver: WebDriver started with performance logging enabled
+            video_id (str): Video ID of the page that is open
+            entries (list): Performance log entries already read from the driver; the log
+                is read here when not given
+
+        Returns:
+            str: Transcript text, or an empty string if no captions payload was found
+        """
+        if entries is None:
+            try:
+                entries = driver.get_log("performance")
+            except Exception as e:
+                print(f"Performance log not available: {str(e)}")
+                return ""
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            if message.get("method") != "Network.responseReceived":
+                continue
+            params = message.get("params", {})
+            response_url = params.get("response", {}).get("url", "")
+            if not CAPTIONS_URL_PATTERN.search(response_url):
+                continue
+            try:
+                body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": params["requestId"]})
+            except Exception:
+                continue
+            transcript_text = parse_captions(body.get("body", ""))
+            if transcript_text:
+                print(f"Found captions payload in network log: {response_url}")
+                self.learn_url(response_url, video_id)
+                return transcript_text
+        return ""
+
+    def fetch(self, video_id, share_url):
+        """
+        Fetch a transcript without rendering the page.
+
+        Args:
+            video_id (str): Bare video ID
+            share_url (str): URL of the video's share page
+
+        Returns:
+            tuple: (title, transcript text), or None if the direct fetch failed
+        """
+        page = self.get(share_url)
+        if page is None:
+            return None
+
+        title = ""
+        title_match = TITLE_PATTERN.search(page)
+        if title_match:
+            title = html.unescape(title_match.group(1)).replace(" - Loom", "").strip()
+
+        # Prefer a captions URL embedded in the page, otherwise build one from the template
+        candidate_urls = [url.replace("\\/", "/") for url in EMBEDDED_URL_PATTERN.findall(page)]
+        if self.url_template:
+            candidate_urls.append(self.url_template.replace("{video_id}", video_id))
+
+        for captions_url in dict.fromkeys(candidate_urls):
+            transcript_text = parse_captions(self.get(captions_url))
+            if transcript_text:
+                return title, transcript_text
+        return None
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+output_index.py
+
+Sidecar index of the LLM-ready transcripts, so that only stale outputs are regenerated.
+
+For every _llm.txt file the index in its directory (.llm-index.json) records the content
+hash, modification time and size of the transcript it was cleaned from, and the version
+of the cleaning rules that produced it. An output is regenerated when it is missing, when
+its transcript's content changed or when the cleaning rules changed. A transcript that was
+rewritten with the same content (as a --force re-scrape does) only costs a hash, and a
+regenerated output that is identical to the file on disk is not rewritten, so the output
+files only change when their content does.
+"""
+
+import filecmp
+import hashlib
+import io
+import json
+import os
+import threading
+
+from transcript_cleaner import RULES_VERSION, clean_stream
+
+INDEX_FILENAME = ".llm-index.json"
+
+# Characters read at a time when hashing and cleaning transcripts
+READ_WINDOW = 65536
+
+
+class OutputIndex:
+    """Thread-safe output name -> source fingerprint map stored as a JSON file."""
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory (str): Directory of the LLM-ready transcripts the index belongs to
+        """
+        self.path = os.path.join(directory, INDEX_FILENAME)
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f).get("outputs", {})
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"Ignoring unreadable output index {self.path}: {str(e)}")
+
+    def get(self, name):
+        """Index entry of an output file name, None if it is not indexed."""
+        with self.lock:
+            return self.entries.get(name)
+
+    def set(self, name, entry):
+        """Record the entry of an output file name; saved by save()."""
+        with self.lock:
+            if self.entries.get(name) != entry:
+                self.entries[name] = entry
+                self.dirty = True
+
+    def save(self):
+        """Write the index if anything changed since it was loaded or last saved."""
+        with self.lock:
+            if not self.dirty:
+                return
+            temporary_path = f"{self.path}.tmp"
+            try:
+                with open(temporary_path, "w", encoding="utf-8") as f:
+                    json.dump({"rules_version": RULES_VERSION, "outputs": self.entries}, f,
+                              indent=1, sort_keys=True, ensure_ascii=False)
+                os.replace(temporary_path, self.path)
+                self.dirty = False
+            except OSError as e:
+                print(f"Could not save output index {self.path}: {str(e)}")
+
+
+def is_unchanged(entry, source_stat):
+    """
+    True if an entry was made by the current cleaning rules from a transcript with the same
+    modification time and size, so the output is up to date without reading anything.
+    """
+    return (entry is not None and entry.get("rules_version") == RULES_VERSION
+            and entry.get("source_mtime_ns") == source_stat.st_mtime_ns
+            and entry.get("source_size") == source_stat.st_size)
+
+
+def _open_source(source_path, text):
+    if text is not None:
+        return io.StringIO(text)
+    return open(source_path, "r", encoding="utf-8")
+
+
+def source_hash(source_path, text=None):
+    """
+    SHA-256 of a transcript's text, equal to manifest.content_hash() of the whole text but
+    read in windows.
+    """
+    digest = hashlib.sha256()
+    with _open_source(source_path, text) as source:
+        for block in iter(lambda: source.read(READ_WINDOW), ""):
+            digest.update(block.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def refresh_output(source_path, target_path, entry=None, force=False, text=None, output_exists=None,
+                   source_stat=None):
+    """
+    Regenerate an LLM-ready transcript if it is stale.
+
+    The transcript is hashed and cleaned in windows with clean_stream(), so memory does
+    not grow with its length. The new output is written next to the old one and only
+    replaces it when the two differ.
+
+    Args:
+        source_path (str): Transcript to clean
+        target_path (str): LLM-ready output file
+        entry (dict): Index entry of the output, None if it is not indexed
+        force (bool): Clean the transcript even if the output is up to date
+        text (str): Transcript content if already in memory, read from source_path otherwise
+        output_exists (bool): Whether target_path exists, checked when not given
+        source_stat (os.stat_result): Modification time and size to record for the
+            transcript, taken from source_path when not given
+
+    Returns:
+        tuple: (status, entry) where status is "fresh" (up to date, nothing done),
+            "unchanged" (regenerated, identical to the file on disk, not rewritten) or
+            "written", and entry is the new index entry of the output
+    """
+    if source_stat is None:
+        source_stat = os.stat(source_path)
+    if output_exists is None:
+        output_exists = os.path.exists(target_path)
+    up_to_date = output_exists and not force and entry is not None and entry.get("rules_version") == RULES_VERSION
+    if up_to_date and is_unchanged(entry, source_stat):
+        return "fresh", entry
+
+    new_entry = {
+        "source": os.path.basename(source_path),
+        "source_hash": source_hash(source_path, text),
+        "source_mtime_ns": source_stat.st_mtime_ns,
+        "source_size": source_stat.st_size,
+        "rules_version": RULES_VERSION,
+    }
+    # The transcript was rewritten with the same content
+    if up_to_date and entry.get("source_hash") == new_entry["source_hash"]:
+        return "fresh", new_entry
+
+    temporary_path = f"{target_path}.tmp"
+    try:
+        with _open_source(source_path, text) as source, open(temporary_path, "w", encoding="utf-8") as target:
+            clean_stream(source, target.write, READ_WINDOW)
+        if output_exists and filecmp.cmp(temporary_path, target_path, shallow=False):
+            return "unchanged", new_entry
+        os.replace(temporary_path, target_path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    return "written", new_entry
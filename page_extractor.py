@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+page_extractor.py
+
+In-page transcript extraction for process.py.
+
+The four DOM extraction methods run as one injected script, so a single execute_script
+call returns the best transcript candidate instead of one WebDriver round trip per element.
+Strategies live in a registry of JavaScript function bodies; new page layouts can be
+supported by registering another strategy without any Python-side DOM walking.
+
+Each strategy body receives a `helpers` object and returns the transcript text or "":
+    helpers.xpath(expression)  -> array of matching elements
+    helpers.css(selector)      -> array of matching elements
+    helpers.text(element)      -> trimmed visible text of an element
+"""
+
+from collections import OrderedDict
+
+# Strategies are tried in registration order; the first non-empty result wins
+EXTRACTION_STRATEGIES = OrderedDict()
+
+
+def register_strategy(name, js_body, before=None):
+    """
+    Add a JavaScript extraction strategy to the registry.
+
+    Args:
+        name (str): Strategy name reported back with the result
+        js_body (str): Body of a JavaScript function taking `helpers`, returning text or ""
+        before (str): Insert ahead of this existing strategy instead of at the end
+    """
+    EXTRACTION_STRATEGIES.pop(name, None)
+    if before is None or before not in EXTRACTION_STRATEGIES:
+        EXTRACTION_STRATEGIES[name] = js_body
+        return
+    items = list(EXTRACTION_STRATEGIES.items())
+    position = [key for key, _ in items].index(before)
+    items.insert(position, (name, js_body))
+    EXTRACTION_STRATEGIES.clear()
+    EXTRACTION_STRATEGIES.update(items)
+
+
+# Method 1: longest transcript/captions container that looks like transcript content
+register_strategy("containers", """
+    var best = "";
+    helpers.xpath(
+        "//div[contains(@class, 'transcript') or contains(@class, 'captions')]//div | " +
+        "//div[starts-with(@id, 'transcript-') or starts-with(@id, 'captions-')] | " +
+        "//div[@role='tabpanel' and .//div[contains(text(), 'Transcript')]]//div"
+    ).forEach(function(el) {
+        var text = helpers.text(el);
+        if (text.length > 50 && (text.indexOf('\\n') !== -1 || text.indexOf(':') !== -1) && text.length > best.length) {
+            best = text;
+        }
+    });
+    return best;
+""")
+
+# Method 2: the container two levels above short timestamp divs. Each container is
+# measured once, so long videos no longer read the same text for every timestamp.
+register_strategy("timestamps", """
+    var best = "";
+    var seen = new Set();
+    helpers.xpath("//div[contains(text(), ':') and string-length(normalize-space(text())) <= 8]/..").forEach(function(el) {
+        var parent = el.parentElement;
+        if (!parent || seen.has(parent)) return;
+        seen.add(parent);
+        var text = helpers.text(parent);
+        if (text.length > 100 && text.indexOf('\\n') !== -1 && text.length > best.length) {
+            best = text;
+        }
+    });
+    return best;
+""")
+
+# Method 3: all transcript paragraphs joined together
+register_strategy("paragraphs", """
+    var paragraphs = [];
+    helpers.css("div.transcript p, div.transcript div, div[role='tabpanel'] p, div[data-testid*='transcript'] div").forEach(function(el) {
+        var text = helpers.text(el);
+        if (text) paragraphs.push(text);
+    });
+    return paragraphs.join('\\n\\n');
+""")
+
+# Method 4: whole transcript section text
+register_strategy("section", """
+    var sections = helpers.xpath(
+        "//div[@role='tabpanel' and .//div[contains(text(), 'Transcript')]] | " +
+        "//section[contains(@class, 'transcript')] | " +
+        "//div[contains(@class, 'transcript-container')]"
+    );
+    if (!sections.length) return "";
+    var text = helpers.text(sections[0]);
+    return text.length > 50 ? text : "";
+""")
+
+EXTRACTOR_TEMPLATE = """
+var helpers = {
+    xpath: function(expression) {
+        var result = document.evaluate(expression, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        var nodes = [];
+        for (var i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+        return nodes;
+    },
+    css: function(selector) {
+        return Array.from(document.querySelectorAll(selector));
+    },
+    text: function(el) {
+        return ((el && el.innerText) || '').trim();
+    }
+};
+var strategies = [%s];
+var attempts = {};
+for (var i = 0; i < strategies.length; i++) {
+    var name = strategies[i][0];
+    try {
+        var text = strategies[i][1](helpers) || '';
+        attempts[name] = text.length;
+        if (text) return {text: text, strategy: name, length: text.length, attempts: attempts};
+    } catch (e) {
+        attempts[name] = 'error: ' + e.message;
+    }
+}
+return {text: '', strategy: null, length: 0, attempts: attempts};
+"""
+
+
+def build_extractor_script(strategies=None):
+    """
+    Build the injected script for the given strategy names (all registered ones by default).
+
+    Args:
+        strategies (list): Strategy names in the order they should be tried
+
+    Returns:
+        str: JavaScript source for driver.execute_script()
+    """
+    names = strategies or list(EXTRACTION_STRATEGIES)
+    entries = ",\n".join(
+        f"[{name!r}, function(helpers) {{{EXTRACTION_STRATEGIES[name]}}}]"
+        for name in names if name in EXTRACTION_STRATEGIES
+    )
+    return EXTRACTOR_TEMPLATE % entries
+
+
+def extract_transcript(driver, strategies=None):
+    """
+    Run all extraction strategies inside the page in a single round trip.
+
+    Args:
+        driver: WebDriver instance, switched to the frame holding the transcript
+        strategies (list): Optional strategy names to try, in order
+
+    Returns:
+        dict: text, strategy (name or None), length and per-strategy attempts
+    """
+    result = driver.execute_script(build_extractor_script(strategies))
+    return result or {"text": "", "strategy": None, "length": 0, "attempts": {}}
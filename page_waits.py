@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+page_waits.py
+
+Readiness waits used by process.py instead of fixed time.sleep() calls.
+
+Each wait polls the page for a concrete condition (document loaded, Transcript tab
+clickable, transcript text no longer growing) and returns as soon as it holds. All waits
+draw from a per-video time budget so one slow page cannot stall a run.
+"""
+
+import time
+
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+POLL_FREQUENCY = 0.25
+
+# Tab lookups that used to run as three chained 10 second waits, in order of preference
+TRANSCRIPT_TAB_STRATEGIES = [
+    ("class name", By.CSS_SELECTOR, "button.css-1qz66q8"),
+    ("exact text", By.XPATH, "//button[text()='Transcript']"),
+    ("partial text", By.XPATH, "//button[contains(text(), 'Transcript')]"),
+]
+
+# Returns the length of the longest text block that looks like the transcript panel
+TRANSCRIPT_TEXT_LENGTH_JS = """
+    var selectors = [
+        "[class*='transcript']", "[class*='captions']",
+        "[id^='transcript-']", "[id^='captions-']",
+        "[data-testid*='transcript']", "div[role='tabpanel']"
+    ];
+    var longest = 0;
+    document.querySelectorAll(selectors.join(',')).forEach(function(el) {
+        var length = (el.innerText || '').trim().length;
+        if (length > longest) longest = length;
+    });
+    return longest;
+"""
+
+
+class VideoDeadline:
+    """Time budget shared by all waits for a single video."""
+
+    def __init__(self, budget):
+        """
+        Args:
+            budget (float): Total seconds allowed for this video
+        """
+        self.budget = budget
+        self.started = time.monotonic()
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def remaining(self):
+        return max(0.0, self.budget - self.elapsed())
+
+    def timeout(self, step_timeout):
+        """Return the smaller of a step's own timeout and the remaining budget."""
+        return min(step_timeout, self.remaining())
+
+
+class text_length_stable:
+    """
+    Wait condition that holds once the transcript panel has text and its length has not
+    changed for stable_for seconds.
+    """
+
+    def __init__(self, min_length=1, stable_for=1.0):
+        self.min_length = min_length
+        self.stable_for = stable_for
+        self.last_length = None
+        self.last_change = None
+
+    def __call__(self, driver):
+        length = driver.execute_script(TRANSCRIPT_TEXT_LENGTH_JS) or 0
+        now = time.monotonic()
+        if length != self.last_length:
+            self.last_length = length
+            self.last_change = now
+            return False
+        if length >= self.min_length and now - self.last_change >= self.stable_for:
+            return length
+        return False
+
+
+def first_clickable(strategies):
+    """
+    Wait condition that checks every strategy on each poll and returns the first
+    visible, enabled match as (element, strategy name).
+    """
+    def condition(driver):
+        for name, by, selector in strategies:
+            try:
+                for element in driver.find_elements(by, selector):
+                    if element.is_displayed() and element.is_enabled():
+                        return element, name
+            except (StaleElementReferenceException, WebDriverException):
+                continue
+        return False
+    return condition
+
+
+def wait_for_page_ready(driver, deadline, timeout=15):
+    """
+    Wait until the document has finished loading and has a title.
+
+    Args:
+        driver: WebDriver instance
+        deadline (VideoDeadline): Per-video time budget
+        timeout (float): Maximum seconds for this step
+
+    Returns:
+        float: Seconds spent waiting
+    """
+    started = time.monotonic()
+    WebDriverWait(driver, deadline.timeout(timeout), poll_frequency=POLL_FREQUENCY).until(
+        lambda d: d.execute_script("return document.readyState") == "complete" and d.title
+    )
+    return time.monotonic() - started
+
+
+def find_transcript_tab(driver, deadline, timeout=10, strategies=None):
+    """
+    Look for the Transcript tab with all selector strategies in a single poll loop.
+
+    Args:
+        driver: WebDriver instance
+        deadline (VideoDeadline): Per-video time budget
+        timeout (float): Maximum seconds for this step
+        strategies (list): (name, By, selector) tuples, defaults to TRANSCRIPT_TAB_STRATEGIES
+
+    Returns:
+        tuple: (element, strategy name)
+
+    Raises:
+        TimeoutException: If no strategy found a clickable tab in time
+    """
+    return WebDriverWait(driver, deadline.timeout(timeout), poll_frequency=POLL_FREQUENCY).until(
+        first_clickable(strategies or TRANSCRIPT_TAB_STRATEGIES),
+        message="Transcript tab not found"
+    )
+
+
+def wait_for_transcript_text(driver, deadline, timeout=15, stable_for=1.0):
+    """
+    Wait until the transcript panel is populated and its text has stopped growing.
+
+    Args:
+        driver: WebDriver instance
+        deadline (VideoDeadline): Per-video time budget
+        timeout (float): Maximum seconds for this step
+        stable_for (float): Seconds the text length must stay unchanged
+
+    Returns:
+        int: Length of the transcript panel text
+
+    Raises:
+        TimeoutException: If the text did not settle in time
+    """
+    return WebDriverWait(driver, deadline.timeout(timeout), poll_frequency=POLL_FREQUENCY).until(
+        text_length_stable(stable_for=stable_for),
+        message="Transcript text did not settle"
+    )
@@ -2,17 +2,34 @@ from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException, NoSuchElementException, StaleElementReferenceException
-from webdriver_manager.chrome import ChromeDriverManager
-import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
 import re
-import string
+import time
 import os
+import shutil
 import tempfile
-import json
+import threading
 import argparse
+from worker_pool import run_worker_pool
+from page_waits import (VideoDeadline, wait_for_page_ready, find_transcript_tab, wait_for_transcript_text,
+                        TRANSCRIPT_TAB_STRATEGIES)
+from network_fetch import NetworkTranscriptFetcher
+from debug_capture import DEBUG_LEVELS, DebugRecorder
+from page_extractor import EXTRACTION_STRATEGIES, extract_transcript
+from browser_profile import prepare_profile_dir, is_session_valid
+from llm_pipeline import LLMPipeline
+from manifest import Manifest, DEFAULT_MANIFEST, DEFAULT_DOWNLOAD_DIR
+from job_queue import JobQueue
+from rate_controller import RateController, is_throttled_page
+from browser_supervisor import SupervisedDriver
+from lean_pages import LeanPages, add_lean_options, read_performance_log
+from layout_cache import LayoutCache, DEFAULT_LAYOUT_CACHE, layout_fingerprint
+from run_log import RunLog, DEFAULT_RUN_LOG
+from output_index import OutputIndex, refresh_output
+from search_index import SearchIndex
+from near_duplicates import DuplicateDetector
+from browser_setup import (find_browser, resolve_driver, attach_options, DEFAULT_CACHE_FILE,
+                           DEFAULT_DEBUGGER_ADDRESS)
 # Parse command-line arguments
 parser = argparse.ArgumentParser(description='Extract transcripts from Loom videos.')
 parser.add_argument('--input-file', type=str, default='loom-videos.txt',
@@ -25,21 +42,97 @@ parser.add_argument('--process-llm', action='store_true',
                 help='Process transcripts for LLM after downloading')
 parser.add_argument('--llm-dir', type=str, default="llm_ready_transcripts",
                 help='Directory to store LLM-ready transcripts (default: llm_ready_transcripts')
+parser.add_argument('--llm-workers', type=int, default=1,
+                help='Number of background threads cleaning transcripts for LLM (default: 1)')
+parser.add_argument('--skip-duplicates', action='store_true',
+                help='With --process-llm, do not write or index transcripts that nearly duplicate an existing LLM-ready one')
+parser.add_argument('--download-dir', type=str, default=DEFAULT_DOWNLOAD_DIR,
+                help=f'Directory to save transcripts to (default: {DEFAULT_DOWNLOAD_DIR})')
+parser.add_argument('--workers', type=int, default=1,
+                    help='Number of browser workers processing videos in parallel (default: 1)')
+parser.add_argument('--video-timeout', type=float, default=45,
+                    help='Time budget in seconds for all page waits of a single video (default: 45)')
+parser.add_argument('--video-delay', type=float, default=5,
+                    help='Starting seconds between page loads, adapted to how Loom responds (default: 5)')
+parser.add_argument('--min-video-delay', type=float, default=1,
+                    help='Shortest adaptive delay in seconds between page loads (default: 1)')
+parser.add_argument('--max-video-delay', type=float, default=120,
+                    help='Longest adaptive delay in seconds between page loads (default: 120)')
+parser.add_argument('--fetch-mode', choices=['dom', 'network'], default='dom',
+                    help='dom: scrape the rendered transcript panel; network: read the captions payload '
+                         'directly and fall back to the page only on failure (default: dom)')
+parser.add_argument('--lean-pages', action='store_true',
+                    help='Block video, image, font and tracking requests and report bytes saved per video')
+parser.add_argument('--layout-cache', type=str, default=DEFAULT_LAYOUT_CACHE,
+                    help=f'File remembering which tab selector and extraction strategy worked per page layout '
+                         f'(default: {DEFAULT_LAYOUT_CACHE})')
+parser.add_argument('--browser-binary', type=str,
+                    help='Chrome, Chromium or Brave executable (default: $LOOM_BROWSER or the first one found)')
+parser.add_argument('--driver-path', type=str,
+                    help='chromedriver to use instead of the cached or downloaded one')
+parser.add_argument('--driver-cache', type=str, default=DEFAULT_CACHE_FILE,
+                    help=f'Cache of resolved browser drivers (default: {DEFAULT_CACHE_FILE})')
+parser.add_argument('--offline', action='store_true',
+                    help='Never download a driver; use the cache, PATH or Selenium Manager')
+parser.add_argument('--attach', nargs='?', const=DEFAULT_DEBUGGER_ADDRESS, metavar='HOST:PORT',
+                    help=f'Attach to a running browser started with remote debugging '
+                         f'(see browser_setup.py prewarm, default address: {DEFAULT_DEBUGGER_ADDRESS})')
+parser.add_argument('--run-log', type=str, default=DEFAULT_RUN_LOG,
+                    help=f'JSONL file receiving one timing record per video (default: {DEFAULT_RUN_LOG})')
+parser.add_argument('--debug-level', choices=DEBUG_LEVELS, default='failure',
+                    help='off: no debug artifacts; failure: keep snapshots in memory and write screenshots and '
+                         'page details only when extraction fails; full: write everything for every video (default: failure)')
+parser.add_argument('--profile-dir', type=str, default=None,
+                    help='Persistent Chrome profile directory; the Loom login is kept between runs '
+                         '(default: a temporary profile that is removed afterwards)')
+parser.add_argument('--headless', action='store_true',
+                    help='Run the browser headless and never prompt; requires a still-valid login in --profile-dir')
+parser.add_argument('--manifest', type=str, default=DEFAULT_MANIFEST,
+                    help=f'SQLite manifest recording the status of every video (default: {DEFAULT_MANIFEST})')
+parser.add_argument('--recycle-after', type=int, default=50,
+                    help='Replace each browser with a fresh one after this many videos, 0 to disable (default: 50)')
+parser.add_argument('--max-browser-memory', type=float, default=2048,
+                    help='Replace a browser once it uses more than this many MB of memory, 0 to disable (default: 2048)')
+parser.add_argument('--max-attempts', type=int, default=3,
+                    help='Attempts per video before it is given up as failed (default: 3)')
+parser.add_argument('--retry-delay', type=float, default=30,
+                    help='Seconds before retrying a failed video, doubled after every further failure (default: 30)')
+parser.add_argument('--retry-failed', action='store_true',
+                    help='Give videos that failed on every attempt in earlier runs a fresh set of retries')
+parser.add_argument('--base-url', type=str, default='https://www.loom.com',
+                    help='Loom site root, e.g. a local stand-in server for testing (default: https://www.loom.com)')
 args = parser.parse_args()
 
 # File paths
 input_file = args.input_file
 processed_file = "loom-videos-processed.txt"
-download_dir = "/Users/mss/Desktop/BuildrWealth/Loom Transcripts"
+download_dir = args.download_dir
+loom_base_url = args.base_url.rstrip("/")
+share_url_prefix = f"{loom_base_url}/share/"
+
+# Video ID of a share URL on any host, so loom.com URLs in the input also work against --base-url
+SHARE_URL_PATTERN = re.compile(r'/share/([0-9a-zA-Z_-]+)')
 
-# Initialize set of processed videos
-processed_videos = set()
+# Guards shared run state when several workers are running
+state_lock = threading.Lock()
 
-# Check if processed file exists and load already processed videos
-if os.path.exists(processed_file):
-    with open(processed_file, "r") as f:
-        processed_videos = set(line.strip() for line in f if line.strip())
-    print(f"Loaded {len(processed_videos)} previously processed videos from {processed_file}")
+# Open the manifest of processed videos; the first run imports the legacy processed list
+# and the transcripts already in the download directory
+manifest = Manifest(args.manifest)
+imported = manifest.import_legacy(processed_file, download_dir)
+if imported:
+    print(f"Imported {imported} previously processed videos from {processed_file} and {download_dir}")
+print(f"Manifest {args.manifest}: {manifest.counts().get('done', 0)} videos already processed")
+
+# Durable queue of videos to process; videos left running by a killed run are resumed
+jobs = JobQueue(manifest, max_attempts=args.max_attempts, retry_delay=args.retry_delay)
+recovered = jobs.recover()
+if recovered:
+    print(f"Resuming {recovered} videos that were interrupted in an earlier run")
+
+# One adaptive pace for all workers: speeds up on clean loads, backs off on slow or throttled ones
+rate = RateController(initial_delay=args.video_delay, min_delay=args.min_video_delay,
+                      max_delay=args.max_video_delay, slow_load=args.video_timeout / 3)
 
 # Ensure download directory exists
 if not os.path.exists(download_dir):
@@ -56,615 +149,680 @@ if args.process_llm:
         print(f"Created directory for LLM-ready transcripts: {llm_dir}")
     else:
         print(f"Using existing directory for LLM-ready transcripts: {llm_dir}")
+    # Source hashes and cleaning rules version of every LLM-ready transcript
+    llm_index = OutputIndex(llm_dir)
+    # Full-text index of the LLM-ready transcripts, brought up to date before new ones are added
+    search_index = SearchIndex(llm_dir)
+    # Signatures of the LLM-ready transcripts, to recognize new near-duplicates
+    duplicate_detector = None
+    duplicates = ()
+    if args.skip_duplicates:
+        duplicate_detector = DuplicateDetector(llm_dir)
+        duplicate_detector.update()
+        duplicates = {duplicate["file"] for cluster in duplicate_detector.save() for duplicate in cluster["duplicates"]}
+    indexed, _, removed = search_index.update(skip=duplicates)
+    if indexed or removed:
+        print(f"Search index updated: {indexed} transcripts indexed, {removed} removed")
     print(f"Using existing download directory: {download_dir}")
-# Create a temporary directory for the Chrome user data
-temp_dir = tempfile.mkdtemp()
-print(f"Using temporary directory for Chrome profile: {temp_dir}")
-
-# Set up Chrome options
-chrome_options = Options()
-chrome_options.add_argument(f"user-data-dir={temp_dir}")
-chrome_options.add_argument("--no-first-run")
-chrome_options.add_argument("--no-default-browser-check")
-chrome_options.add_argument("--start-maximized")
-chrome_options.add_argument("--disable-extensions")
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-chrome_options.add_experimental_option("useAutomationExtension", False)
-chrome_options.binary_location = "/Applications/Brave Browser.app/Contents/MacOS/Brave Browser"
-
-# Set download directory preference
-chrome_options.add_experimental_option("prefs", {
-    "download.default_directory": download_dir,
-    "download.prompt_for_download": False,
-    "download.directory_upgrade": True,
-    "safebrowsing.enabled": True
-})
+if args.headless and not (args.profile_dir or args.attach):
+    parser.error("--headless needs --profile-dir with a saved Loom login")
+
+if args.attach:
+    # The attached browser keeps its own profile
+    profile_dir = None
+    temp_dir = None
+elif args.profile_dir:
+    # Reuse the same Chrome profile (and its login cookies) on every run
+    profile_dir = prepare_profile_dir(args.profile_dir)
+    temp_dir = None
+else:
+    # Create a temporary directory for the Chrome user data
+    temp_dir = tempfile.mkdtemp()
+    profile_dir = temp_dir
+    print(f"Using temporary directory for Chrome profile: {temp_dir}")
+# Extra profile directories created for parallel workers, removed at the end
+worker_profile_dirs = []
+
+
+def create_chrome_options(profile_dir):
+    '''Build the Chrome options used for every browser instance.
+
+    Args:
+        profile_dir (str): Chrome user data directory for this browser
+
+    Returns:
+        Options: Configured Chrome options
+    '''
+    chrome_options = Options()
+    chrome_options.add_argument(f"user-data-dir={profile_dir}")
+    chrome_options.add_argument("--no-first-run")
+    chrome_options.add_argument("--no-default-browser-check")
+    chrome_options.add_argument("--start-maximized")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    if args.headless:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option("useAutomationExtension", False)
+    if browser_binary:
+        chrome_options.binary_location = browser_binary
+    if args.fetch_mode == "network":
+        # Network events are needed to find the captions payload the player downloads
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if args.lean_pages:
+        add_lean_options(chrome_options)
+
+    # Set download directory preference
+    chrome_options.add_experimental_option("prefs", {
+        "download.default_directory": download_dir,
+        "download.prompt_for_download": False,
+        "download.directory_upgrade": True,
+        "safebrowsing.enabled": True
+    })
+    return chrome_options
+
 # Set up ChromeDriver service
-service = Service(ChromeDriverManager().install())
+# Resolved from the driver cache, so no network access is needed once it is primed
+browser_binary = find_browser(args.browser_binary)
+driver_path = resolve_driver(browser_binary, args.driver_path, args.driver_cache, offline=args.offline)
+print(f"Browser: {browser_binary or 'chromedriver default'}, driver: {driver_path or 'Selenium Manager'}")
+
+def create_service():
+    '''ChromeDriver service for a new browser; every driver needs its own.'''
+    return Service(driver_path) if driver_path else Service()
 
 # Initialize the WebDriver
 driver = None
 
+# Shared by all workers in --fetch-mode network
+network_fetcher = NetworkTranscriptFetcher(loom_base_url) if args.fetch_mode == "network" else None
+
+# Winning tab selector and extraction strategy per page layout, shared by all workers
+layout_cache = LayoutCache(args.layout_cache)
+
+# One structured record per video, summarized with run_log.py
+run_log = RunLog(args.run_log)
+
+# Shared by all workers with --lean-pages
+lean_pages = LeanPages() if args.lean_pages else None
+
+
+def create_worker_driver(worker_id):
+    '''Start an additional browser for a parallel worker with its own Chrome profile.
 
-# LLM transcript processing functions
-def clean_transcript(text):
+    Args:
+        worker_id (int): Worker number, used for logging only
+
+    Returns:
+        WebDriver: New WebDriver instance
     '''
-    Process transcript text to make it LLM-friendly.
-    
+    profile_dir = tempfile.mkdtemp()
+    with state_lock:
+        worker_profile_dirs.append(profile_dir)
+    print(f"Using temporary directory for worker {worker_id} Chrome profile: {profile_dir}")
+    worker_driver = webdriver.Chrome(service=create_service(), options=create_chrome_options(profile_dir))
+    worker_driver.set_page_load_timeout(30)
+    return worker_driver
+
+# Supervisors of all workers, to tell whether they already quit the login browser
+supervisors = []
+
+def supervise_driver(driver, worker_id=1, cookies=None):
+    '''Wrap a logged-in driver so it is recycled and restarted according to the command line options.
+
     Args:
-        text (str): Raw transcript text
-    
+        driver: Logged-in WebDriver instance
+        worker_id (int): Worker number
+        cookies (list): Session cookies for replacement browsers
+
     Returns:
-        str: Cleaned and formatted transcript text
+        SupervisedDriver: Supervisor for the worker's browser
     '''
-    # Step 1: Preserve timestamps by standardizing their format to [HH:MM:SS]
-    # Step 1: Preserve timestamps by standardizing their format to [HH:MM:SS]
-    # This regex matches common timestamp formats and standardizes them
-    text = re.sub(r'(\[?\(?\s*)(\d{1,2}:\d{2}(?:\d{2})?)\s*(?:\]|\))?', r'[]', text)
-    # Step 2: Normalize line breaks and ensure speaker names are properly formatted
-    # Step 2: Normalize line breaks and ensure speaker names are properly formatted
-    # This helps maintain the conversation structure
-    text = re.sub(r'\n{3,}', '\n\n', text)  # Replace excessive newlines with double newlines
-    # Step 3: Fix common punctuation issues
-    # Step 3: Fix common punctuation issues
-    # Remove duplicate punctuation and ensure proper spacing
-    text = re.sub(r'([.!?])\s*([.!?])+', r'', text)  # Remove duplicate punctuation
-    text = re.sub(r'\s+([.,;:!?])', r'', text)  # Remove space before punctuation
-    text = re.sub(r'([.,;:!?])([^\s\d])', r' ', text)  # Add space after punctuation if missing
-    # Step 4: Normalize whitespace
-    # Remove trailing/leading whitespace from each line and collapse multiple spaces
-    lines = [line.strip() for line in text.split('\n')]
-    text = '\n'.join(lines)
-    text = re.sub(r' +', ' ', text)  # Replace multiple spaces with a single space
-    
-    # Step 5: Remove empty lines while preserving paragraph structure
-    lines = text.split('\n')
-    non_empty_lines = []
-    for i, line in enumerate(lines):
-        # Keep the line if it's not empty or if it's a deliberate paragraph break
-        if line.strip() or (i > 0 and i < len(lines) - 1 and lines[i-1].strip() and lines[i+1].strip()):
-            non_empty_lines.append(line)
-    
-    # Step 6: Final cleanup - remove any remaining problematic characters
-    # (but carefully preserve important special characters)
-    text = '\n'.join(non_empty_lines)
-    
-    # Filter out any non-printable characters except for common line breaks
-    printable_chars = set(string.printable)
-    text = ''.join(c for c in text if c in printable_chars)
-    
-    return text
+    supervisor = SupervisedDriver(driver, create_worker_driver, worker_id, cookies=cookies, base_url=loom_base_url,
+                                  recycle_after=args.recycle_after, max_memory_mb=args.max_browser_memory)
+    supervisors.append(supervisor)
+    return supervisor
 
-def process_for_llm(transcript_filepath, llm_dir):
+def process_for_llm(transcript_filepath, llm_dir, transcript_text=None):
     '''Process a transcript file for LLM and save to the LLM directory.
     
+    Only stale outputs are regenerated: the LLM directory's index records the transcript
+    hash and cleaning rules version of every output, and a regenerated output identical to
+    the existing file is not rewritten. Written outputs are added to the search index.
+    
     Args:
         transcript_filepath (str): Path to the transcript file
         llm_dir (str): Directory to save LLM-ready transcript
+        transcript_text (str): Transcript content if already in memory, read from
+            transcript_filepath otherwise
         
     Returns:
-        bool: True if successful, False otherwise
+        bool: True if the LLM-ready file was written, False if it was skipped
+
+    Raises:
+        Exception: Errors reading, cleaning or indexing the transcript are left to the
+            caller, so the LLM pipeline counts them as failed rather than skipped
     '''
-    try:
-        # Get the base filename
-        base_name = os.path.basename(transcript_filepath)
-        name_without_ext = os.path.splitext(base_name)[0]
-        llm_filepath = os.path.join(llm_dir, f"{name_without_ext}_llm.txt")
-        
-        # Skip if already processed
-        if os.path.exists(llm_filepath):
-            print(f"LLM version already exists: {llm_filepath}")
+    # Get the base filename
+    base_name = os.path.basename(transcript_filepath)
+    name_without_ext = os.path.splitext(base_name)[0]
+    llm_filename = f"{name_without_ext}_llm.txt"
+    llm_filepath = os.path.join(llm_dir, llm_filename)
+    
+    # A new output that nearly duplicates an existing one is not written
+    if duplicate_detector is not None and not os.path.exists(llm_filepath):
+        if transcript_text is None:
+            with open(transcript_filepath, 'r', encoding='utf-8') as f:
+                transcript_text = f.read()
+        duplicate = duplicate_detector.find_duplicate(transcript_text, exclude=llm_filename)
+        if duplicate:
+            print(f"Skipping LLM version of {base_name} - near-duplicate ({duplicate[1]:.2f}) of {duplicate[0]}")
             return False
-        
-        # Read the transcript
-        with open(transcript_filepath, "r", encoding="utf-8") as f:
-            transcript_text = f.read()
-        
-        # Clean and format for LLM
-        processed_text = clean_transcript(transcript_text)
-        
-        # Save to LLM directory
-        with open(llm_filepath, "w", encoding="utf-8") as f:
-            f.write(processed_text)
-        
-        print(f"Created LLM-ready transcript: {llm_filepath}")
-        return True
-    except Exception as e:
-        print(f"Error processing transcript for LLM: {str(e)}")
+    
+    # Clean and format for LLM unless the existing output is up to date
+    status, entry = refresh_output(transcript_filepath, llm_filepath, llm_index.get(llm_filename),
+                                   text=transcript_text)
+    llm_index.set(llm_filename, entry)
+    llm_index.save()
+    if status == "fresh":
+        print(f"LLM version already up to date: {llm_filepath}")
         return False
-try:
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    driver.set_page_load_timeout(30)
+    if status == "unchanged":
+        print(f"LLM version unchanged: {llm_filepath}")
+        return False
+    
+    print(f"Created LLM-ready transcript: {llm_filepath}")
+    search_index.index_file(llm_filepath)
+    if duplicate_detector is not None:
+        duplicate_detector.add(llm_filepath)
+    return True
 
-    # Navigate to Loom login page
-    print("Navigating to Loom login page...")
-    driver.get("https://www.loom.com/login")
-    time.sleep(5)
+def clean_for_llm(video_id, transcript_filepath, transcript_text, record=None):
+    '''Pipeline handler: clean a transcript for LLM and record the output in the manifest.
 
-    print("Please log in to your Loom account manually in the opened browser.")
-    input("Press Enter when you have successfully logged in...")
+    Args:
+        video_id (str): Video ID or URL as listed in the input file
+        transcript_filepath (str): Path the raw transcript was saved to
+        transcript_text (str): Transcript content
+        record (VideoRecord): Run log record of the video, written once cleaning is done
 
-    # Now proceed with the Loom video processing
-    video_ids = [line.strip() for line in open(input_file, "r") if line.strip()]
+    Returns:
+        bool: True if an LLM-ready file was created
+    '''
+    created = False
+    try:
+        if record is not None:
+            with record.phase("llm_cleaning"):
+                created = process_for_llm(transcript_filepath, args.llm_dir, transcript_text)
+        else:
+            created = process_for_llm(transcript_filepath, args.llm_dir, transcript_text)
+        if created:
+            name_without_ext = os.path.splitext(os.path.basename(transcript_filepath))[0]
+            manifest.set_llm_path(video_id, os.path.join(args.llm_dir, f"{name_without_ext}_llm.txt"))
+    finally:
+        if record is not None:
+            record.set(llm_ready=created)
+            record.write()
+    return created
 
-    for video_id in video_ids:
+def sanitize_filename(filename):
+    # Replace characters that are problematic in file paths
+    chars_to_replace = {
+        '/': '-',
+        '\\': '-',
+        ':': '-',
+        '*': '',
+        '?': '',
+        '"': "'",
+        '<': '(',
+        '>': ')',
+        '|': '-'
+    }
+    for char, replacement in chars_to_replace.items():
+        filename = filename.replace(char, replacement)
+    return filename
+
+def save_transcript(clean_video_id, video_title, transcript_text):
+    '''Save transcript text to the download directory.
+
+    Args:
+        clean_video_id (str): Video ID with URL parts removed
+        video_title (str): Page title, falls back to the video ID when empty
+        transcript_text (str): Extracted transcript
+
+    Returns:
+        str: Path of the saved transcript, or None if saving failed
+    '''
+    if not video_title:
+        video_title = clean_video_id
+    
+    # Sanitize the video title for use in the filename
+    video_title = sanitize_filename(video_title)
+    
+    # Create the output filename
+    transcript_filename = f"{clean_video_id}.txt"
+    if video_title and video_title != clean_video_id:
+        # Make sure the filename is sanitized again as a final check
+        safe_title = sanitize_filename(video_title)
+        transcript_filename = f"{safe_title} - {clean_video_id}.txt"
+
+    # Further sanitize the complete filename as an extra precaution
+    transcript_filename = sanitize_filename(transcript_filename)
+    
+    # Save to the download directory
+    transcript_filepath = os.path.join(download_dir, transcript_filename)
+    try:
+        # A re-scraped transcript with the same content keeps its file and modification time,
+        # so nothing downstream sees it as new
+        if os.path.exists(transcript_filepath):
+            with open(transcript_filepath, "r", encoding="utf-8", errors="replace") as f:
+                if f.read() == transcript_text:
+                    print(f"Transcript unchanged: {transcript_filepath}")
+                    return transcript_filepath
+        with open(transcript_filepath, "w", encoding="utf-8") as f:
+            f.write(transcript_text)
+        print(f"Transcript saved to: {transcript_filepath}")
+    except Exception as e:
+        print(f"Error saving transcript: {e}")
+        return None
+    return transcript_filepath
+
+def process_video(driver, video_id):
+    '''Open a single Loom video, extract its transcript and save it.
+
+    Args:
+        driver: WebDriver instance to use
+        video_id (str): Video ID or full share URL
+
+    Returns:
+        bool: True if the transcript was saved; every outcome is also recorded in the manifest
+    '''
+    debug = None
+    saved = False
+    # Timing record for the run log; handed to the LLM pipeline when cleaning follows
+    record = run_log.start(video_id)
+    handed_to_llm = False
+    try:
+        # The job queue only hands out videos that still need processing
+        share_url = SHARE_URL_PATTERN.search(video_id)
+        clean_video_id = share_url.group(1) if share_url else video_id.replace("/", "_")
+        
+        # Share URLs of the site being scraped are opened as given, other input on that site
+        if video_id.startswith(share_url_prefix):
+            url = video_id
+        else:
+            url = f"{share_url_prefix}{clean_video_id}"
+        
+        # Once the captions URL is known, fetch the payload without rendering the page
+        if network_fetcher is not None and network_fetcher.can_fetch_directly():
+            print(f"\nFetching transcript directly: {url}")
+            rate.acquire()
+            record.lap("pacing")
+            fetch_started = time.time()
+            fetched = network_fetcher.fetch(clean_video_id, url)
+            rate.record("ok" if fetched else "error", time.time() - fetch_started)
+            record.lap("direct_fetch")
+            if fetched:
+                video_title, transcript_text = fetched
+                print(f"Successfully fetched transcript text ({len(transcript_text)} characters)")
+                record.set(title=video_title, chars=len(transcript_text), extraction_method="direct_fetch")
+                transcript_filepath = save_transcript(clean_video_id, video_title, transcript_text)
+                record.lap("save")
+                if transcript_filepath:
+                    manifest.mark_done(video_id, video_title, transcript_filepath, transcript_text)
+                    record.set(outcome="done")
+                    if llm_pipeline is not None:
+                        llm_pipeline.submit(video_id, transcript_filepath, transcript_text, record)
+                        handed_to_llm = True
+                else:
+                    manifest.mark_failed(video_id, "could not save transcript")
+                    record.set(outcome="failed", error="could not save transcript")
+                print(f"Processed video: {video_id}")
+                return bool(transcript_filepath)
+            print("Direct fetch failed. Falling back to the browser...")
+        
+        print(f"\nOpening URL: {url}")
+        # Collect debug artifacts according to --debug-level
+        debug = DebugRecorder(driver, video_id, args.debug_level)
+        waited_for_rate = rate.acquire()
+        if waited_for_rate >= 1:
+            print(f"Paced for {waited_for_rate:.1f} seconds (current delay {rate.delay():.1f} seconds)")
+        record.lap("pacing")
+        # Timed from before navigation so a slow driver.get counts as a slow load
+        if lean_pages is not None:
+            lean_pages.prepare(driver)
+        deadline = VideoDeadline(args.video_timeout)
+        driver.get(url)
+
+        print("Waiting for page to load...")
         try:
-            # Check if video has already been processed
-            if not args.force and video_id in processed_videos:
-                print(f"Skipping {video_id} - already processed (use --force to process anyway)")
-                continue
-                
-            # Check if a transcript file for this video already exists
-            clean_video_id = video_id.replace("https://www.loom.com/share/", "").replace("/", "_")
-            existing_files = [f for f in os.listdir(download_dir) if clean_video_id in f and f.endswith(".txt")]
-            
-            if not args.force and existing_files:
-                print(f"Skipping {video_id} - transcript file already exists: {existing_files[0]} (use --force to process anyway)")
-                # Add to processed list if not already there
-                if video_id not in processed_videos:
-                    with open(processed_file, "a") as f:
-                        f.write(f"{video_id}\n")
-                    processed_videos.add(video_id)
-                continue
-            elif args.force and existing_files:
-                print(f"Force processing {video_id} even though transcript file already exists: {existing_files[0]}")
-            
-            # Check if the video_id already contains the full URL
-            if "https://www.loom.com/share/" in video_id:
-                url = video_id
-            else:
-                url = f"https://www.loom.com/share/{video_id}"
-            print(f"\nOpening URL: {url}")
-            driver.get(url)
+            wait_for_page_ready(driver, deadline)
+            print(f"Page ready after {deadline.elapsed():.1f} seconds")
+            load_outcome = "ok"
+        except TimeoutException:
+            print("Page still loading after wait timeout. Proceeding...")
+            load_outcome = "timeout"
+        page_load_time = deadline.elapsed()
 
-            print("Waiting for page to load...")
-            time.sleep(10)  # Increased wait time to 10 seconds
+        if is_throttled_page(driver):
+            print("Loom returned a throttling or error page. Backing off...")
+            rate.record("throttled")
+            manifest.mark_failed(video_id, "throttled")
+            record.lap("navigation")
+            record.set(outcome="throttled")
+            debug.flush("throttled")
+            return False
+        rate.record(load_outcome, page_load_time)
 
-            print("Current page title:", driver.title)
+        page_title = driver.title
+        print("Current page title:", page_title)
+        record.set(title=page_title)
+        debug.snapshot("page_loaded", url=url, title=page_title)
 
-            # Taking screenshot for debugging
-            screenshot_dir = "debug_screenshots"
-            os.makedirs(screenshot_dir, exist_ok=True)
-            screenshot_path = os.path.join(screenshot_dir, f"loom_{video_id.replace('/', '_')}.png")
-            driver.save_screenshot(screenshot_path)
+        screenshot_path = debug.screenshot("loom")
+        if screenshot_path:
             print(f"Screenshot saved to {screenshot_path}")
+        debug.page_details()
+        record.lap("navigation")
 
-            # Enhanced Debug Function
-            def comprehensive_debug():
-                debug_dir = "debug_output"
-                os.makedirs(debug_dir, exist_ok=True)
-                
-                # 1. Save page source to file
-                page_source_path = os.path.join(debug_dir, f"page_source_{video_id.replace('/', '_')}.html")
-                with open(page_source_path, "w", encoding="utf-8") as f:
-                    f.write(driver.page_source)
-                print(f"Page source saved to {page_source_path}")
-                
-                # 2. Check for iframes
-                iframes = driver.find_elements(By.TAG_NAME, "iframe")
-                print(f"Found {len(iframes)} iframes on the page")
-                for i, iframe in enumerate(iframes):
-                    iframe_id = iframe.get_attribute("id") or "no-id"
-                    iframe_src = iframe.get_attribute("src") or "no-src"
-                    print(f"  Iframe {i+1}: ID={iframe_id}, Src={iframe_src}")
-                
-                # 3. List all buttons
-                buttons = driver.find_elements(By.TAG_NAME, "button")
-                print(f"Found {len(buttons)} buttons on the page")
-                buttons_info = []
-                for i, button in enumerate(buttons):
-                    try:
-                        button_text = button.text
-                        button_class = button.get_attribute("class") or "no-class"
-                        button_id = button.get_attribute("id") or "no-id"
-                        is_displayed = button.is_displayed()
-                        is_enabled = button.is_enabled()
-                        buttons_info.append({
-                            "index": i+1,
-                            "text": button_text,
-                            "class": button_class,
-                            "id": button_id,
-                            "is_displayed": is_displayed,
-                            "is_enabled": is_enabled
-                        })
-                        print(f"  Button {i+1}: '{button_text[:30]}{'...' if len(button_text) > 30 else ''}', " +
-                              f"Class={button_class}, ID={button_id}, " +
-                              f"Displayed={is_displayed}, Enabled={is_enabled}")
-                    except Exception as e:
-                        print(f"  Button {i+1}: Error getting details: {str(e)}")
-                
-                # Save buttons info to file
-                buttons_info_path = os.path.join(debug_dir, f"buttons_info_{video_id.replace('/', '_')}.json")
-                with open(buttons_info_path, "w", encoding="utf-8") as f:
-                    json.dump(buttons_info, f, indent=2)
-                print(f"Buttons info saved to {buttons_info_path}")
+        # Check for and switch to iframes
+        print("\nChecking for iframes that might contain the transcript...")
+        iframes = driver.find_elements(By.TAG_NAME, "iframe")
+        transcript_found_in_iframe = False
+        
+        for i, iframe in enumerate(iframes):
+            try:
+                iframe_id = iframe.get_attribute("id") or "no-id"
+                print(f"Switching to iframe {i+1} (ID: {iframe_id})...")
+                driver.switch_to.frame(iframe)
                 
-                # 4. Check for shadow DOM elements
-                print("Checking for shadow DOM elements...")
-                shadow_hosts = driver.execute_script("""
-                    return Array.from(document.querySelectorAll('*')).filter(
-                        el => el.shadowRoot !== null
-                    ).map(el => {
-                        return {
-                            tag: el.tagName.toLowerCase(),
-                            id: el.id || 'no-id',
-                            class: el.className || 'no-class'
-                        };
-                    });
-                """)
+                # Take screenshot of iframe content
+                iframe_screenshot_path = debug.screenshot(f"iframe_{i+1}")
+                if iframe_screenshot_path:
+                    print(f"Iframe screenshot saved to {iframe_screenshot_path}")
                 
-                print(f"Found {len(shadow_hosts)} shadow DOM hosts on the page")
-                for i, host in enumerate(shadow_hosts):
-                    print(f"  Shadow Host {i+1}: <{host['tag']}> ID={host['id']}, Class={host['class']}")
+                # Check if transcript elements exist in this iframe
+                transcript_elements = driver.find_elements(By.XPATH, "//*[contains(text(), 'Transcript')]")
+                download_elements = driver.find_elements(By.XPATH, "//*[contains(text(), 'Download')]")
                 
-                # Save shadow host info to file
-                shadow_info_path = os.path.join(debug_dir, f"shadow_dom_info_{video_id.replace('/', '_')}.json")
-                with open(shadow_info_path, "w", encoding="utf-8") as f:
-                    json.dump(shadow_hosts, f, indent=2)
-                print(f"Shadow DOM info saved to {shadow_info_path}")
-
-            # Run the comprehensive debug
-            comprehensive_debug()
-
-            # Check for and switch to iframes
-            print("\nChecking for iframes that might contain the transcript...")
-            iframes = driver.find_elements(By.TAG_NAME, "iframe")
-            main_window = driver.current_window_handle
-            transcript_found_in_iframe = False
-            
-            for i, iframe in enumerate(iframes):
-                try:
-                    iframe_id = iframe.get_attribute("id") or "no-id"
-                    print(f"Switching to iframe {i+1} (ID: {iframe_id})...")
-                    driver.switch_to.frame(iframe)
-                    
-                    # Take screenshot of iframe content
-                    iframe_screenshot_path = os.path.join(screenshot_dir, f"iframe_{i+1}_{video_id.replace('/', '_')}.png")
-                    driver.save_screenshot(iframe_screenshot_path)
-                    print(f"Iframe screenshot saved to {iframe_screenshot_path}")
-                    
-                    # Check if transcript elements exist in this iframe
-                    transcript_elements = driver.find_elements(By.XPATH, "//*[contains(text(), 'Transcript')]")
-                    download_elements = driver.find_elements(By.XPATH, "//*[contains(text(), 'Download')]")
-                    
-                    if transcript_elements or download_elements:
-                        print(f"Found potential transcript elements in iframe {i+1}!")
-                        transcript_found_in_iframe = True
-                        break
-                    else:
-                        print(f"No transcript elements found in iframe {i+1}")
-                        driver.switch_to.default_content()
-                except Exception as e:
-                    print(f"Error switching to iframe {i+1}: {str(e)}")
+                if transcript_elements or download_elements:
+                    print(f"Found potential transcript elements in iframe {i+1}!")
+                    transcript_found_in_iframe = True
+                    break
+                else:
+                    print(f"No transcript elements found in iframe {i+1}")
                     driver.switch_to.default_content()
-            
-            if not transcript_found_in_iframe:
+            except Exception as e:
+                print(f"Error switching to iframe {i+1}: {str(e)}")
                 driver.switch_to.default_content()
-                print("Switched back to main content (no transcript found in iframes)")
-            
-            # Debug: Find and print information about elements containing keywords
-            print("\n--- DEBUG: Searching for relevant elements ---")
-            for keyword in ["Transcript", "Activity", "Download"]:
-                elements = driver.find_elements(By.XPATH, f"//*[contains(text(), '{keyword}')]")
-                print(f"\nFound {len(elements)} elements containing '{keyword}':")
-                for i, element in enumerate(elements):
-                    tag_name = element.tag_name
-                    try:
-                        element_text = element.text
-                        element_class = element.get_attribute("class") or "no-class"
-                        element_id = element.get_attribute("id") or "no-id"
-                        is_displayed = element.is_displayed()
-                        is_enabled = element.is_enabled()
-                        
-                        # Get the XPath of the element
-                        xpath = driver.execute_script("""
-                            function getPathTo(element) {
-                                if (element.id !== '')
-                                    return '//*[@id="' + element.id + '"]';
-                                if (element === document.body)
-                                    return '/html/body';
-                                
-                                var ix = 0;
-                                var siblings = element.parentNode.childNodes;
-                                for (var i = 0; i < siblings.length; i++) {
-                                    var sibling = siblings[i];
-                                    if (sibling === element)
-                                        return getPathTo(element.parentNode) + '/' + element.tagName.toLowerCase() + '[' + (ix + 1) + ']';
-                                    if (sibling.nodeType === 1 && sibling.tagName === element.tagName)
-                                        ix++;
-                                }
-                            }
-                            return getPathTo(arguments[0]);
-                        """, element)
-                        
-                        print(f"  {i+1}. <{tag_name}> - Text: '{element_text[:30]}{'...' if len(element_text) > 30 else ''}' - Class: {element_class}")
-                        print(f"     ID: {element_id}, Displayed: {is_displayed}, Enabled: {is_enabled}")
-                        print(f"     XPath: {xpath}")
-                        
-                        # Print parent element info to understand context
-                        try:
-                            parent = driver.execute_script("return arguments[0].parentNode;", element)
-                            parent_tag = driver.execute_script("return arguments[0].tagName;", parent).lower()
-                            parent_class = driver.execute_script("return arguments[0].className;", parent) or "no-class"
-                            print(f"     Parent: <{parent_tag}> - Class: {parent_class}")
-                        except:
-                            print("     Could not get parent info")
-                    except Exception as e:
-                        print(f"  {i+1}. <{tag_name}> - Error getting details: {str(e)}")
-            print("--- END DEBUG ---\n")
-
-            print("Looking for 'Transcript' section...")
-            # Wait for the page to fully load to ensure the Transcript section is visible
-            time.sleep(3)
-            
-            # First, try to find and click on the Transcript tab if it's not already active
+        
+        if not transcript_found_in_iframe:
+            driver.switch_to.default_content()
+            print("Switched back to main content (no transcript found in iframes)")
+        
+        # Debug: Find and print information about elements containing keywords
+        debug.keyword_elements()
+
+        # Strategies that worked before on this page layout are tried first
+        fingerprint = layout_fingerprint(driver)
+        tab_order = layout_cache.order(fingerprint, "tab", [name for name, _, _ in TRANSCRIPT_TAB_STRATEGIES])
+        tab_strategies = sorted((tab_strategy for tab_strategy in TRANSCRIPT_TAB_STRATEGIES if tab_strategy[0] in tab_order),
+                                key=lambda tab_strategy: tab_order.index(tab_strategy[0]))
+        debug.snapshot("layout", fingerprint=fingerprint, tab_order=tab_order)
+        record.lap("frame_scan")
+
+        print("Looking for 'Transcript' section...")
+        
+        # First, try to find and click on the Transcript tab if it's not already active
+        transcript_tab = None
+        # An empty order means no tab was found on this layout before: skip the search
+        skipped_tab_search = fingerprint is not None and not tab_order
+        if skipped_tab_search:
+            print("No Transcript tab on this page layout (cached). Proceeding...")
+        else:
             try:
-                # Try to find using specific class name or text content
-                transcript_tab = None
-                try:
-                    # First attempt: Using the specific class name
-                    transcript_tab = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "button.css-1qz66q8"))
-                    )
-                    print("Found Transcript tab by class name. Clicking...")
-                except:
-                    # Second attempt: Using text content
-                    try:
-                        transcript_tab = WebDriverWait(driver, 10).until(
-                            EC.element_to_be_clickable((By.XPATH, "//button[text()='Transcript']"))
-                        )
-                        print("Found Transcript tab by exact text. Clicking...")
-                    except:
-                        # Third attempt: Using contains text
-                        transcript_tab = WebDriverWait(driver, 10).until(
-                            EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Transcript')]"))
-                        )
-                        print("Found Transcript tab by partial text. Clicking...")
-                
+                # Class name, exact text and partial text lookups are polled together
+                transcript_tab, strategy = find_transcript_tab(driver, deadline, strategies=tab_strategies)
+            except TimeoutException as e:
+                # No strategy found a tab on this layout, cached so the next video skips the search
+                layout_cache.record(fingerprint, "tab", None)
+                print(f"Transcript tab not found or already active: {str(e)}. Proceeding...")
+            except Exception as e:
+                print(f"Could not look for the Transcript tab: {str(e)}. Proceeding...")
+        if transcript_tab is not None:
+            try:
+                layout_cache.record(fingerprint, "tab", strategy)
+                record.set(tab_strategy=strategy)
+                print(f"Found Transcript tab by {strategy}. Clicking...")
+                debug.snapshot("transcript_tab_found", strategy=strategy)
+            
                 # Click the transcript tab
                 transcript_tab.click()
                 print("Clicked on Transcript tab. Waiting for content to load...")
-                
-                # Wait longer after clicking the tab
-                time.sleep(5)
-                
+            
                 # Take a screenshot after clicking the Transcript tab
-                transcript_screenshot_path = os.path.join(screenshot_dir, f"transcript_tab_{video_id.replace('/', '_')}.png")
-                driver.save_screenshot(transcript_screenshot_path)
-                print(f"Screenshot after clicking Transcript tab saved to {transcript_screenshot_path}")
-                
+                transcript_screenshot_path = debug.screenshot("transcript_tab")
+                if transcript_screenshot_path:
+                    print(f"Screenshot after clicking Transcript tab saved to {transcript_screenshot_path}")
+            
                 # Debug: Print elements that appear after switching to Transcript tab
-                print("\n--- DEBUG: Elements after switching to Transcript tab ---")
-                for keyword in ["Download", "Toggle", "Transcript", "Copy", "Action"]:
-                    elements = driver.find_elements(By.XPATH, f"//*[contains(text(), '{keyword}')]")
-                    print(f"\nFound {len(elements)} elements containing '{keyword}' after tab switch:")
-                    for i, element in enumerate(elements):
-                        tag_name = element.tag_name
-                        try:
-                            element_text = element.text
-                            element_class = element.get_attribute("class") or "no-class"
-                            element_id = element.get_attribute("id") or "no-id"
-                            is_displayed = element.is_displayed()
-                            print(f"  {i+1}. <{tag_name}> - Text: '{element_text[:30]}{'...' if len(element_text) > 30 else ''}' - Class: {element_class}")
-                            print(f"     ID: {element_id}, Displayed: {is_displayed}")
-                        except Exception as e:
-                            print(f"  {i+1}. <{tag_name}> - Error getting details: {str(e)}")
-                print("--- END DEBUG ---\n")
+                debug.tab_elements()
             except Exception as e:
-                print(f"Transcript tab not found or already active: {str(e)}. Proceeding...")
-            
-            print("Extracting transcript text from the page...")
-            
-            # Take a screenshot before extraction for debugging
-            pre_extract_screenshot_path = os.path.join(screenshot_dir, f"before_extract_{video_id.replace('/', '_')}.png")
-            driver.save_screenshot(pre_extract_screenshot_path)
+                print(f"Could not open the Transcript tab: {str(e)}. Proceeding...")
+        record.lap("tab_discovery")
+        
+        # Wait until the transcript panel is populated and has stopped growing
+        try:
+            text_length = wait_for_transcript_text(driver, deadline)
+            print(f"Transcript content settled at {text_length} chars ({deadline.elapsed():.1f} seconds into this video)")
+            debug.snapshot("transcript_settled", chars=text_length)
+        except TimeoutException:
+            print("Transcript content did not settle within the time budget. Proceeding...")
+            debug.snapshot("transcript_not_settled")
+        record.lap("transcript_wait")
+        
+        print("Extracting transcript text from the page...")
+        
+        # Take a screenshot before extraction for debugging
+        pre_extract_screenshot_path = debug.screenshot("before_extract")
+        if pre_extract_screenshot_path:
             print(f"Screenshot before extraction saved to {pre_extract_screenshot_path}")
-            
-            # Try multiple methods to find and extract the transcript text
-            transcript_text = ""
-            extraction_successful = False
-            
-            # Method 1: Look for elements with transcript content
-            print("Method 1: Looking for transcript container elements...")
+        
+        # Try multiple methods to find and extract the transcript text
+        transcript_text = ""
+        extraction_successful = False
+        
+        # The performance log is drained once and shared by network mode and lean pages
+        perf_entries = read_performance_log(driver) if lean_pages is not None else None
+        if lean_pages is not None:
+            lean_pages.record(driver, perf_entries, page_load_time)
+
+        # Network mode: use the captions payload the page downloaded, if any
+        if network_fetcher is not None:
+            transcript_text = network_fetcher.capture_from_browser(driver, clean_video_id, perf_entries)
+            extraction_successful = bool(transcript_text)
+            if extraction_successful:
+                record.set(extraction_method="network_capture")
+        
+        # Methods 1-4 (containers, timestamps, paragraphs, section) run inside the page
+        # in a single round trip; the first strategy that finds text wins
+        if not extraction_successful or not transcript_text:
+            print("Running in-page extraction strategies...")
             try:
-                # Try to find transcript container with multiple possible selectors
-                transcript_containers = driver.find_elements(By.XPATH, 
-                    "//div[contains(@class, 'transcript') or contains(@class, 'captions')]//div | " +
-                    "//div[starts-with(@id, 'transcript-') or starts-with(@id, 'captions-')] | " +
-                    "//div[@role='tabpanel' and .//div[contains(text(), 'Transcript')]]//div")
-                    
-                if transcript_containers:
-                    print(f"Found {len(transcript_containers)} potential transcript container elements")
-                    
-                    # Try to extract text from each container
-                    for i, container in enumerate(transcript_containers):
-                        try:
-                            container_text = container.text.strip()
-                            
-                            # Check if this looks like transcript content (contains timestamps or multiple lines)
-                            if container_text and len(container_text) > 50 and ('\n' in container_text or ':' in container_text):
-                                print(f"Container {i+1} appears to have transcript content ({len(container_text)} chars)")
-                                if len(container_text) > len(transcript_text):
-                                    transcript_text = container_text
-                                    extraction_successful = True
-                            elif container_text:
-                                print(f"Container {i+1} text is too short or doesn't look like transcript content: {container_text[:30]}...")
-                        except Exception as e:
-                            print(f"Error extracting text from container {i+1}: {str(e)}")
+                extraction = extract_transcript(
+                    driver, layout_cache.order(fingerprint, "extraction", list(EXTRACTION_STRATEGIES)))
+                layout_cache.record(fingerprint, "extraction", extraction["strategy"])
+                for strategy_name, attempt in extraction["attempts"].items():
+                    print(f"  Strategy '{strategy_name}': {attempt}")
+                if extraction["text"]:
+                    transcript_text = extraction["text"]
+                    extraction_successful = True
+                    record.set(extraction_method=extraction["strategy"])
+                    print(f"Strategy '{extraction['strategy']}' found transcript content ({extraction['length']} chars)")
+                debug.snapshot("extraction", strategy=extraction["strategy"], chars=extraction["length"])
             except Exception as e:
-                print(f"Method 1 failed: {str(e)}")
-            
-            # Method 2: Look for elements containing timestamps (which are common in transcripts)
-            if not extraction_successful or not transcript_text:
-                print("Method 2: Looking for elements containing timestamps...")
-                try:
-                    # Look for elements that might contain timestamps (HH:MM:SS or MM:SS format)
-                    timestamp_elements = driver.find_elements(By.XPATH, 
-                        "//div[contains(text(), ':') and string-length(normalize-space(text())) <= 8]/..")
-                    
-                    if timestamp_elements:
-                        print(f"Found {len(timestamp_elements)} potential timestamp parent elements")
-                        
-                        # Find the parent container that might contain all transcripts
-                        for i, element in enumerate(timestamp_elements):
-                            try:
-                                # Go up to a container that might hold multiple timestamps
-                                parent = element.find_element(By.XPATH, "./..")
-                                parent_text = parent.text.strip()
-                                
-                                if parent_text and len(parent_text) > 100 and '\n' in parent_text:
-                                    print(f"Parent element {i+1} appears to have transcript content ({len(parent_text)} chars)")
-                                    if len(parent_text) > len(transcript_text):
-                                        transcript_text = parent_text
-                                        extraction_successful = True
-                            except Exception as e:
-                                print(f"Error processing timestamp parent {i+1}: {str(e)}")
-                except Exception as e:
-                    print(f"Method 2 failed: {str(e)}")
-            
-            # Method 3: Try to find all text paragraphs that might be transcript lines
-            if not extraction_successful or not transcript_text:
-                print("Method 3: Looking for paragraphs of text...")
-                try:
-                    # Find elements that might be paragraphs of transcript text
-                    paragraph_elements = driver.find_elements(By.CSS_SELECTOR, 
-                        "div.transcript p, div.transcript div, div[role='tabpanel'] p, div[data-testid*='transcript'] div")
-                    
-                    if paragraph_elements:
-                        print(f"Found {len(paragraph_elements)} potential paragraph elements")
-                        
-                        # Combine all paragraph texts
-                        all_paragraphs = []
-                        for i, element in enumerate(paragraph_elements):
-                            try:
-                                paragraph_text = element.text.strip()
-                                if paragraph_text:
-                                    all_paragraphs.append(paragraph_text)
-                            except Exception as e:
-                                print(f"Error processing paragraph {i+1}: {str(e)}")
-                        
-                        if all_paragraphs:
-                            combined_text = "\n\n".join(all_paragraphs)
-                            if len(combined_text) > len(transcript_text):
-                                transcript_text = combined_text
-                                extraction_successful = True
-                                print(f"Extracted {len(all_paragraphs)} paragraphs of text ({len(transcript_text)} chars)")
-                except Exception as e:
-                    print(f"Method 3 failed: {str(e)}")
+                print(f"In-page extraction failed: {str(e)}")
+        record.lap("extraction")
+        if skipped_tab_search:
+            # The cached absence of a tab holds while transcripts are found without one
+            if extraction_successful and transcript_text:
+                layout_cache.record(fingerprint, "tab", None)
+            else:
+                layout_cache.reject(fingerprint, "tab")
+        
+        # Save the transcript to a file if extraction was successful
+        if extraction_successful and transcript_text:
+            print(f"Successfully extracted transcript text ({len(transcript_text)} characters)")
+            record.set(chars=len(transcript_text))
             
-            # Method 4: Last resort - look for any text content within the transcript section
-            if not extraction_successful or not transcript_text:
-                print("Method 4: Looking for any text in the transcript section...")
-                try:
-                    # Try to find the transcript section and get all text
-                    transcript_section = driver.find_element(By.XPATH, 
-                        "//div[@role='tabpanel' and .//div[contains(text(), 'Transcript')]] | " +
-                        "//section[contains(@class, 'transcript')] | " +
-                        "//div[contains(@class, 'transcript-container')]")
-                    
-                    if transcript_section:
-                        transcript_text = transcript_section.text.strip()
-                        if transcript_text and len(transcript_text) > 50:
-                            extraction_successful = True
-                            print(f"Found transcript section with {len(transcript_text)} chars of text")
-                except Exception as e:
-                    print(f"Method 4 failed: {str(e)}")
+            # Get the video title from the page if possible
+            try:
+                video_title = driver.title.replace(" - Loom", "").strip()
+            except:
+                video_title = clean_video_id
             
-            # Save the transcript to a file if extraction was successful
-            if extraction_successful and transcript_text:
-                print(f"Successfully extracted transcript text ({len(transcript_text)} characters)")
-                
-                # Clean up the video_id to use as filename
-                clean_video_id = video_id.replace("https://www.loom.com/share/", "").replace("/", "_")
-                
-                # Function to sanitize file names
-                def sanitize_filename(filename):
-                    # Replace characters that are problematic in file paths
-                    chars_to_replace = {
-                        '/': '-',
-                        '\\': '-',
-                        ':': '-',
-                        '*': '',
-                        '?': '',
-                        '"': "'",
-                        '<': '(',
-                        '>': ')',
-                        '|': '-'
-                    }
-                    for char, replacement in chars_to_replace.items():
-                        filename = filename.replace(char, replacement)
-                    return filename
-                
-                # Get the video title from the page if possible
-                try:
-                    video_title = driver.title.replace(" - Loom", "").strip()
-                    if not video_title:
-                        video_title = clean_video_id
-                except:
-                    video_title = clean_video_id
-                
-                # Sanitize the video title for use in the filename
-                video_title = sanitize_filename(video_title)
-                
-                # Create the output filename
-                transcript_filename = f"{clean_video_id}.txt"
-                if video_title and video_title != clean_video_id:
-                    # Make sure the filename is sanitized again as a final check
-                    safe_title = sanitize_filename(video_title)
-                    transcript_filename = f"{safe_title} - {clean_video_id}.txt"
-
-                # Further sanitize the complete filename as an extra precaution
-                transcript_filename = sanitize_filename(transcript_filename)
-                
-                # Save to the download directory
-                transcript_filepath = os.path.join(download_dir, transcript_filename)
-                try:
-                    with open(transcript_filepath, "w", encoding="utf-8") as f:
-                        f.write(transcript_text)
-                    print(f"Transcript saved to: {transcript_filepath}")
-                    # Process for LLM if requested
-                except Exception as e:
-                    print(f"Error saving transcript: {e}")
-                
-                if args.process_llm:
-                    process_for_llm(transcript_filepath, args.llm_dir)
-                    
-                    # Take a screenshot after saving for debugging
-                    after_save_screenshot_path = os.path.join(screenshot_dir, f"after_save_{video_id.replace('/', '_')}.png")
-                    driver.save_screenshot(after_save_screenshot_path)
-                    print(f"Screenshot after saving transcript saved to {after_save_screenshot_path}")
+            transcript_filepath = save_transcript(clean_video_id, video_title, transcript_text)
+            record.lap("save")
+            record.set(title=video_title)
+            if transcript_filepath:
+                saved = True
+                manifest.mark_done(video_id, video_title, transcript_filepath, transcript_text)
+                record.set(outcome="done")
+                # Cleaning for LLM happens on the pipeline's worker threads
+                if llm_pipeline is not None:
+                    llm_pipeline.submit(video_id, transcript_filepath, transcript_text, record)
+                    handed_to_llm = True
             else:
-                print("Failed to extract transcript text from the page")
-                
-                # Take a failure screenshot for debugging
-                failure_screenshot_path = os.path.join(screenshot_dir, f"extraction_failed_{video_id.replace('/', '_')}.png")
-                driver.save_screenshot(failure_screenshot_path)
-                print(f"Failure screenshot saved to {failure_screenshot_path}")
+                manifest.mark_failed(video_id, "could not save transcript")
+                record.set(outcome="failed", error="could not save transcript")
+        else:
+            print("Failed to extract transcript text from the page")
+            manifest.mark_failed(video_id, "extraction failed")
+            record.set(outcome="failed", error="extraction failed")
+            
+            # Write the failure screenshot and any deferred debug artifacts
+            debug.flush("extraction failed")
 
-            print(f"Processed video: {video_id}")
-            with open(processed_file, "a") as f:
-                f.write(f"{video_id}\n")
-            # No longer removing videos one by one - will clear all at once after processing
-            processed_videos.add(video_id)
+        print(f"Processed video: {video_id}")
+        # No longer removing videos one by one - will clear all at once after processing
 
+    except TimeoutException:
+        print(f"Timeout occurred while processing video {video_id}")
+        rate.record("timeout")
+        manifest.mark_failed(video_id, "timeout")
+        record.set(outcome="timeout", error="timeout")
+        if debug is not None:
+            debug.flush("timeout")
+    except Exception as e:
+        print(f"Error processing video {video_id}: {str(e)}")
+        manifest.mark_failed(video_id, str(e))
+        record.set(outcome="error", error=str(e))
+        if debug is not None:
+            debug.flush(f"error: {str(e)}")
+    finally:
+        # A baseline page load that failed before it was recorded is taken again; the
+        # supervisor only replaces browsers between videos, so none stays pending
+        if lean_pages is not None:
+            lean_pages.abandon(driver)
+        # Records handed to the LLM pipeline are written once cleaning has finished
+        if not handed_to_llm:
+            record.write()
+
+    return saved
 
-        except TimeoutException:
-            print(f"Timeout occurred while processing video {video_id}")
-        except Exception as e:
-            print(f"Error processing video {video_id}: {str(e)}")
 
-        print("Waiting before next video...")
+# Set once the browser is logged in; the input file is only cleared after a real run
+session_ready = False
+
+# With --process-llm, saved transcripts are cleaned in the background
+llm_pipeline = None
+if args.process_llm:
+    llm_pipeline = LLMPipeline(clean_for_llm, workers=args.llm_workers)
+
+try:
+    if args.attach:
+        print(f"Attaching to the browser at {args.attach}...")
+        attached_options = attach_options(Options(), args.attach)
+        if args.fetch_mode == "network" or args.lean_pages:
+            attached_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        driver = webdriver.Chrome(service=create_service(), options=attached_options)
+    else:
+        driver = webdriver.Chrome(service=create_service(), options=create_chrome_options(profile_dir))
+    driver.set_page_load_timeout(30)
+
+    if (args.profile_dir or args.attach) and is_session_valid(driver, loom_base_url):
+        print("Saved Loom session is still valid. Skipping login.")
+    elif args.headless:
+        raise RuntimeError(f"The Loom session in {profile_dir or args.attach} has expired. "
+                           f"Run once without --headless to log in again.")
+    else:
+        # Navigate to Loom login page
+        print("Navigating to Loom login page...")
+        driver.get(f"{loom_base_url}/login")
         time.sleep(5)
 
+        print("Please log in to your Loom account manually in the opened browser.")
+        input("Press Enter when you have successfully logged in...")
+    session_ready = True
+
+    if network_fetcher is not None:
+        # Direct captions requests reuse the browser's login
+        network_fetcher.set_cookies(driver.get_cookies())
+
+    # Now proceed with the Loom video processing
+    video_ids = [line.strip() for line in open(input_file, "r") if line.strip()]
+    waiting = jobs.enqueue(video_ids, force=args.force, retry_failed=args.retry_failed)
+    print(f"{waiting} videos waiting to be processed")
+
+    if args.workers > 1:
+        print(f"Processing with {args.workers} browser workers...")
+        handled = run_worker_pool(jobs.claim, min(args.workers, max(1, waiting)), driver, create_worker_driver,
+                                  process_video, base_url=loom_base_url, supervise=supervise_driver)
+        for worker_id, count in sorted(handled.items()):
+            print(f"Worker {worker_id} handled {count} videos")
+    else:
+        supervisor = supervise_driver(driver)
+        try:
+            while True:
+                video_id = jobs.claim()
+                if video_id is None:
+                    break
+                supervisor.run(process_video, video_id)
+        finally:
+            browser_stats = supervisor.close()
+            print(f"Browser recycled {browser_stats['recycles']} times, restarted {browser_stats['restarts']} "
+                  f"times after a crash (peak memory {browser_stats['peak_memory_mb']:.0f} MB)")
+
+    print(layout_cache.summary())
+    if lean_pages is not None:
+        print(lean_pages.summary())
+
+    pacing = rate.summary()
+    print(f"Page loads: {pacing['ok']} ok, {pacing['slow']} slow, {pacing['timeout']} timed out, "
+          f"{pacing['throttled']} throttled; final delay {pacing['delay']:.1f} seconds")
+
+    for video_id, error in jobs.exhausted():
+        print(f"Gave up on {video_id} after {args.max_attempts} attempts: {error}")
+
 except Exception as e:
     print(f"An error occurred: {str(e)}")
 
 finally:
-    if driver:
-        input("Press Enter to close the browser...")
+    if llm_pipeline is not None:
+        print("Waiting for LLM processing to finish...")
+        llm_counts = llm_pipeline.close()
+        print(f"LLM-ready transcripts created: {llm_counts['created']}, skipped: {llm_counts['skipped']}, "
+              f"failed: {llm_counts['failed']}")
+        if duplicate_detector is not None:
+            duplicate_detector.save()
+
+    # A login browser that a supervisor recycled has already been quit
+    if driver and not any(supervisor.retired(driver) for supervisor in supervisors):
+        if not args.headless:
+            input("Press Enter to close the browser...")
         try:
             driver.quit()
         except WebDriverException:
@@ -672,17 +830,23 @@ finally:
         except Exception as e:
             print(f"Error while closing the browser: {str(e)}")
 
-    # Clean up the temporary directory
-    import shutil
-
-    shutil.rmtree(temp_dir, ignore_errors=True)
-    print(f"Removed temporary Chrome profile directory: {temp_dir}")
+    # Clean up the temporary directories (a persistent --profile-dir is kept)
+    for temporary_profile_dir in [temp_dir] + worker_profile_dirs:
+        if temporary_profile_dir:
+            shutil.rmtree(temporary_profile_dir, ignore_errors=True)
+            print(f"Removed temporary Chrome profile directory: {temporary_profile_dir}")
     
-    # Clear loom-videos.txt after all videos have been processed (unless --preserve is specified)
-    if os.path.exists(input_file):
+    # Drop successfully processed videos from loom-videos.txt (unless --preserve is specified);
+    # failed and unfinished videos stay so the next run picks them up again
+    if not session_ready:
+        print(f"No videos were processed. Input file '{input_file}' has been left unchanged.")
+    elif os.path.exists(input_file):
         if args.preserve:
-            print(f"Input file '{input_file}' has been preserved. All successfully processed videos are recorded in '{processed_file}'.")
+            print(f"Input file '{input_file}' has been preserved. All successfully processed videos are recorded in '{args.manifest}'.")
         else:
+            with open(input_file, "r") as f:
+                remaining = [line for line in f if line.strip() and not manifest.is_done(line)]
             with open(input_file, "w") as f:
-                f.write("")  # Clear the file
-            print(f"Input file '{input_file}' has been cleared. All successfully processed videos are recorded in '{processed_file}'.")
+                f.writelines(remaining)
+            print(f"Removed successfully processed videos from '{input_file}'; {len(remaining)} remain. "
+                  f"All successfully processed videos are recorded in '{args.manifest}'.")
@@ -34,7 +34,7 @@ def update_process_script():
         original_content = f.read()
     
     # Check if the script has already been modified
-    if "def clean_transcript(" in original_content:
+    if "def clean_transcript(" in original_content or "def process_for_llm(" in original_content:
         print("The process.py script has already been modified to include LLM transcript processing.")
         return False
     
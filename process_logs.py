@@ -1,47 +1,52 @@
-import re
+import argparse
 import pandas as pd
 
-def parse_loom_logs(log_text):
-    # Regular expressions to match the Loom ID and title
-    loom_id_pattern = r"https://www\.loom\.com/share/([a-f0-9]+)"
-    title_pattern = r"Current page title: (.+)"
+from manifest import normalize_video_id
+from run_log import read_records, DEFAULT_RUN_LOG
 
-    # Find all matches in the log text
-    loom_ids = re.findall(loom_id_pattern, log_text)
-    titles = re.findall(title_pattern, log_text)
-
-    # Combine the results into a dictionary
+def parse_loom_logs(records):
+    # Every record carries its own video ID and title, so a failed video cannot shift the pairs
     results = {
-        'Loom ID': loom_ids,
-        'Title': titles
+        'Loom ID': [],
+        'Title': []
     }
+    for record in records:
+        if not record.get('title'):
+            continue
+        results['Loom ID'].append(normalize_video_id(record['video_id']))
+        results['Title'].append(record['title'].replace(" - Loom", "").strip())
 
     return results
 
-# Read logs from file
+parser = argparse.ArgumentParser(description='Write the video titles from the process.py run log to a CSV file.')
+parser.add_argument('--log', type=str, default=DEFAULT_RUN_LOG,
+                    help=f'JSONL run log written by process.py (default: {DEFAULT_RUN_LOG})')
+parser.add_argument('--output', type=str, default='titles.csv', help='CSV file to write (default: titles.csv)')
+args = parser.parse_args()
+
+# Read records from the run log
 try:
-    with open('logs.txt', 'r', encoding='utf-8') as file:
-        log_text = file.read()
+    records = read_records(args.log)
 except FileNotFoundError:
-    print("Error: 'logs.txt' file not found.")
+    print(f"Error: '{args.log}' file not found.")
     exit(1)
 except IOError:
-    print("Error: Unable to read 'logs.txt' file.")
+    print(f"Error: Unable to read '{args.log}' file.")
     exit(1)
 
-# Parse the logs
-results = parse_loom_logs(log_text)
+# Parse the records
+results = parse_loom_logs(records)
 
-# Create a pandas DataFrame
-df = pd.DataFrame(results)
+# Create a pandas DataFrame, keeping the latest title of videos processed more than once
+df = pd.DataFrame(results).drop_duplicates(subset='Loom ID', keep='last')
 
 # Write results to CSV
 try:
-    df.to_csv('titles.csv', index=False)
-    print("Results have been written to 'titles.csv'")
+    df.to_csv(args.output, index=False)
+    print(f"Results have been written to '{args.output}'")
 except IOError:
-    print("Error: Unable to write to 'titles.csv' file.")
+    print(f"Error: Unable to write to '{args.output}' file.")
     exit(1)
 
 # Optional: Print results to console
-print(df.head())
\ No newline at end of file
+print(df.head())
@@ -3,100 +3,49 @@
 process_transcripts_for_llm.py
 
 This script processes Loom transcript files to make them more suitable for use with LLMs.
-It reads all .txt files from a specified source directory, cleans and formats them,
-and saves the processed files to a target directory with "_llm.txt" appended to the filename.
+It reads all .txt files from a specified source directory (or every .txt record of a
+corpus_pack.py archive at that path), cleans and formats them, and saves the processed files to a target directory with "_llm.txt" appended to the filename.
 
-The script is designed to be idempotent and will skip files that have already been processed.
+The script is designed to be idempotent: outputs are tracked in the output index of the target
+directory (see output_index.py), so only missing and stale outputs are cleaned again.
 """
 
 import os
-import re
 import glob
 import time
-import string
-from pathlib import Path
+
+from corpus_pack import CorpusReader, is_pack
+from output_index import OutputIndex, refresh_output
 
 # Define source and target directories
 SOURCE_DIR = "/Users/mss/Desktop/BuildrWealth/Loom Transcripts"
 TARGET_DIR = "/Users/mss/loom-transcript-scraper/llm_ready_transcripts"
 
-def clean_transcript(text):
-    """
-    Process transcript text to make it LLM-friendly.
-    
-    Args:
-        text (str): Raw transcript text
-    
-    Returns:
-        str: Cleaned and formatted transcript text
-    """
-    # Step 1: Preserve timestamps by standardizing their format to [HH:MM:SS]
-    # This regex matches common timestamp formats and standardizes them
-    text = re.sub(r'(\[?\(?\s*)(\d{1,2}:\d{2}(?::\d{2})?)\s*(?:\]|\))?', r'[\2]', text)
-    
-    # Step 2: Normalize line breaks and ensure speaker names are properly formatted
-    # This helps maintain the conversation structure
-    text = re.sub(r'\n{3,}', '\n\n', text)  # Replace excessive newlines with double newlines
-    
-    # Step 3: Fix common punctuation issues
-    # Remove duplicate punctuation and ensure proper spacing
-    text = re.sub(r'([.!?])\s*([.!?])+', r'\1', text)  # Remove duplicate punctuation
-    text = re.sub(r'\s+([.,;:!?])', r'\1', text)  # Remove space before punctuation
-    text = re.sub(r'([.,;:!?])([^\s\d])', r'\1 \2', text)  # Add space after punctuation if missing
-    
-    # Step 4: Normalize whitespace
-    # Remove trailing/leading whitespace from each line and collapse multiple spaces
-    lines = [line.strip() for line in text.split('\n')]
-    text = '\n'.join(lines)
-    text = re.sub(r' +', ' ', text)  # Replace multiple spaces with a single space
-    
-    # Step 5: Remove empty lines while preserving paragraph structure
-    lines = text.split('\n')
-    non_empty_lines = []
-    for i, line in enumerate(lines):
-        # Keep the line if it's not empty or if it's a deliberate paragraph break
-        if line.strip() or (i > 0 and i < len(lines) - 1 and lines[i-1].strip() and lines[i+1].strip()):
-            non_empty_lines.append(line)
-    
-    # Step 6: Final cleanup - remove any remaining problematic characters
-    # (but carefully preserve important special characters)
-    text = '\n'.join(non_empty_lines)
-    
-    # Filter out any non-printable characters except for common line breaks
-    printable_chars = set(string.printable)
-    text = ''.join(c for c in text if c in printable_chars)
-    
-    return text
-
-def process_file(source_path, target_path):
+def process_file(source_path, target_path, index, text=None, source_stat=None):
     """
     Process a single transcript file.
     
     Args:
         source_path (str): Path to the source transcript file
         target_path (str): Path to save the processed file
+        index (OutputIndex): Output index of the target directory
+        text (str): Transcript content of a packed transcript, read from source_path otherwise
+        source_stat (os.stat_result): Stat recorded for a packed transcript, that of its pack
     
     Returns:
         bool: True if file was processed, False if skipped
     """
-    # Check if target file already exists (idempotence)
-    if os.path.exists(target_path):
-        print(f"Skipping {os.path.basename(source_path)} - already processed")
-        return False
-    
+    target_name = os.path.basename(target_path)
     try:
-        # Read source file
-        with open(source_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # Cleaned in windows by clean_stream(), only if the output is missing or stale
+        status, entry = refresh_output(source_path, target_path, index.get(target_name), text=text,
+                                       source_stat=source_stat)
+        index.set(target_name, entry)
+        if status != "written":
+            print(f"Skipping {os.path.basename(source_path)} - already processed")
+            return False
         
-        # Clean and format the transcript
-        processed_content = clean_transcript(content)
-        
-        # Save processed content to target file
-        with open(target_path, 'w', encoding='utf-8') as f:
-            f.write(processed_content)
-        
-        print(f"Processed: {os.path.basename(source_path)} -> {os.path.basename(target_path)}")
+        print(f"Processed: {os.path.basename(source_path)} -> {target_name}")
         return True
     except Exception as e:
         print(f"Error processing {source_path}: {str(e)}")
@@ -109,37 +58,57 @@ def main():
     # Ensure target directory exists
     os.makedirs(TARGET_DIR, exist_ok=True)
     
-    # Get all .txt files from source directory
-    transcript_files = glob.glob(os.path.join(SOURCE_DIR, "*.txt"))
-    
-    if not transcript_files:
+    # Get all .txt files from source directory, or the .txt records of the pack at that path,
+    # as (source path, text, stat); a packed transcript is fingerprinted by the stat of its pack
+    reader = None
+    if is_pack(SOURCE_DIR):
+        reader = CorpusReader(SOURCE_DIR)
+        pack_stat = os.stat(SOURCE_DIR)
+        # Only the .txt records are cleaned, so only they are counted
+        total = sum(1 for name in reader.names() if name.endswith(".txt"))
+        transcripts = ((os.path.join(SOURCE_DIR, name), text, pack_stat) for name, text in reader
+                       if name.endswith(".txt"))
+    else:
+        transcript_files = glob.glob(os.path.join(SOURCE_DIR, "*.txt"))
+        total = len(transcript_files)
+        transcripts = ((source_file, None, None) for source_file in transcript_files)
+    
+    if not total:
         print(f"No .txt files found in {SOURCE_DIR}")
+        if reader is not None:
+            reader.close()
         return
     
-    print(f"Found {len(transcript_files)} transcript files to process")
+    print(f"Found {total} transcript files to process")
     
     # Process each file
     processed_count = 0
     skipped_count = 0
     
     start_time = time.time()
+    index = OutputIndex(TARGET_DIR)
     
-    for source_file in transcript_files:
-        # Generate target filename by appending "_llm.txt" to the original name
-        base_name = os.path.basename(source_file)
-        name_without_ext = os.path.splitext(base_name)[0]
-        target_file = os.path.join(TARGET_DIR, f"{name_without_ext}_llm.txt")
-        
-        # Process the file
-        if process_file(source_file, target_file):
-            processed_count += 1
-        else:
-            skipped_count += 1
+    try:
+        for source_file, text, source_stat in transcripts:
+            # Generate target filename by appending "_llm.txt" to the original name
+            base_name = os.path.basename(source_file)
+            name_without_ext = os.path.splitext(base_name)[0]
+            target_file = os.path.join(TARGET_DIR, f"{name_without_ext}_llm.txt")
+            
+            # Process the file
+            if process_file(source_file, target_file, index, text, source_stat):
+                processed_count += 1
+            else:
+                skipped_count += 1
+    finally:
+        index.save()
+        if reader is not None:
+            reader.close()
     
     # Report summary
     elapsed_time = time.time() - start_time
     print(f"\nProcessing complete!")
-    print(f"Total files: {len(transcript_files)}")
+    print(f"Total files: {processed_count + skipped_count}")
     print(f"Processed: {processed_count}")
     print(f"Skipped: {skipped_count}")
     print(f"Time taken: {elapsed_time:.2f} seconds")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+rate_controller.py
+
+Adaptive pacing of Loom page loads for process.py, shared by all browser workers.
+
+A token bucket hands out one token per page load at the current rate. The rate follows
+AIMD (additive increase, multiplicative decrease): every clean, fast page load raises it
+a little, while slow loads, timeouts and throttling or error pages cut it sharply. A
+throttling page also pauses all workers for a cool-down period. This settles close to
+the highest rate Loom sustains without rate-limiting the account.
+"""
+
+import threading
+import time
+
+# Text Loom or its CDN shows instead of the video page when requests come too fast
+THROTTLE_MARKERS = (
+    "too many requests",
+    "rate limit",
+    "rate-limited",
+    "error 429",
+    "try again later",
+    "temporarily unavailable",
+    "access denied",
+)
+
+# Title and the start of the body text are enough to recognise an error page
+PAGE_TEXT_JS = """
+var body = document.body ? (document.body.innerText || '') : '';
+return (document.title || '') + '\\n' + body.slice(0, 2000);
+"""
+
+OUTCOMES = ("ok", "slow", "timeout", "throttled", "error")
+
+
+def is_throttled_page(driver):
+    """
+    Check whether the loaded page is a throttling or error page instead of a video.
+
+    Args:
+        driver: WebDriver instance showing the page
+
+    Returns:
+        bool: True if the page text contains a throttling marker
+    """
+    try:
+        text = (driver.execute_script(PAGE_TEXT_JS) or "").lower()
+    except Exception:
+        return False
+    return any(marker in text for marker in THROTTLE_MARKERS)
+
+
+class RateController:
+    """Thread-safe token bucket whose rate adapts to how Loom is responding."""
+
+    def __init__(self, initial_delay=5, min_delay=1, max_delay=120, slow_load=15,
+                 increase=0.02, decrease=0.5, cooldown=60):
+        """
+        Args:
+            initial_delay (float): Starting seconds between page loads, across all workers
+            min_delay (float): Fastest allowed pacing in seconds between page loads
+            max_delay (float): Slowest pacing in seconds between page loads
+            slow_load (float): Page load time in seconds above which a load counts as slow
+            increase (float): Page loads per second added to the rate after each clean load
+            decrease (float): Factor the rate is multiplied by after a timeout or throttling page
+            cooldown (float): Seconds all workers pause after a throttling page
+        """
+        self.min_rate = 1.0 / max_delay
+        self.max_rate = 1.0 / min_delay
+        self.rate = min(self.max_rate, max(self.min_rate, 1.0 / initial_delay))
+        self.slow_load = slow_load
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        # No burst: a token is available the moment the controller is created
+        self.tokens = 1.0
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.counts = {outcome: 0 for outcome in OUTCOMES}
+
+    def _refill(self, now):
+        self.tokens = min(1.0, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self):
+        """
+        Block until the next page load is allowed.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        started = time.monotonic()
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return now - started
+                wait = max(self.paused_until - now, (1.0 - self.tokens) / self.rate)
+            time.sleep(min(wait, 1.0))
+
+    def record(self, outcome, load_time=None):
+        """
+        Adjust the rate after a page load.
+
+        Args:
+            outcome (str): "ok", "slow", "timeout", "throttled" or "error"; "ok" with a
+                load_time above the slow threshold is treated as "slow"
+            load_time (float): Seconds the page took to become ready, if known
+        """
+        if outcome == "ok" and load_time is not None and load_time > self.slow_load:
+            outcome = "slow"
+        with self.lock:
+            self._refill(time.monotonic())
+            self.counts[outcome] += 1
+            if outcome == "ok":
+                self.rate = min(self.max_rate, self.rate + self.increase)
+            elif outcome == "slow":
+                # Slow pages are an early warning, so back off more gently
+                self.rate = max(self.min_rate, self.rate * (1 + self.decrease) / 2)
+            elif outcome in ("timeout", "throttled"):
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+            if outcome == "throttled":
+                self.paused_until = max(self.paused_until, time.monotonic() + self.cooldown)
+                self.tokens = 0.0
+            # Other errors (e.g. a video without a transcript) say nothing about load
+
+    def delay(self):
+        """Current seconds between page loads."""
+        with self.lock:
+            return 1.0 / self.rate
+
+    def summary(self):
+        """
+        Returns:
+            dict: Final delay in seconds and the number of page loads per outcome
+        """
+        with self.lock:
+            return {"delay": 1.0 / self.rate, **self.counts}
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+run_log.py
+
+Structured per-video run log for process.py.
+
+Every video produces one JSON line with its outcome, title, worker, characters extracted,
+the tab selector and extraction method that were used, and the seconds spent in each
+phase (pacing, navigation, frame scan, tab discovery, transcript wait, extraction, save
+and LLM cleaning). The log is appended to across runs, and each record carries the ID of
+the run it belongs to.
+
+Usage:
+    python run_log.py summary [--log loom-run.jsonl] [--run RUN_ID | --all]
+"""
+
+import argparse
+import json
+import math
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+DEFAULT_RUN_LOG = "loom-run.jsonl"
+
+# Phases in the order they happen for a video
+PHASES = ("pacing", "direct_fetch", "navigation", "frame_scan", "tab_discovery", "transcript_wait",
+          "extraction", "save", "llm_cleaning")
+
+
+def current_worker_id():
+    """Worker number of the calling thread, as named by worker_pool.py; 1 outside the pool."""
+    name = threading.current_thread().name
+    if name.startswith("loom-worker-"):
+        try:
+            return int(name.rsplit("-", 1)[1])
+        except ValueError:
+            pass
+    return 1
+
+
+class VideoRecord:
+    """Timings and results of one video, written to the run log when finished."""
+
+    def __init__(self, run_log, video_id, worker):
+        self.run_log = run_log
+        self.started = time.time()
+        self.fields = {"run": run_log.run_id, "video_id": video_id, "worker": worker,
+                       "started_at": round(self.started, 3), "outcome": None, "chars": 0, "phases": {}}
+        self.last_lap = time.monotonic()
+        self.written = False
+
+    def lap(self, name):
+        """Charge the time since the previous lap (or the start) to a phase."""
+        now = time.monotonic()
+        self.add_time(name, now - self.last_lap)
+        self.last_lap = now
+
+    @contextmanager
+    def phase(self, name):
+        """Time a phase; repeated phases add up."""
+        phase_started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.monotonic() - phase_started)
+
+    def add_time(self, name, seconds):
+        phases = self.fields["phases"]
+        phases[name] = round(phases.get(name, 0.0) + seconds, 3)
+
+    def set(self, **fields):
+        """Set result fields such as outcome, title, chars, tab_strategy or extraction_method."""
+        self.fields.update(fields)
+
+    def write(self):
+        """Append the record to the run log; only the first call writes."""
+        if self.written:
+            return
+        self.written = True
+        self.fields["total"] = round(time.time() - self.started, 3)
+        self.run_log.write(self.fields)
+
+
+class RunLog:
+    """Thread-safe appender for the JSONL run log."""
+
+    def __init__(self, path=DEFAULT_RUN_LOG):
+        """
+        Args:
+            path (str): JSONL file, appended to
+        """
+        self.path = path
+        self.run_id = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+        self.lock = threading.Lock()
+
+    def start(self, video_id):
+        """Begin the record of a video processed by the calling worker thread."""
+        return VideoRecord(self, video_id, current_worker_id())
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def read_records(path=DEFAULT_RUN_LOG, run=None):
+    """
+    Read records from a run log, skipping lines that are not valid JSON.
+
+    Args:
+        path (str): JSONL run log
+        run (str): Only return records of this run; "latest" selects the last run in the file
+
+    Returns:
+        list: Records as dicts
+    """
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    if run == "latest" and records:
+        run = records[-1].get("run")
+    if run is not None:
+        records = [record for record in records if record.get("run") == run]
+    return records
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile, None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def summarize(records):
+    """
+    Aggregate run log records.
+
+    Args:
+        records (list): Records from read_records()
+
+    Returns:
+        dict: videos, outcomes, workers, extraction methods, tab strategies, chars and
+            per-phase count/mean/p50/p95/max in seconds
+    """
+    phases = {}
+    for record in records:
+        for name, seconds in record.get("phases", {}).items():
+            phases.setdefault(name, []).append(seconds)
+        phases.setdefault("total", []).append(record.get("total", 0.0))
+    order = list(PHASES) + ["total"]
+    return {
+        "videos": len(records),
+        "outcomes": Counter(record.get("outcome") for record in records),
+        "workers": Counter(record.get("worker") for record in records),
+        "extraction_methods": Counter(record.get("extraction_method") for record in records
+                                      if record.get("extraction_method")),
+        "tab_strategies": Counter(record.get("tab_strategy") for record in records if record.get("tab_strategy")),
+        "chars": sum(record.get("chars") or 0 for record in records),
+        "phases": {
+            name: {
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                "p50": percentile(values, 0.5),
+                "p95": percentile(values, 0.95),
+                "max": max(values),
+            }
+            for name, values in sorted(phases.items(), key=lambda item: order.index(item[0])
+                                       if item[0] in order else len(order))
+        },
+    }
+
+
+def print_summary(summary):
+    print(f"Videos: {summary['videos']}, characters extracted: {summary['chars']}")
+    print("Outcomes: " + ", ".join(f"{outcome}: {count}" for outcome, count in summary["outcomes"].most_common()))
+    print("Workers: " + ", ".join(f"{worker}: {count}" for worker, count in sorted(summary["workers"].items())))
+    if summary["extraction_methods"]:
+        print("Extraction methods: " + ", ".join(
+            f"{method}: {count}" for method, count in summary["extraction_methods"].most_common()))
+    if summary["tab_strategies"]:
+        print("Tab strategies: " + ", ".join(
+            f"{strategy}: {count}" for strategy, count in summary["tab_strategies"].most_common()))
+    print(f"{'Phase':<16}{'count':>7}{'mean':>9}{'p50':>9}{'p95':>9}{'max':>9}")
+    for name, stats in summary["phases"].items():
+        print(f"{name:<16}{stats['count']:>7}{stats['mean']:>8.2f}s{stats['p50']:>8.2f}s"
+              f"{stats['p95']:>8.2f}s{stats['max']:>8.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize the process.py run log.')
+    parser.add_argument('command', choices=['summary'], help='summary: aggregate outcomes and phase timings')
+    parser.add_argument('--log', type=str, default=DEFAULT_RUN_LOG, help=f'Run log (default: {DEFAULT_RUN_LOG})')
+    parser.add_argument('--run', type=str, default="latest", help='Run ID to summarize (default: the latest run)')
+    parser.add_argument('--all', action='store_true', help='Summarize every run in the log')
+    args = parser.parse_args()
+
+    try:
+        records = read_records(args.log, None if args.all else args.run)
+    except FileNotFoundError:
+        parser.error(f"Run log not found: {args.log}")
+    if not records:
+        print(f"No records in {args.log}")
+        return
+    if not args.all:
+        print(f"Run {records[0].get('run')}")
+    print_summary(summarize(records))
+
+
+if __name__ == "__main__":
+    main()
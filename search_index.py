@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+search_index.py
+
+Inverted full-text index of the LLM-ready transcripts with timestamp-level hits.
+
+Every word of every _llm.txt file is stored in a SQLite database (.search-index.db in the
+transcript directory) under its lower-cased term, with the file, its position in the file,
+the segment it belongs to and its character offset. A query looks up its terms by primary
+key, so it takes milliseconds however large the corpus is, and answers with the segments
+where the terms occur. The index records the modification time and size of every file it
+holds, so updating it only re-indexes the files that changed; integrated_solution.py and
+process.py --process-llm update it whenever they write new outputs.
+
+Queries are words and double-quoted phrases. Every word and phrase must occur in the same
+segment, the words of a phrase next to each other in that order.
+
+Usage:
+    python search_index.py build llm_ready_transcripts [--force]
+    python search_index.py search '"uniswap v3" rebalance' [--index-dir llm_ready_transcripts] [--limit 20]
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from near_duplicates import load_duplicates
+from segments import Segments, format_timestamp
+
+SEARCH_INDEX_FILENAME = ".search-index.db"
+
+# Words as indexed and queried, matched on lower-cased text
+TERM = re.compile(r'\w+')
+
+# Query words and "quoted phrases"
+QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+
+# The video ID at the end of a transcript file name
+FILE_NAME_VIDEO_ID = re.compile(r'\s*-\s*[0-9a-f]{32}$', re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    file_id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    title TEXT,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+CREATE TABLE IF NOT EXISTS segments (
+    file_id INTEGER NOT NULL,
+    segment INTEGER NOT NULL,
+    start REAL NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    PRIMARY KEY (file_id, segment)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    PRIMARY KEY (term, file_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_file ON postings(file_id);
+"""
+
+
+def title_of(file_name):
+    """Video title of a transcript file name: without the _llm.txt suffix and the video ID."""
+    name = file_name[:-len("_llm.txt")] if file_name.endswith("_llm.txt") else os.path.splitext(file_name)[0]
+    return FILE_NAME_VIDEO_ID.sub("", name)
+
+
+def parse_query(query):
+    """
+    Split a query into its words and phrases.
+
+    Returns:
+        list: One list of lower-cased terms per word or phrase
+    """
+    parts = []
+    for match in QUERY_PART.finditer(query):
+        terms = TERM.findall((match.group(1) if match.group(1) is not None else match.group(2)).lower())
+        if terms:
+            parts.append(terms)
+    return parts
+
+
+class SearchIndex:
+    """Thread-safe access to the search index of a transcript directory."""
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory (str): Directory of the LLM-ready transcripts, where the index is kept
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, SEARCH_INDEX_FILENAME)
+        self.lock = threading.Lock()
+        # One connection shared by the cleaning threads, serialized by self.lock
+        self.conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def index_file(self, path):
+        """
+        Index one LLM-ready transcript, replacing what the index held for it.
+
+        Returns:
+            int: Number of words indexed
+        """
+        stat = os.stat(path)
+        segments = Segments.from_file(path)
+        text = segments.text
+        postings = []
+        position = 0
+        for index in range(len(segments)):
+            offset = segments.offsets[index]
+            # Lower-cased per segment, so offsets stay those of the file's text
+            for match in TERM.finditer(text[offset:offset + segments.lengths[index]].lower()):
+                postings.append((match.group(), position, index, offset + match.start()))
+                position += 1
+        name = os.path.basename(path)
+        with self.lock, self.conn:
+            # A re-indexed file keeps its file_id
+            file_id = self._remove(name)
+            if file_id is None:
+                file_id = self.conn.execute("INSERT INTO files (name) VALUES (?)", (name,)).lastrowid
+            self.conn.execute("UPDATE files SET title = ?, mtime_ns = ?, size = ? WHERE file_id = ?",
+                              (title_of(name), stat.st_mtime_ns, stat.st_size, file_id))
+            self.conn.executemany("INSERT INTO segments VALUES (?, ?, ?, ?, ?)",
+                                  [(file_id, index, segments.starts[index], segments.offsets[index],
+                                    segments.lengths[index]) for index in range(len(segments))])
+            self.conn.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?, ?, ?, ?)",
+                                  [(term, file_id, position, segment, offset)
+                                   for term, position, segment, offset in postings])
+        return len(postings)
+
+    def _remove(self, name):
+        # Drops the segments and postings of a file, returns its file_id (None if not indexed)
+        row = self.conn.execute("SELECT file_id FROM files WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        self.conn.execute("DELETE FROM postings WHERE file_id = ?", (row[0],))
+        self.conn.execute("DELETE FROM segments WHERE file_id = ?", (row[0],))
+        return row[0]
+
+    def remove_file(self, name):
+        """Drop a transcript file name from the index."""
+        with self.lock, self.conn:
+            if self._remove(name) is not None:
+                self.conn.execute("DELETE FROM files WHERE name = ?", (name,))
+
+    def update(self, force=False, skip=()):
+        """
+        Bring the index in line with the directory: index new files and files whose
+        modification time or size changed, and drop files that no longer exist.
+
+        Args:
+            force (bool): Re-index every file
+            skip (set): File names to leave out of the index, such as near-duplicates
+
+        Returns:
+            tuple: (files indexed, files unchanged, files removed)
+        """
+        with self.lock:
+            known = {name: (mtime_ns, size) for name, mtime_ns, size
+                     in self.conn.execute("SELECT name, mtime_ns, size FROM files")}
+        indexed = unchanged = 0
+        present = set()
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith("_llm.txt") or entry.name in skip or not entry.is_file():
+                continue
+            present.add(entry.name)
+            stat = entry.stat()
+            if not force and known.get(entry.name) == (stat.st_mtime_ns, stat.st_size):
+                unchanged += 1
+                continue
+            try:
+                self.index_file(entry.path)
+                indexed += 1
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Error indexing {entry.name}: {str(e)}")
+        removed = [name for name in known if name not in present]
+        for name in removed:
+            self.remove_file(name)
+        return indexed, unchanged, len(removed)
+
+    def _part_hits(self, terms):
+        # (file_id, segment) -> offset of the first match of a word or phrase
+        rows = self.conn.execute("SELECT file_id, position, segment, offset FROM postings WHERE term = ?",
+                                 (terms[0],)).fetchall()
+        for shift, term in enumerate(terms[1:], 1):
+            following = set(self.conn.execute("SELECT file_id, position FROM postings WHERE term = ?", (term,)))
+            rows = [row for row in rows if (row[0], row[1] + shift) in following]
+        hits = {}
+        for file_id, _, segment, offset in rows:
+            hits.setdefault((file_id, segment), offset)
+        return hits
+
+    def search(self, query, limit=20):
+        """
+        Find the segments that contain every word and phrase of a query.
+
+        Args:
+            query (str): Words and double-quoted phrases
+            limit (int): Maximum number of hits, None for all
+
+        Returns:
+            list: Hits as dicts with file, title, start (seconds), segment and offset (of the
+                first word or phrase in the file), ordered by title and time
+        """
+        parts = parse_query(query)
+        if not parts:
+            return []
+        with self.lock:
+            # The rarest word or phrase first, so the others only filter its hits
+            parts.sort(key=lambda terms: self.conn.execute("SELECT COUNT(*) FROM postings WHERE term = ?",
+                                                           (terms[0],)).fetchone()[0])
+            hits = None
+            for terms in parts:
+                part_hits = self._part_hits(terms)
+                if hits is None:
+                    hits = part_hits
+                else:
+                    hits = {key: offset for key, offset in hits.items() if key in part_hits}
+                if not hits:
+                    return []
+            results = []
+            for (file_id, segment), offset in hits.items():
+                name, title = self.conn.execute("SELECT name, title FROM files WHERE file_id = ?",
+                                                (file_id,)).fetchone()
+                start = self.conn.execute("SELECT start FROM segments WHERE file_id = ? AND segment = ?",
+                                          (file_id, segment)).fetchone()[0]
+                results.append({"file": name, "title": title, "start": start, "segment": segment,
+                                "offset": offset})
+        results.sort(key=lambda hit: (hit["title"], hit["file"], hit["start"], hit["segment"]))
+        return results if limit is None else results[:limit]
+
+    def segment_text(self, hit):
+        """Text of the segment of a search hit, read from its transcript."""
+        with self.lock:
+            offset, length = self.conn.execute("SELECT offset, length FROM segments WHERE file_id = "
+                                               "(SELECT file_id FROM files WHERE name = ?) AND segment = ?",
+                                               (hit["file"], hit["segment"])).fetchone()
+        with open(os.path.join(self.directory, hit["file"]), "r", encoding="utf-8") as f:
+            return f.read()[offset:offset + length]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Full-text search of the LLM-ready transcripts.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help='Create or update the search index of a transcript directory')
+    build.add_argument('directory', nargs='?', default="llm_ready_transcripts",
+                       help='Directory of _llm.txt files (default: llm_ready_transcripts)')
+    build.add_argument('--force', action='store_true', help='Re-index files that did not change')
+    build.add_argument('--skip-duplicates', action='store_true',
+                       help='Leave out the near-duplicates recorded by near_duplicates.py')
+    search = subparsers.add_parser('search', help='Print the segments matching a query as "title @ [MM:SS]"')
+    search.add_argument('query', help='Words and double-quoted phrases, all in the same segment')
+    search.add_argument('--index-dir', type=str, default="llm_ready_transcripts",
+                        help='Directory of _llm.txt files and their index (default: llm_ready_transcripts)')
+    search.add_argument('--limit', type=int, default=20, help='Maximum number of hits, 0 for all (default: 20)')
+    search.add_argument('--text', action='store_true', help='Print the text of every matching segment')
+    args = parser.parse_args()
+
+    directory = args.directory if args.command == 'build' else args.index_dir
+    if not os.path.isdir(directory):
+        parser.error(f"Not a directory: {directory}")
+
+    index = SearchIndex(directory)
+    try:
+        if args.command == 'build':
+            start_time = time.time()
+            skip = load_duplicates(directory) if args.skip_duplicates else ()
+            indexed, unchanged, removed = index.update(force=args.force, skip=skip)
+            print(f"Indexed {indexed} transcripts, {unchanged} unchanged, {removed} removed "
+                  f"in {time.time() - start_time:.2f} seconds")
+            return
+        start_time = time.time()
+        hits = index.search(args.query, limit=args.limit or None)
+        elapsed_ms = (time.time() - start_time) * 1000
+        for hit in hits:
+            print(f"{hit['title']} @ {format_timestamp(hit['start'])}")
+            if args.text:
+                print(f"    {index.segment_text(hit)}")
+        print(f"{len(hits)} hit(s) in {elapsed_ms:.1f} ms")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+segments.py
+
+Timestamped segment model of a transcript, with JSONL, SRT and WebVTT export.
+
+A cleaned transcript is flat text with a [MM:SS] (or [H:MM:SS]) marker in front of every
+segment. Segments parses those markers once into parallel arrays of start seconds, text
+offsets and text lengths, so consumers get any segment's boundaries and text by index, or
+the segment playing at a given second by binary search, without re-scanning the text.
+Raw transcripts are cleaned first.
+
+Usage:
+    python segments.py export llm_ready_transcripts [--formats jsonl srt vtt] [--output-dir exports]
+    python segments.py export transcripts.pack
+"""
+
+import argparse
+import json
+import os
+import re
+from array import array
+from bisect import bisect_right
+
+from corpus_pack import CorpusReader, is_pack
+from transcript_cleaner import clean_transcript
+
+FORMATS = ("jsonl", "srt", "vtt")
+
+# Timestamp markers as written by clean_transcript()
+SEGMENT_MARKER = re.compile(r'\[(\d{1,2}):(\d{2})(?::(\d{2}))?\]')
+
+# Reading speed used to estimate how long the last segment lasts
+CHARS_PER_SECOND = 15.0
+
+
+def marker_seconds(match):
+    """Seconds of a SEGMENT_MARKER match; three parts are hours, minutes and seconds."""
+    first, second, third = match.groups()
+    if third is None:
+        return int(first) * 60 + int(second)
+    return int(first) * 3600 + int(second) * 60 + int(third)
+
+
+def format_timestamp(seconds):
+    """Seconds as a [MM:SS] marker, or [H:MM:SS] from an hour on."""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"[{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}]"
+    return f"[{seconds // 60}:{seconds % 60:02d}]"
+
+
+class Segment:
+    """One segment of a transcript, as returned by Segments[index]."""
+
+    __slots__ = ("index", "start", "end", "text")
+
+    def __init__(self, index, start, end, text):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def __repr__(self):
+        return f"Segment({self.index}, {self.start:g}-{self.end:g}s, {self.text[:40]!r})"
+
+
+class Segments:
+    """Segments of one cleaned transcript, stored as parallel arrays over its text."""
+
+    __slots__ = ("text", "starts", "offsets", "lengths")
+
+    def __init__(self, text):
+        """
+        Args:
+            text (str): Cleaned transcript text with [MM:SS] markers
+        """
+        self.text = text
+        self.starts = array('d')
+        self.offsets = array('l')
+        self.lengths = array('l')
+        matches = list(SEGMENT_MARKER.finditer(text))
+        # Text in front of the first marker is a segment starting at zero
+        bounds = [(0.0, 0)] + [(float(marker_seconds(match)), match.end()) for match in matches]
+        ends = [match.start() for match in matches] + [len(text)]
+        for position, ((start, offset), end) in enumerate(zip(bounds, ends)):
+            # Trim the whitespace around the segment text
+            while offset < end and text[offset].isspace():
+                offset += 1
+            while end > offset and text[end - 1].isspace():
+                end -= 1
+            if position == 0 and end == offset:
+                # Nothing in front of the first marker
+                continue
+            self.starts.append(start)
+            self.offsets.append(offset)
+            self.lengths.append(end - offset)
+
+    @classmethod
+    def from_raw(cls, text):
+        """Segments of a raw transcript, cleaned first."""
+        return cls(clean_transcript(text))
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Segments of a transcript file; files not ending in _llm.txt are treated as raw
+        transcripts and cleaned first.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        return cls(text) if path.endswith("_llm.txt") else cls.from_raw(text)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def start(self, index):
+        """Start of a segment in seconds."""
+        return self.starts[index]
+
+    def end(self, index):
+        """
+        End of a segment in seconds: the start of the next segment, estimated from the
+        length of the text for the last one.
+        """
+        if index + 1 < len(self.starts):
+            return self.starts[index + 1]
+        return self.starts[index] + max(1.0, round(self.lengths[index] / CHARS_PER_SECOND))
+
+    def segment_text(self, index):
+        """Text of a segment without its marker."""
+        offset = self.offsets[index]
+        return self.text[offset:offset + self.lengths[index]]
+
+    def at(self, seconds):
+        """Index of the segment playing at a time in seconds, None before the first one."""
+        index = bisect_right(self.starts, seconds) - 1
+        return index if index >= 0 else None
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.starts)
+        if not 0 <= index < len(self.starts):
+            raise IndexError("segment index out of range")
+        return Segment(index, self.starts[index], self.end(index), self.segment_text(index))
+
+    def __iter__(self):
+        for index in range(len(self.starts)):
+            yield self[index]
+
+
+def subtitle_time(seconds, separator):
+    """HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (WebVTT)."""
+    milliseconds = int(round(seconds * 1000))
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+
+def export(segments, writers):
+    """
+    Write segments in several formats in a single pass over them.
+
+    Args:
+        segments (Segments): Segments to export
+        writers (dict): Format name from FORMATS -> callable receiving the output text
+            piece by piece
+    """
+    if "vtt" in writers:
+        writers["vtt"]("WEBVTT\n\n")
+    for segment in segments:
+        if "jsonl" in writers:
+            writers["jsonl"](json.dumps({"index": segment.index, "start": segment.start, "end": segment.end,
+                                         "text": segment.text}, ensure_ascii=False) + "\n")
+        # Cue text must not contain blank lines
+        cue_text = " ".join(segment.text.split())
+        if "srt" in writers:
+            writers["srt"](f"{segment.index + 1}\n{subtitle_time(segment.start, ',')} --> "
+                           f"{subtitle_time(segment.end, ',')}\n{cue_text}\n\n")
+        if "vtt" in writers:
+            writers["vtt"](f"{subtitle_time(segment.start, '.')} --> {subtitle_time(segment.end, '.')}\n"
+                           f"{cue_text}\n\n")
+
+
+def export_file(path, output_dir, formats=FORMATS):
+    """
+    Export one transcript file to output_dir, one file per format.
+
+    Returns:
+        int: Number of segments exported
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return export_text(os.path.basename(path), f.read(), output_dir, formats)
+
+
+def export_text(file_name, text, output_dir, formats=FORMATS):
+    """
+    Export one transcript to output_dir, one file per format; file names not ending in
+    _llm.txt are taken for raw transcripts and cleaned first.
+
+    Returns:
+        int: Number of segments exported
+    """
+    segments = Segments(text) if file_name.endswith("_llm.txt") else Segments.from_raw(text)
+    name = os.path.splitext(file_name)[0]
+    if name.endswith("_llm"):
+        name = name[:-len("_llm")]
+    files = {fmt: open(os.path.join(output_dir, f"{name}.{fmt}"), "w", encoding="utf-8") for fmt in formats}
+    try:
+        export(segments, {fmt: f.write for fmt, f in files.items()})
+    finally:
+        for f in files.values():
+            f.close()
+    return len(segments)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export transcripts as timestamped segments.')
+    parser.add_argument('command', choices=['export'], help='export: write JSONL, SRT and/or WebVTT files')
+    parser.add_argument('path', help='Transcript file, directory of .txt transcripts or corpus_pack.py archive')
+    parser.add_argument('--formats', nargs='+', choices=FORMATS, default=list(FORMATS),
+                        help='Formats to write (default: jsonl srt vtt)')
+    parser.add_argument('--output-dir', type=str, default="exports", help='Directory to write to (default: exports)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        parser.error(f"Not found: {args.path}")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    total = 0
+    if is_pack(args.path):
+        # Every record read from the memory-mapped archive, no file opened per transcript
+        with CorpusReader(args.path) as reader:
+            for name, text in reader:
+                count = export_text(name, text, args.output_dir, args.formats)
+                total += count
+                print(f"Exported {count} segments: {name}")
+            print(f"Exported {total} segments from {len(reader)} transcripts to {args.output_dir}")
+        return
+
+    if os.path.isdir(args.path):
+        paths = sorted(entry.path for entry in os.scandir(args.path) if entry.name.endswith('.txt'))
+    else:
+        paths = [args.path]
+    for path in paths:
+        try:
+            count = export_file(path, args.output_dir, args.formats)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Error exporting {path}: {str(e)}")
+            continue
+        total += count
+        print(f"Exported {count} segments: {os.path.basename(path)}")
+    print(f"Exported {total} segments from {len(paths)} transcripts to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import pytest
+
+from browser_supervisor import SupervisedDriver
+
+
+class FakeDriver:
+    def __init__(self, name):
+        self.name = name
+        self.alive = True
+        self.quit_calls = 0
+        self.cookies = []
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("browser is gone")
+        return 1
+
+    def get_cookies(self):
+        return [{"name": "session", "value": self.name}]
+
+    def get(self, url):
+        pass
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def quit(self):
+        self.quit_calls += 1
+        self.alive = False
+
+
+@pytest.fixture
+def drivers():
+    return []
+
+
+def supervisor_for(original, drivers, **kwargs):
+    def create_driver(worker_id):
+        driver = FakeDriver(f"replacement {len(drivers) + 1}")
+        drivers.append(driver)
+        return driver
+    return SupervisedDriver(original, create_driver, max_memory_mb=0, **kwargs)
+
+
+def test_recycles_after_the_video_budget(drivers):
+    original = FakeDriver("original")
+    supervisor = supervisor_for(original, drivers, recycle_after=2)
+    used = [supervisor.run(lambda driver, video_id: driver, video_id) for video_id in "abcde"]
+    assert [driver.name for driver in used] == ["original", "original", "replacement 1", "replacement 1",
+                                                 "replacement 2"]
+    assert supervisor.recycles == 2
+    # Replacement browsers get the session cookies of the one they replace
+    assert drivers[0].cookies == [{"name": "session", "value": "original"}]
+    assert drivers[1].cookies == [{"name": "session", "value": "replacement 1"}]
+
+
+def test_recycled_original_is_quit_and_retired(drivers):
+    original = FakeDriver("original")
+    supervisor = supervisor_for(original, drivers, recycle_after=1)
+    supervisor.run(lambda driver, video_id: True, "a")
+    assert not supervisor.retired(original)
+    supervisor.run(lambda driver, video_id: True, "b")
+    assert original.quit_calls == 1
+    assert supervisor.retired(original)
+    assert supervisor.close()["recycles"] == 1
+    assert drivers[0].quit_calls == 1
+    assert original.quit_calls == 1
+
+
+def test_original_is_left_to_its_owner_when_never_replaced(drivers):
+    original = FakeDriver("original")
+    supervisor = supervisor_for(original, drivers, recycle_after=0)
+    supervisor.run(lambda driver, video_id: True, "a")
+    supervisor.close()
+    assert original.quit_calls == 0
+    assert not supervisor.retired(original)
+
+
+def test_crashed_browser_is_restarted(drivers):
+    original = FakeDriver("original")
+    supervisor = supervisor_for(original, drivers, recycle_after=0)
+    original.alive = False
+    assert supervisor.run(lambda driver, video_id: driver, "a") is drivers[0]
+    assert supervisor.restarts == 1
+
+
+def test_failing_browser_is_replaced(drivers):
+    original = FakeDriver("original")
+    supervisor = supervisor_for(original, drivers, recycle_after=0, error_window=3, max_error_rate=0.6)
+    for video_id in "abc":
+        supervisor.run(lambda driver, video_id: False, video_id)
+    assert supervisor.run(lambda driver, video_id: driver, "d") is drivers[0]
+    assert supervisor.recycles == 1
+
+
+def test_gives_up_when_no_browser_starts():
+    original = FakeDriver("original")
+    original.alive = False
+
+    def create_driver(worker_id):
+        raise OSError("no browser")
+
+    supervisor = SupervisedDriver(original, create_driver, max_memory_mb=0, max_restart_attempts=2)
+    with pytest.raises(RuntimeError):
+        supervisor.run(lambda driver, video_id: True, "a")
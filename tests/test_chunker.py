@@ -0,0 +1,35 @@
+from chunker import build_chunk_index, chunk_segments, estimate_tokens, load_chunk_index, read_chunk
+from segments import Segments
+
+NAME = "Call - 0123456789abcdef0123456789abcdef_llm.txt"
+TEXT = "\n".join(f"[{index // 60}:{index % 60:02d}] Segment number {index} says café things." for index in range(0, 300, 10))
+
+
+def test_estimate_is_additive():
+    assert estimate_tokens("hello world, again") == estimate_tokens("hello world,") + estimate_tokens("again")
+
+
+def test_chunks_cover_every_segment_within_budget():
+    segments = Segments(TEXT)
+    chunks = chunk_segments(segments, max_tokens=40, overlap=10)
+    assert chunks[0].first == 0 and chunks[-1].last == len(segments) - 1
+    for before, after in zip(chunks, chunks[1:]):
+        assert before.first < after.first <= before.last + 1
+    assert all(chunk.tokens <= 40 for chunk in chunks)
+
+
+def test_oversized_segment_is_a_chunk_by_itself():
+    segments = Segments("[0:00] short\n[0:10] " + "word " * 50 + "\n[0:20] short")
+    assert [(chunk.first, chunk.last) for chunk in chunk_segments(segments, max_tokens=10)] == [(0, 0), (1, 1), (2, 2)]
+
+
+def test_index_reads_chunks_by_byte_offset(tmp_path):
+    (tmp_path / NAME).write_text(TEXT, encoding="utf-8")
+    assert build_chunk_index(str(tmp_path), 40, 10)[0] == 1
+    header, records = load_chunk_index(str(tmp_path))
+    assert header["max_tokens"] == 40
+    assert read_chunk(str(tmp_path), records[0]).startswith("[0:00] Segment number 0")
+    assert read_chunk(str(tmp_path), records[-1]).endswith("says café things.")
+    # Unchanged files keep their records
+    chunked, kept, count = build_chunk_index(str(tmp_path), 40, 10)
+    assert (chunked, kept, count) == (0, 1, len(records))
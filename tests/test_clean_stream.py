@@ -0,0 +1,35 @@
+import io
+import random
+
+import pytest
+
+from transcript_cleaner import clean_stream, clean_transcript, fuzz_transcript, stream_clean_transcript
+
+RAW = ("0:00 so the next step is  to open the dashboard ..\n\n\n\n"
+       "(0:12) and check the numbers ,they look right !?\n"
+       "1:02:03] Last   segment here\t\n")
+
+
+@pytest.mark.parametrize("window", [1, 2, 3, 7, 12, 65536])
+def test_stream_matches_whole_text(window):
+    assert stream_clean_transcript(RAW, window) == clean_transcript(RAW)
+
+
+def test_stream_matches_on_random_inputs():
+    rng = random.Random(0)
+    for _ in range(2000):
+        text = fuzz_transcript(rng, 120)
+        window = rng.randint(1, 12)
+        assert stream_clean_transcript(text, window) == clean_transcript(text), (text, window)
+
+
+def test_stream_without_split_point():
+    text = "0:01 " + "12 34 .. ;; " * 5000 + "end"
+    assert stream_clean_transcript(text, 64) == clean_transcript(text)
+
+
+def test_stream_writes_pieces():
+    pieces = []
+    clean_stream(io.StringIO(RAW * 50), pieces.append, 100)
+    assert len(pieces) > 1
+    assert "".join(pieces) == clean_transcript(RAW * 50)
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from corpus_pack import CorpusReader, is_pack, iter_transcripts, pack_directory, record_key
+
+FILES = {
+    "Intro - 0123456789abcdef0123456789abcdef.txt": "0:00 Hello\n0:05 World\n",
+    "Wallet 0xabcdefabcdefabcdefabcdefabcdefab - 11111111111111111111111111111111.txt": "0:01 Café\n",
+    "No id here.txt": "0:02 Plain\n",
+}
+
+
+@pytest.fixture
+def source(tmp_path):
+    directory = tmp_path / "transcripts"
+    directory.mkdir()
+    for name, text in FILES.items():
+        (directory / name).write_text(text, encoding="utf-8")
+    (directory / "notes.md").write_text("not packed", encoding="utf-8")
+    return directory
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_round_trip(source, tmp_path, compress):
+    archive = str(tmp_path / "transcripts.pack")
+    assert pack_directory(str(source), archive, compress=compress) == (3, 0, 0)
+    assert is_pack(archive)
+    with CorpusReader(archive) as reader:
+        assert len(reader) == 3
+        assert dict(reader) == FILES
+        assert reader.names() == [name for name, _ in reader]
+        assert reader.get("https://www.loom.com/share/0123456789abcdef0123456789abcdef") == \
+            ("Intro - 0123456789abcdef0123456789abcdef.txt", FILES["Intro - 0123456789abcdef0123456789abcdef.txt"])
+        assert "No id here.txt" in reader
+        assert reader.get("fedcba9876543210fedcba9876543210") is None
+    assert dict(iter_transcripts(archive)) == dict(iter_transcripts(str(source))) == FILES
+
+
+def test_key_is_the_last_video_id():
+    assert record_key("a 0123456789abcdef0123456789abcdef b 11111111111111111111111111111111.txt") == bytes.fromhex("11" * 16)
+
+
+def test_repack_appends_only_changes(source, tmp_path):
+    archive = str(tmp_path / "transcripts.pack")
+    pack_directory(str(source), archive)
+    size = os.path.getsize(archive)
+    assert pack_directory(str(source), archive) == (0, 3, 0)
+    assert os.path.getsize(archive) == size
+    (source / "No id here.txt").write_text("0:02 Changed\n", encoding="utf-8")
+    assert pack_directory(str(source), archive) == (1, 2, 0)
+    with CorpusReader(archive) as reader:
+        assert reader.get("No id here.txt")[1] == "0:02 Changed\n"
+
+
+def test_prune_drops_deleted_files(source, tmp_path):
+    archive = str(tmp_path / "transcripts.pack")
+    pack_directory(str(source), archive, compress=True)
+    (source / "No id here.txt").unlink()
+    pack_directory(str(source), archive)
+    with CorpusReader(archive) as reader:
+        assert len(reader) == 3
+    assert pack_directory(str(source), archive, prune=True) == (0, 2, 1)
+    with CorpusReader(archive) as reader:
+        assert "No id here.txt" not in reader
+        assert dict(reader) == {name: text for name, text in FILES.items() if name != "No id here.txt"}
+
+
+def test_not_a_pack(tmp_path):
+    archive = tmp_path / "bogus.pack"
+    archive.write_bytes(b"something else")
+    (tmp_path / "bogus.pack.idx").write_bytes(b"")
+    with pytest.raises(ValueError):
+        CorpusReader(str(archive))
@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+from job_queue import JobQueue
+from manifest import Manifest
+
+FIRST = "https://www.loom.com/share/0123456789abcdef0123456789abcdef"
+SECOND = "11111111111111111111111111111111"
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return Manifest(str(tmp_path / "manifest.db"))
+
+
+def test_claims_in_input_order(manifest):
+    queue = JobQueue(manifest)
+    assert queue.enqueue([FIRST, SECOND]) == 2
+    assert queue.claim() == FIRST
+    assert queue.claim() == SECOND
+    assert queue.claim() is None
+
+
+def test_done_videos_are_not_queued_again(manifest):
+    queue = JobQueue(manifest)
+    queue.enqueue([FIRST])
+    manifest.mark_done(queue.claim())
+    assert queue.enqueue([FIRST]) == 0
+    assert queue.enqueue([FIRST], force=True) == 1
+
+
+def test_recover_running_videos(manifest):
+    queue = JobQueue(manifest)
+    queue.enqueue([FIRST])
+    queue.claim()
+    assert queue.recover() == 1
+    assert queue.claim() == FIRST
+
+
+def test_failures_are_retried_until_attempts_run_out(manifest):
+    queue = JobQueue(manifest, max_attempts=2, retry_delay=0)
+    queue.enqueue([FIRST])
+    manifest.mark_failed(queue.claim(), "boom")
+    assert queue.claim() == FIRST
+    manifest.mark_failed(FIRST, "boom again")
+    assert queue.claim() is None
+    assert queue.exhausted() == [(FIRST, "boom again")]
+
+
+def test_claim_sleeps_until_the_retry_is_due(manifest):
+    queue = JobQueue(manifest, max_attempts=3, retry_delay=1)
+    queue.enqueue([FIRST])
+    manifest.mark_failed(queue.claim(), "boom")
+    assert queue.next_retry_at() == pytest.approx(time.time() + 1, abs=0.5)
+    started = time.time()
+    assert queue.claim() == FIRST
+    assert 0.5 <= time.time() - started < 2
@@ -0,0 +1,67 @@
+import pytest
+
+from layout_cache import LayoutCache
+
+NAMES = ["class", "text", "partial"]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LayoutCache(str(tmp_path / "layout-cache.json"), max_failures=2)
+
+
+def test_new_layout_keeps_default_order(cache):
+    assert cache.order("layout", "tab", NAMES) == NAMES
+    assert cache.order(None, "tab", NAMES) == NAMES
+
+
+def test_winner_is_tried_first_and_hits_count(cache):
+    cache.record("layout", "tab", "partial")
+    assert cache.stats["misses"] == 1
+    assert cache.order("layout", "tab", NAMES) == ["partial", "class", "text"]
+    cache.record("layout", "tab", "partial")
+    assert cache.stats["hits"] == 1
+    assert cache.entries["layout"]["tab"]["hits"] == 1
+
+
+def test_other_winner_replaces_a_stale_entry(cache):
+    cache.record("layout", "extraction", "timestamps")
+    cache.record("layout", "extraction", "paragraphs")
+    assert cache.stats["stale"] == 1
+    assert cache.order("layout", "extraction", ["containers", "timestamps", "paragraphs"])[0] == "paragraphs"
+
+
+def test_failing_strategy_is_invalidated(cache):
+    cache.record("layout", "tab", "text")
+    cache.record("layout", "tab", None)
+    assert cache.order("layout", "tab", NAMES)[0] == "text"
+    cache.record("layout", "tab", None)
+    assert cache.stats["invalidated"] == 1
+    assert "layout" not in cache.entries
+    assert cache.order("layout", "tab", NAMES) == NAMES
+
+
+def test_layout_without_a_tab_skips_the_search(cache):
+    cache.record("layout", "tab", None)
+    assert cache.order("layout", "tab", NAMES) == []
+    # Transcripts found without a tab confirm the entry
+    cache.record("layout", "tab", None)
+    assert cache.entries["layout"]["tab"]["hits"] == 1
+    cache.reject("layout", "tab")
+    assert cache.order("layout", "tab", NAMES) == []
+    cache.reject("layout", "tab")
+    assert cache.order("layout", "tab", NAMES) == NAMES
+
+
+def test_failed_extraction_is_not_cached(cache):
+    cache.record("layout", "extraction", None)
+    assert "layout" not in cache.entries
+    assert cache.order("layout", "extraction", NAMES) == NAMES
+
+
+def test_entries_are_saved(cache):
+    cache.record("layout", "tab", "class")
+    cache.record("other", "tab", None)
+    reloaded = LayoutCache(cache.path)
+    assert reloaded.order("layout", "tab", NAMES)[0] == "class"
+    assert reloaded.order("other", "tab", NAMES) == []
@@ -0,0 +1,64 @@
+import json
+
+from lean_pages import LeanPages, format_bytes, summarize_network_log
+
+
+def entry(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+PAGE = [
+    entry("Network.requestWillBeSent", requestId="1"),
+    entry("Network.requestWillBeSent", requestId="2"),
+    entry("Network.requestWillBeSent", requestId="3"),
+    entry("Network.dataReceived", requestId="1", encodedDataLength=400),
+    entry("Network.loadingFinished", requestId="1", encodedDataLength=1000),
+    entry("Network.dataReceived", requestId="2", encodedDataLength=300),
+    entry("Network.loadingFailed", requestId="3", blockedReason="inspector"),
+    {"message": "not json"},
+]
+
+
+class FakeDriver:
+    def __init__(self):
+        self.commands = []
+
+    def get_log(self, kind):
+        return []
+
+    def execute_cdp_cmd(self, command, params):
+        self.commands.append(command)
+
+
+def test_summarize_network_log():
+    assert summarize_network_log(PAGE) == (1300, 3, 1)
+
+
+def test_format_bytes():
+    assert format_bytes(512) == "512 B"
+    assert format_bytes(3 * 1024 * 1024) == "3.0 MB"
+
+
+def test_first_page_load_is_the_unblocked_baseline():
+    lean = LeanPages()
+    first, second = FakeDriver(), FakeDriver()
+    assert lean.prepare(first) is False
+    # Other drivers block while the baseline is loading
+    assert lean.prepare(second) is True
+    assert second.commands == ["Network.enable", "Network.setBlockedURLs"]
+    lean.record(first, [entry("Network.loadingFinished", requestId="1", encodedDataLength=5000)], 2.0)
+    assert lean.baseline_bytes == 5000
+    assert lean.record(second, PAGE, 1.0)["saved"] == 3700
+    assert lean.prepare(first) is True
+
+
+def test_abandoned_baseline_is_retaken():
+    lean = LeanPages()
+    first, second = FakeDriver(), FakeDriver()
+    assert lean.prepare(first) is False
+    # The page load failed, so nothing was recorded
+    lean.abandon(first)
+    assert lean.baseline_driver is None
+    assert lean.prepare(second) is False
+    lean.abandon(first)
+    assert lean.baseline_driver is second
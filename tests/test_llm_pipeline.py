@@ -0,0 +1,13 @@
+from llm_pipeline import LLMPipeline
+
+
+def test_counts_created_skipped_and_failed():
+    def handler(name):
+        if name == "broken":
+            raise OSError("disk full")
+        return name == "new"
+
+    pipeline = LLMPipeline(handler, maxsize=2, workers=2)
+    for name in ["new", "fresh", "broken", "new"]:
+        pipeline.submit(name)
+    assert pipeline.close() == {"created": 2, "skipped": 1, "failed": 1}
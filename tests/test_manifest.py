@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from job_queue import JobQueue
+from manifest import Manifest, content_hash, normalize_video_id
+
+VIDEO_IDS = [f"{index:032x}" for index in range(40)]
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "manifest.db")
+
+
+def test_normalize_video_id():
+    assert normalize_video_id("https://www.loom.com/share/0123456789ABCDEF0123456789abcdef?sid=1") == \
+        "0123456789abcdef0123456789abcdef"
+
+
+def test_done_and_failed_videos(path):
+    manifest = Manifest(path)
+    manifest.mark_failed(VIDEO_IDS[0], "timeout")
+    manifest.mark_done(VIDEO_IDS[1], "Title", "data/a.txt", "text")
+    assert not manifest.is_done(VIDEO_IDS[0])
+    assert manifest.is_done(f"https://www.loom.com/share/{VIDEO_IDS[1]}")
+    assert manifest.get(VIDEO_IDS[1])["content_hash"] == content_hash("text")
+    assert manifest.counts() == {"done": 1, "failed": 1}
+    manifest.close()
+
+
+def test_recover_requeues_running_videos_of_a_killed_run(path):
+    manifest = Manifest(path)
+    queue = JobQueue(manifest)
+    queue.enqueue(VIDEO_IDS[:2])
+    assert queue.claim() == VIDEO_IDS[0]
+    manifest.close()
+
+    # The next run opens the same database
+    manifest = Manifest(path)
+    queue = JobQueue(manifest)
+    assert manifest.counts() == {"running": 1, "pending": 1}
+    assert queue.recover() == 1
+    assert [queue.claim(), queue.claim(), queue.claim()] == [VIDEO_IDS[0], VIDEO_IDS[1], None]
+    manifest.close()
+
+
+@pytest.mark.parametrize("shared", [True, False])
+def test_concurrent_claims_never_hand_out_a_video_twice(path, shared):
+    setup = Manifest(path)
+    JobQueue(setup).enqueue(VIDEO_IDS)
+    # One connection shared by the threads, or one per thread racing on BEGIN IMMEDIATE
+    manifests = [setup] * 2 if shared else [Manifest(path), Manifest(path)]
+    claimed = [[], []]
+
+    def worker(number):
+        queue = JobQueue(manifests[number])
+        while True:
+            video_id = queue.claim()
+            if video_id is None:
+                return
+            claimed[number].append(video_id)
+            manifests[number].mark_done(video_id)
+
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(claimed[0] + claimed[1]) == VIDEO_IDS
+    assert setup.counts() == {"done": len(VIDEO_IDS)}
+    for manifest in set(manifests) | {setup}:
+        manifest.close()
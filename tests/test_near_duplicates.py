@@ -0,0 +1,39 @@
+import random
+
+from near_duplicates import DuplicateDetector, load_duplicates, signature, similarity
+
+WORDS = ("pool", "fees", "range", "token", "swap", "price", "liquidity", "position", "wallet", "yield")
+
+
+def transcript(seed, words=400):
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) + str(rng.randint(0, 50)) for _ in range(words))
+
+
+def test_signature_ignores_timestamps_and_case():
+    text = transcript(1)
+    assert similarity(signature(text), signature("[00:42] " + text.upper())) == 1.0
+    assert signature("0:01 [00:02]") is None
+
+
+def test_similar_and_different_texts():
+    text = transcript(1)
+    edited = text.replace("pool", "pond", 3)
+    assert similarity(signature(text), signature(edited)) >= 0.8
+    assert similarity(signature(text), signature(transcript(2))) < 0.2
+
+
+def test_clusters_and_report(tmp_path):
+    text = transcript(1)
+    (tmp_path / "a_llm.txt").write_text(text + " extra words to be larger", encoding="utf-8")
+    (tmp_path / "b_llm.txt").write_text(text, encoding="utf-8")
+    (tmp_path / "c_llm.txt").write_text(transcript(2), encoding="utf-8")
+    detector = DuplicateDetector(str(tmp_path))
+    assert detector.update() == 3
+    clusters = detector.save()
+    assert [(cluster["canonical"], [duplicate["file"] for duplicate in cluster["duplicates"]])
+            for cluster in clusters] == [("a_llm.txt", ["b_llm.txt"])]
+    assert load_duplicates(str(tmp_path)) == {"b_llm.txt"}
+    assert detector.find_duplicate(text, exclude="b_llm.txt")[0] == "a_llm.txt"
+    # Signatures are reloaded from the report and not recomputed
+    assert DuplicateDetector(str(tmp_path)).update() == 0
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+pytest.importorskip("urllib3")
+
+import mock_loom
+from network_fetch import parse_captions, parse_json_transcript
+
+VIDEO_ID = "0" + "123456789abcdef0123456789abcdef"
+
+
+def expected_text(video_id):
+    return "\n".join(f"{int(timestamp.split(':')[0]):02d}:{timestamp.split(':')[1]}\n{text}"
+                     for timestamp, text in mock_loom.transcript_lines(video_id))
+
+
+def test_millisecond_payload_matches_transcript():
+    assert parse_json_transcript(mock_loom.captions_json(VIDEO_ID)) == expected_text(VIDEO_ID)
+
+
+def test_vtt_and_json_payloads_agree():
+    assert parse_captions(mock_loom.captions_vtt(VIDEO_ID)) == parse_captions(mock_loom.captions_json(VIDEO_ID))
+
+
+def test_seconds_payload():
+    payload = json.dumps([{"start": 0, "text": "Hello"}, {"start": 75.5, "text": "World"}])
+    assert parse_json_transcript(payload) == "00:00\nHello\n01:15\nWorld"
+
+
+def test_unit_is_decided_once_per_payload():
+    # Large values under a seconds key mean milliseconds for every phrase, small ones included
+    payload = json.dumps({"captions": [{"start": 500, "text": "One"}, {"start": 2000000, "text": "Two"}]})
+    assert parse_json_transcript(payload) == "00:00\nOne\n33:20\nTwo"
+
+
+def test_not_a_transcript():
+    assert parse_json_transcript("not json") == ""
+    assert parse_json_transcript(json.dumps({"phrases": []})) == ""
+
+
+def test_offset_unit_is_decided_by_its_values():
+    seconds = json.dumps([{"offset": 0, "text": "One"}, {"offset": 65.2, "text": "Two"}])
+    assert parse_json_transcript(seconds) == "00:00\nOne\n01:05\nTwo"
+    milliseconds = json.dumps([{"offset": 0, "text": "One"}, {"offset": 65200, "text": "Two"}])
+    assert parse_json_transcript(milliseconds) == "00:00\nOne\n01:05\nTwo"
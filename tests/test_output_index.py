@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+import output_index
+from output_index import OutputIndex, is_unchanged, refresh_output, source_hash
+from transcript_cleaner import clean_transcript
+
+RAW = "0:00 Hello  there ..\n\n\n\n0:05 World\n"
+
+
+@pytest.fixture
+def paths(tmp_path):
+    source = tmp_path / "call.txt"
+    source.write_text(RAW, encoding="utf-8")
+    target = tmp_path / "out" / "call_llm.txt"
+    target.parent.mkdir()
+    return str(source), str(target)
+
+
+def test_missing_output_is_written(paths):
+    source, target = paths
+    status, entry = refresh_output(source, target)
+    assert status == "written"
+    with open(target, encoding="utf-8") as f:
+        assert f.read() == clean_transcript(RAW)
+    assert entry["source_hash"] == source_hash(source)
+    assert entry["rules_version"] == output_index.RULES_VERSION
+
+
+def test_untouched_source_is_fresh(paths):
+    source, target = paths
+    _, entry = refresh_output(source, target)
+    assert is_unchanged(entry, os.stat(source))
+    assert refresh_output(source, target, entry) == ("fresh", entry)
+
+
+def test_rewrite_with_same_content_costs_only_a_hash(paths):
+    source, target = paths
+    _, entry = refresh_output(source, target)
+    mtime_ns = os.stat(target).st_mtime_ns
+    os.utime(source, ns=(entry["source_mtime_ns"] + 10**9, entry["source_mtime_ns"] + 10**9))
+    assert not is_unchanged(entry, os.stat(source))
+    status, new_entry = refresh_output(source, target, entry)
+    assert status == "fresh"
+    assert new_entry["source_mtime_ns"] == entry["source_mtime_ns"] + 10**9
+    assert os.stat(target).st_mtime_ns == mtime_ns
+
+
+def test_changed_source_hash_regenerates(paths):
+    source, target = paths
+    _, entry = refresh_output(source, target)
+    with open(source, "a", encoding="utf-8") as f:
+        f.write("0:09 More\n")
+    status, new_entry = refresh_output(source, target, entry)
+    assert status == "written"
+    assert new_entry["source_hash"] != entry["source_hash"]
+    with open(target, encoding="utf-8") as f:
+        assert f.read() == clean_transcript(RAW + "0:09 More\n")
+
+
+def test_new_rules_version_regenerates_without_rewriting_identical_output(paths, monkeypatch):
+    source, target = paths
+    _, entry = refresh_output(source, target)
+    monkeypatch.setattr(output_index, "RULES_VERSION", "newer-rules")
+    assert not is_unchanged(entry, os.stat(source))
+    status, new_entry = refresh_output(source, target, entry)
+    assert status == "unchanged"
+    assert new_entry["rules_version"] == "newer-rules"
+
+
+def test_force_and_missing_output(paths):
+    source, target = paths
+    _, entry = refresh_output(source, target)
+    assert refresh_output(source, target, entry, force=True)[0] == "unchanged"
+    os.remove(target)
+    assert refresh_output(source, target, entry)[0] == "written"
+
+
+def test_index_is_saved_only_when_changed(tmp_path):
+    index = OutputIndex(str(tmp_path))
+    index.save()
+    assert not os.path.exists(index.path)
+    index.set("call_llm.txt", {"source": "call.txt"})
+    index.save()
+    assert OutputIndex(str(tmp_path)).get("call_llm.txt") == {"source": "call.txt"}
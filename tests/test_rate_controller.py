@@ -0,0 +1,43 @@
+import pytest
+
+from rate_controller import RateController
+
+
+def test_clean_loads_speed_up_to_the_limit():
+    controller = RateController(initial_delay=4, min_delay=1, increase=0.05)
+    controller.record("ok", load_time=2)
+    assert controller.delay() == pytest.approx(1 / 0.3)
+    for _ in range(100):
+        controller.record("ok")
+    assert controller.delay() == pytest.approx(1)
+
+
+def test_timeouts_back_off_multiplicatively():
+    controller = RateController(initial_delay=2, max_delay=10, decrease=0.5)
+    controller.record("timeout")
+    assert controller.delay() == pytest.approx(4)
+    for _ in range(10):
+        controller.record("timeout")
+    assert controller.delay() == pytest.approx(10)
+
+
+def test_slow_loads_back_off_gently():
+    controller = RateController(initial_delay=2, slow_load=15, decrease=0.5)
+    controller.record("ok", load_time=20)
+    assert controller.delay() == pytest.approx(2 / 0.75)
+    assert controller.summary()["slow"] == 1
+
+
+def test_errors_do_not_change_the_rate():
+    controller = RateController(initial_delay=2)
+    controller.record("error")
+    assert controller.delay() == pytest.approx(2)
+
+
+def test_throttling_pauses_every_worker():
+    controller = RateController(initial_delay=1, cooldown=60)
+    assert controller.acquire() < 0.1
+    controller.record("throttled")
+    assert controller.paused_until > 0
+    assert controller.tokens == 0
+    assert controller.summary()["throttled"] == 1
@@ -0,0 +1,46 @@
+import pytest
+
+from search_index import SearchIndex, parse_query, title_of
+
+NAME = "Pool review - 0123456789abcdef0123456789abcdef_llm.txt"
+
+
+@pytest.fixture
+def index(tmp_path):
+    (tmp_path / NAME).write_text("[0:00] We looked at the Uniswap V3 pool.\n"
+                                 "[0:30] Time to rebalance the v3 position.\n"
+                                 "[1:10] Uniswap fees and a rebalance of V3 later.\n", encoding="utf-8")
+    index = SearchIndex(str(tmp_path))
+    index.update()
+    yield index
+    index.close()
+
+
+def test_parse_query():
+    assert parse_query('"Uniswap V3" rebalance') == [["uniswap", "v3"], ["rebalance"]]
+
+
+def test_title_of():
+    assert title_of(NAME) == "Pool review"
+
+
+def test_phrase_needs_adjacent_words(index):
+    hits = index.search('"uniswap v3"')
+    assert [hit["start"] for hit in hits] == [0]
+    assert hits[0]["title"] == "Pool review"
+
+
+def test_words_must_share_a_segment(index):
+    assert [hit["start"] for hit in index.search("rebalance v3")] == [30, 70]
+    assert [hit["start"] for hit in index.search('"uniswap v3" rebalance')] == []
+
+
+def test_segment_text(index):
+    hit = index.search("fees")[0]
+    assert index.segment_text(hit) == "Uniswap fees and a rebalance of V3 later."
+
+
+def test_update_drops_deleted_files(index, tmp_path):
+    (tmp_path / NAME).unlink()
+    assert index.update() == (0, 0, 1)
+    assert index.search("rebalance") == []
@@ -0,0 +1,49 @@
+import json
+
+from segments import Segments, export, export_text, format_timestamp
+
+TEXT = "[0:00] Welcome to the call.\n[0:42] First topic here.\n\n[1:02:03] Wrapping up."
+
+
+def test_segments_round_trip():
+    segments = Segments(TEXT)
+    assert list(segments.starts) == [0, 42, 3723]
+    assert [segment.text for segment in segments] == ["Welcome to the call.", "First topic here.", "Wrapping up."]
+    rebuilt = "\n".join(f"{format_timestamp(segment.start)} {segment.text}" for segment in segments)
+    assert Segments(rebuilt).text == rebuilt
+    assert [segment.text for segment in Segments(rebuilt)] == [segment.text for segment in segments]
+    assert list(Segments(rebuilt).starts) == list(segments.starts)
+
+
+def test_text_before_first_marker_starts_at_zero():
+    segments = Segments("Intro words [0:05] Then this.")
+    assert list(segments.starts) == [0, 5]
+    assert segments.segment_text(0) == "Intro words"
+
+
+def test_end_and_lookup():
+    segments = Segments(TEXT)
+    assert segments.end(0) == 42
+    assert segments.end(2) > 3723
+    assert segments.at(41.9) == 0
+    assert segments.at(42) == 1
+    assert segments[-1].text == "Wrapping up."
+
+
+def test_export_formats():
+    out = {fmt: [] for fmt in ("jsonl", "srt", "vtt")}
+    export(Segments(TEXT), {fmt: pieces.append for fmt, pieces in out.items()})
+    records = [json.loads(line) for line in "".join(out["jsonl"]).splitlines()]
+    assert [record["start"] for record in records] == [0, 42, 3723]
+    srt = "".join(out["srt"])
+    assert srt.startswith("1\n00:00:00,000 --> 00:00:42,000\nWelcome to the call.\n\n")
+    assert "3\n01:02:03,000 --> " in srt
+    vtt = "".join(out["vtt"])
+    assert vtt.startswith("WEBVTT\n\n00:00:00.000 --> 00:00:42.000\nWelcome to the call.\n\n")
+
+
+def test_export_text_cleans_raw_transcripts(tmp_path):
+    count = export_text("Call - 0123456789abcdef0123456789abcdef.txt", "0:00 Hello  there\n0:07 Bye",
+                        str(tmp_path), formats=("srt",))
+    assert count == 2
+    assert (tmp_path / "Call - 0123456789abcdef0123456789abcdef.srt").read_text().count(" --> ") == 2
@@ -0,0 +1,10 @@
+from transcript_cleaner import clean_transcript, reference_clean_transcript
+
+RAW = ("0:00 so the next step is  to open the dashboard ..\n\n\n\n"
+       "(0:12) and check the numbers ,they look right !?\n"
+       "1:02:03] Last   segment here\t\n")
+
+
+def test_matches_reference_cleaner():
+    assert clean_transcript(RAW) == reference_clean_transcript(RAW)
+
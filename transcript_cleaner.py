@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+transcript_cleaner.py
+
+Fast transcript cleaning engine for LLM-ready transcripts.
+
+clean_transcript() produces exactly the same output as the original multi-pass cleaner
+(kept here as reference_clean_transcript) with far less work per character. The original
+spends most of its time in patterns that the regex engine has to try at every space of
+the text and in a per-character filter; this engine instead:
+    - finds timestamps by their digits and looks back for the brackets and whitespace
+      in front of them
+    - collapses repeated punctuation and excess blank lines in one fused pass
+    - removes whitespace before punctuation in a pass over the reversed text, where every
+      match starts at the punctuation mark
+    - strips lines in one line-level pass and drops empty lines with a single pattern
+    - collapses spaces with str.replace and drops non-printable characters with an
+      encode/translate table
+
+clean_stream() cleans a transcript from a file object in bounded windows with the same
+output, for recordings too long to clean in one piece.
+
+Usage:
+    python transcript_cleaner.py benchmark [--corpus llm_ready_transcripts] [--size-mb 20]
+    python transcript_cleaner.py verify [--corpus llm_ready_transcripts] [--fuzz 20000]
+    python transcript_cleaner.py memory [--memory-sizes 1 4 16]
+"""
+
+import argparse
+import io
+import os
+import random
+import re
+import string
+import tempfile
+import time
+import tracemalloc
+
+from corpus_pack import is_pack, iter_transcripts
+
+# The timestamp itself; the optional "[", "(" and whitespace in front of it are found by
+# looking back from the first digit
+_TIMESTAMP = re.compile(r'(\d{1,2}:\d{2}(?::\d{2})?)\s*(?:\]|\))?')
+
+# Repeated sentence punctuation collapses to its first mark, and three or more newlines to
+# one blank line. Both start at a single character, so they share one pass.
+_REPEATS_AND_BLANK_LINES = re.compile(r'([.!?\n])(?:(?<=[.!?])\s*[.!?]+|(?<=\n)\n\n+)')
+
+# Whitespace before punctuation, matched in the reversed text
+_REVERSED_SPACE_BEFORE_PUNCTUATION = re.compile(r'([.,;:!?])\s+')
+
+_MISSING_SPACE_AFTER_PUNCTUATION = re.compile(r'([.,;:!?])([^\s\d])')
+
+_EXTRA_BLANK_LINES = re.compile(r'\n{3,}')
+
+# string.printable is ASCII only, so everything else is dropped by encoding to ASCII first
+_NON_PRINTABLE_ASCII = bytes(code for code in range(128) if chr(code) not in string.printable)
+
+# Version of the cleaning rules, recorded with every LLM-ready output by output_index.py.
+# Bump it whenever a change to the patterns or to clean_transcript() changes its output,
+# so outputs made by the older rules are regenerated
+RULES_VERSION = 1
+
+
+def _standardize_timestamps(text):
+    pieces = []
+    position = 0
+    for match in _TIMESTAMP.finditer(text):
+        # The earliest start the pattern \[?\(?\s* in front of the timestamp allows
+        start = match.start()
+        while start > position and text[start - 1].isspace():
+            start -= 1
+        if start > position and text[start - 1] == '(':
+            start -= 1
+        if start > position and text[start - 1] == '[':
+            start -= 1
+        pieces.append(text[position:start])
+        pieces.append('[' + match.group(1) + ']')
+        position = match.end()
+    pieces.append(text[position:])
+    return ''.join(pieces)
+
+
+def _repeat_or_blank_line(match):
+    mark = match.group(1)
+    return '\n\n' if mark == '\n' else mark
+
+
+def clean_transcript(text):
+    """
+    Process transcript text to make it LLM-friendly.
+
+    Args:
+        text (str): Raw transcript text
+
+    Returns:
+        str: Cleaned and formatted transcript text, identical to reference_clean_transcript()
+    """
+    text = _standardize_timestamps(text)
+    text = _REPEATS_AND_BLANK_LINES.sub(_repeat_or_blank_line, text)
+    text = _REVERSED_SPACE_BEFORE_PUNCTUATION.sub(r'\1', text[::-1])[::-1]
+    text = _MISSING_SPACE_AFTER_PUNCTUATION.sub(r'\1 \2', text)
+
+    # Once every line is stripped, an empty line survives only as the single blank line
+    # between two lines with content; longer runs and blank lines at either end go
+    text = '\n'.join([line.strip() for line in text.split('\n')])
+    text = _EXTRA_BLANK_LINES.sub('\n', text).strip()
+    while '  ' in text:
+        text = text.replace('  ', ' ')
+    return text.encode('ascii', 'ignore').translate(None, _NON_PRINTABLE_ASCII).decode('ascii')
+
+
+# Anything but whitespace, digits, "[", "(" and punctuation: no rule matches across such a
+# character or looks past it, so the text can be split right after it
+_LAST_SPLIT_POINT = re.compile(r'.*[^\s\d\[(.,;:!?]', re.DOTALL)
+
+# Stands in for the text before a split point when the part after it is cleaned
+_STAND_IN = 'a'
+
+
+def clean_stream(source, write, window=65536):
+    """
+    Clean a transcript piece by piece while reading it, so memory stays bounded by the
+    window instead of growing with the transcript. Text without a split point, such as a
+    run of digits and punctuation, is held until one is read, since the rules can look
+    across all of it.
+
+    Every window of text read is cut after its last split point. The part before the cut
+    cleans exactly as it would within the whole text. The part after it is cleaned behind
+    a one-character stand-in for the line it continues, which is dropped from the output,
+    so line stripping and the empty line rule see a line with content before it, just as
+    in the whole text. The output is identical to clean_transcript() on the whole text.
+
+    Args:
+        source: Text file object (or io.StringIO) to read the transcript from
+        write (callable): Called with each piece of cleaned text
+        window (int): Characters read at a time
+    """
+    # Blocks read since the last cut; none of them holds a split point but the newest, so
+    # only the newest block is searched and the others are joined once when it is cut
+    pending = []
+    first = True
+    while True:
+        block = source.read(window)
+        if block:
+            split_point = _LAST_SPLIT_POINT.match(block)
+            if split_point is None:
+                # No split point yet: keep reading
+                pending.append(block)
+                continue
+            pending.append(block[:split_point.end()])
+            piece, pending = ''.join(pending), [block[split_point.end():]]
+        else:
+            piece, pending = ''.join(pending), []
+        if first:
+            write(clean_transcript(piece))
+            first = False
+        else:
+            write(clean_transcript(_STAND_IN + piece)[1:])
+        if not block:
+            return
+
+
+def reference_clean_transcript(text):
+    """
+    The original multi-pass cleaner from integrated_solution.py.
+
+    Kept as the specification clean_transcript() is verified against and as the baseline
+    of the benchmark.
+
+    Args:
+        text (str): Raw transcript text
+
+    Returns:
+        str: Cleaned and formatted transcript text
+    """
+    # Step 1: Preserve timestamps by standardizing their format to [HH:MM:SS]
+    text = re.sub(r'(\[?\(?\s*)(\d{1,2}:\d{2}(?::\d{2})?)\s*(?:\]|\))?', r'[\2]', text)
+
+    # Step 2: Replace excessive newlines with double newlines
+    text = re.sub(r'\n{3,}', '\n\n', text)
+
+    # Step 3: Remove duplicate punctuation and fix the spacing around punctuation
+    text = re.sub(r'([.!?])\s*([.!?])+', r'\1', text)
+    text = re.sub(r'\s+([.,;:!?])', r'\1', text)
+    text = re.sub(r'([.,;:!?])([^\s\d])', r'\1 \2', text)
+
+    # Step 4: Strip every line and collapse multiple spaces
+    lines = [line.strip() for line in text.split('\n')]
+    text = '\n'.join(lines)
+    text = re.sub(r' +', ' ', text)
+
+    # Step 5: Remove empty lines while preserving paragraph structure
+    lines = text.split('\n')
+    non_empty_lines = []
+    for i, line in enumerate(lines):
+        if line.strip() or (i > 0 and i < len(lines) - 1 and lines[i-1].strip() and lines[i+1].strip()):
+            non_empty_lines.append(line)
+    text = '\n'.join(non_empty_lines)
+
+    # Step 6: Filter out any non-printable characters
+    printable_chars = set(string.printable)
+    return ''.join(c for c in text if c in printable_chars)
+
+
+# Noise added to cleaned transcripts to make them look raw again for the benchmark
+_NOISE = ("  ", " ,", " .", "..", "!?", "\t", " \u2019", "\u00a0", "\r", "\n\n\n", " ;", ",x")
+
+# Characters the fuzzer builds random transcripts from
+_FUZZ_ALPHABET = ("a", "b", "Z", " ", "  ", "\n", "\n\n\n", "\t", "\r", "\x0b", "\x0c", "\x1c", "\x00", "\x7f",
+                  ".", ",", ";", ":", "!", "?", "...", "[", "]", "(", ")", "0", "1", "5", "9", "12:30",
+                  "1:02:03", "\u00a0", "\u2028", "\x85", "\u3000", "\u0663", "\u00e9", "\u2019", "\U0001f600")
+
+
+def load_corpus(corpus):
+    """
+    Read every .txt file of a directory, or every record of a corpus_pack.py archive.
+
+    Returns:
+        list: File contents
+    """
+    return [text for _, text in iter_transcripts(corpus)]
+
+
+def make_raw_transcript(document, rng):
+    """
+    Turn a cleaned transcript back into something shaped like a scraped one: one timestamp
+    per line in mixed formats, with stray spaces, doubled punctuation, blank lines and
+    non-ASCII characters sprinkled in.
+    """
+    parts = re.split(r'\[(\d{1,2}:\d{2}(?::\d{2})?)\]', document)
+    lines = [parts[0]] if parts[0] else []
+    for i in range(1, len(parts) - 1, 2):
+        timestamp = rng.choice((parts[i], f"({parts[i]})", f"[{parts[i]}]", f"{parts[i]}\n"))
+        words = parts[i + 1].split(' ')
+        for _ in range(len(words) // 8):
+            position = rng.randrange(len(words))
+            words[position] += rng.choice(_NOISE)
+        lines.append(timestamp + " " + " ".join(words) + rng.choice(("", "  ", "\n")))
+    return "\n".join(lines)
+
+
+def make_corpus(documents, size_mb, seed=0):
+    """
+    Scale a corpus up to roughly size_mb of UTF-8 text of raw-looking transcripts.
+
+    Returns:
+        list: Synthetic transcripts
+    """
+    rng = random.Random(seed)
+    corpus = []
+    total = 0
+    while total < size_mb * 1024 * 1024:
+        raw = make_raw_transcript(rng.choice(documents), rng)
+        corpus.append(raw)
+        total += len(raw.encode('utf-8'))
+    return corpus
+
+
+def fuzz_transcript(rng, length=60):
+    """A short random transcript built from characters that exercise every cleaning rule."""
+    return "".join(rng.choice(_FUZZ_ALPHABET) for _ in range(rng.randint(0, length)))
+
+
+def stream_clean_transcript(text, window):
+    """clean_stream() over an in-memory transcript, returning the cleaned text."""
+    pieces = []
+    clean_stream(io.StringIO(text), pieces.append, window)
+    return ''.join(pieces)
+
+
+def find_mismatches(texts, seed=0):
+    """
+    Compare clean_transcript(), and clean_stream() with small random windows, with
+    reference_clean_transcript().
+
+    Returns:
+        list: Inputs whose outputs differ
+    """
+    rng = random.Random(seed)
+    mismatches = []
+    for text in texts:
+        expected = reference_clean_transcript(text)
+        if (clean_transcript(text) != expected
+                or stream_clean_transcript(text, rng.randint(1, 64)) != expected):
+            mismatches.append(text)
+    return mismatches
+
+
+def measure_memory(documents, sizes_mb, seed=0, window=65536):
+    """
+    Peak memory of cleaning transcripts of growing size, whole and streamed.
+
+    Every transcript is written to a temporary file and cleaned from there, once with
+    clean_transcript() on the whole file and once with clean_stream() into another file.
+
+    Returns:
+        list: (size in MB, whole-file peak in MB, streaming peak in MB) per size
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix="transcript-cleaner-") as work_dir:
+        source_path = os.path.join(work_dir, "transcript.txt")
+        target_path = os.path.join(work_dir, "transcript_llm.txt")
+        for size_mb in sizes_mb:
+            with open(source_path, 'w', encoding='utf-8') as f:
+                for text in make_corpus(documents, size_mb, seed):
+                    f.write(text + "\n\n")
+            peaks = []
+            for streaming in (False, True):
+                tracemalloc.start()
+                with open(source_path, 'r', encoding='utf-8') as source, \
+                        open(target_path, 'w', encoding='utf-8') as target:
+                    if streaming:
+                        clean_stream(source, target.write, window)
+                    else:
+                        target.write(clean_transcript(source.read()))
+                peaks.append(tracemalloc.get_traced_memory()[1] / (1024 * 1024))
+                tracemalloc.stop()
+            results.append((os.path.getsize(source_path) / (1024 * 1024), peaks[0], peaks[1]))
+    return results
+
+
+def measure(clean, corpus, repeat):
+    """Best throughput of a cleaner over the corpus in MB/s (of UTF-8 input)."""
+    size = sum(len(text.encode('utf-8')) for text in corpus)
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in corpus:
+            clean(text)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return size / (1024 * 1024) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark and verify the transcript cleaning engine.')
+    parser.add_argument('command', choices=['benchmark', 'verify', 'memory'],
+                        help='benchmark: MB/s of the original and the fast cleaner; '
+                             'verify: check that both, and the streaming cleaner, produce identical output; '
+                             'memory: peak memory of whole-file and streaming cleaning by transcript size')
+    parser.add_argument('--corpus', type=str, default="llm_ready_transcripts",
+                        help='Directory of .txt transcripts, or a corpus_pack.py archive, to build the test corpus '
+                             'from (default: llm_ready_transcripts)')
+    parser.add_argument('--size-mb', type=float, default=20, help='Size of the synthetic corpus in MB (default: 20)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per cleaner, the best counts (default: 3)')
+    parser.add_argument('--fuzz', type=int, default=20000, help='Random inputs checked by verify (default: 20000)')
+    parser.add_argument('--memory-sizes', type=float, nargs='+', default=[1, 4, 16],
+                        help='Transcript sizes in MB measured by memory (default: 1 4 16)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+
+    documents = load_corpus(args.corpus) if os.path.isdir(args.corpus) or is_pack(args.corpus) else []
+    if not documents:
+        parser.error(f"No .txt transcripts found in {args.corpus}")
+
+    if args.command == 'verify':
+        rng = random.Random(args.seed)
+        texts = documents + [make_raw_transcript(document, rng) for document in documents]
+        texts += [fuzz_transcript(rng) for _ in range(args.fuzz)]
+        mismatches = find_mismatches(texts, args.seed)
+        print(f"Checked {len(texts)} inputs: {len(mismatches)} mismatches")
+        for text in mismatches[:5]:
+            print(f"  {text!r}")
+        if mismatches:
+            exit(1)
+        return
+
+    if args.command == 'memory':
+        print(f"{'Transcript':>12}{'Whole file':>14}{'Streaming':>14}")
+        for size_mb, whole_mb, streaming_mb in measure_memory(documents, args.memory_sizes, args.seed):
+            print(f"{size_mb:>9.1f} MB{whole_mb:>11.1f} MB{streaming_mb:>11.1f} MB")
+        return
+
+    corpus = make_corpus(documents, args.size_mb, args.seed)
+    size_mb = sum(len(text.encode('utf-8')) for text in corpus) / (1024 * 1024)
+    print(f"Corpus: {len(corpus)} synthetic transcripts, {size_mb:.1f} MB, from {len(documents)} in {args.corpus}")
+    mismatches = find_mismatches(corpus, args.seed)
+    if mismatches:
+        print(f"Error: {len(mismatches)} transcripts are cleaned differently by the two cleaners")
+        exit(1)
+    before = measure(reference_clean_transcript, corpus, args.repeat)
+    after = measure(clean_transcript, corpus, args.repeat)
+    print(f"Original cleaner: {before:.1f} MB/s")
+    print(f"Fast cleaner:     {after:.1f} MB/s ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+worker_pool.py
+
+Runs the per-video scraping loop from process.py across several browser workers.
+
+Every worker owns its own WebDriver instance and claims video IDs from a shared queue,
+so a slow or stuck video only holds up one browser. Workers reuse the cookies from the
+single manual login so no additional logins are needed.
+"""
+
+import threading
+
+LOOM_BASE_URL = "https://www.loom.com"
+
+
+def copy_session_cookies(cookies, driver, base_url=LOOM_BASE_URL):
+    """
+    Copy authenticated session cookies into another WebDriver instance.
+
+    Args:
+        cookies (list): Cookies as returned by driver.get_cookies()
+        driver: WebDriver instance to receive the cookies
+        base_url (str): URL to open first, cookies can only be set for the current domain
+
+    Returns:
+        int: Number of cookies that were copied successfully
+    """
+    driver.get(base_url)
+    copied = 0
+    for cookie in cookies:
+        try:
+            driver.add_cookie(dict(cookie))
+            copied += 1
+        except Exception as e:
+            print(f"Could not copy cookie {cookie.get('name', 'unknown')}: {str(e)}")
+    return copied
+
+
+def run_worker_pool(next_video, num_workers, primary_driver, create_driver, process_video,
+                    base_url=LOOM_BASE_URL, supervise=None):
+    """
+    Process videos in parallel using several browser workers.
+
+    The already logged-in primary driver acts as worker 1; the remaining workers are
+    started with create_driver() and receive the primary driver's cookies.
+
+    Args:
+        next_video (callable): Returns the next video ID or URL to process, or None when
+            the queue is empty; must be safe to call from several threads
+        num_workers (int): Total number of browser workers
+        primary_driver: Logged-in WebDriver instance
+        create_driver (callable): Called with a worker number, returns a new WebDriver
+        process_video (callable): Called with (driver, video_id) for every video
+        base_url (str): Loom site root the cookies belong to
+        supervise (callable): Optional, called with (driver, worker_id, cookies) and returns
+            an object whose run(process_video, video_id) processes a video and may replace
+            the driver, whose close() releases any replacement drivers, and whose
+            retired(driver) tells whether it already quit the driver it was given
+
+    Returns:
+        dict: Number of videos handled by each worker, keyed by worker number
+    """
+    num_workers = max(1, num_workers)
+    cookies = primary_driver.get_cookies()
+    handled = {}
+    handled_lock = threading.Lock()
+
+    def worker(worker_id):
+        driver = primary_driver if worker_id == 1 else None
+        supervisor = None
+        count = 0
+        try:
+            if driver is None:
+                print(f"[worker {worker_id}] Starting browser...")
+                driver = create_driver(worker_id)
+                copied = copy_session_cookies(cookies, driver, base_url)
+                print(f"[worker {worker_id}] Copied {copied} session cookies")
+            if supervise is not None:
+                supervisor = supervise(driver, worker_id, cookies)
+
+            while True:
+                video_id = next_video()
+                if video_id is None:
+                    break
+                try:
+                    print(f"[worker {worker_id}] Processing {video_id}")
+                    if supervisor is not None:
+                        supervisor.run(process_video, video_id)
+                    else:
+                        process_video(driver, video_id)
+                    count += 1
+                except Exception as e:
+                    print(f"[worker {worker_id}] Error processing video {video_id}: {str(e)}")
+        except Exception as e:
+            print(f"[worker {worker_id}] Worker stopped: {str(e)}")
+        finally:
+            if supervisor is not None:
+                stats = supervisor.close()
+                print(f"[worker {worker_id}] Browser recycled {stats['recycles']} times, "
+                      f"restarted {stats['restarts']} times after a crash (peak memory {stats['peak_memory_mb']:.0f} MB)")
+            # The primary driver is closed by process.py itself, a retired one by its supervisor
+            retired = supervisor is not None and supervisor.retired(driver)
+            if driver is not None and driver is not primary_driver and not retired:
+                try:
+                    driver.quit()
+                except Exception as e:
+                    print(f"[worker {worker_id}] Error while closing the browser: {str(e)}")
+            with handled_lock:
+                handled[worker_id] = count
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f"loom-worker-{i}")
+               for i in range(1, num_workers + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return handled